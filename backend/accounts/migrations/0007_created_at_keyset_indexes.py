@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_address_user_profile_completed'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('services', '0016_department_hero_bg_desktop_department_hero_bg_mobile_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', '-id'], name='users_date_jo_cdf9fa_idx'),
+        ),
+    ]
@@ -98,5 +98,8 @@ class User(AbstractUser):
 
     class Meta:
         db_table = "users"
+        indexes = [
+            models.Index(fields=["-date_joined", "-id"]),
+        ]
         verbose_name = "User"
         verbose_name_plural = "Users"
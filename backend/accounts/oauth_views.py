@@ -8,9 +8,10 @@ from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.linkedin_oauth2.views import LinkedInOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from dj_rest_auth.registration.views import SocialLoginView
-import requests
 import os
 
+from utils import http_client
+
 User = get_user_model()
 
 
@@ -64,7 +65,7 @@ class GoogleCallbackView(APIView):
             }
             
             # Debug logging
-            token_response = requests.post(token_url, data=token_data)
+            token_response = http_client.post(token_url, data=token_data)
             token_json = token_response.json()
             
             if 'error' in token_json:
@@ -79,7 +80,7 @@ class GoogleCallbackView(APIView):
             # Get user info from Google
             user_info_url = 'https://www.googleapis.com/oauth2/v2/userinfo'
             headers = {'Authorization': f'Bearer {access_token}'}
-            user_info_response = requests.get(user_info_url, headers=headers)
+            user_info_response = http_client.get(user_info_url, headers=headers)
             user_info = user_info_response.json()
             
             # Get or create user
@@ -156,7 +157,7 @@ class LinkedInCallbackView(APIView):
             }
             
             # Debug logging
-            token_response = requests.post(token_url, data=token_data)
+            token_response = http_client.post(token_url, data=token_data)
             token_json = token_response.json()
             
             if 'error' in token_json:
@@ -171,7 +172,7 @@ class LinkedInCallbackView(APIView):
             # Get user info from LinkedIn
             user_info_url = 'https://api.linkedin.com/v2/userinfo'
             headers = {'Authorization': f'Bearer {access_token}'}
-            user_info_response = requests.get(user_info_url, headers=headers)
+            user_info_response = http_client.get(user_info_url, headers=headers)
             user_info = user_info_response.json()
             
             # Get or create user
@@ -3,7 +3,7 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, ProtectedError
 from django.utils import timezone
 from datetime import timedelta
 
@@ -127,6 +127,16 @@ class TeamMemberDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Prevent changing the service
         serializer.save(service=instance.service, role='team_member')
     
+    def destroy(self, request, *args, **kwargs):
+        """Users with recorded payments are kept, like their payment ledger"""
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {"error": "Users with recorded payments cannot be deleted"},
+                status=status.HTTP_409_CONFLICT
+            )
+    
     def perform_destroy(self, instance):
         """Delete team member with validation"""
         # Check if user has permission
@@ -241,6 +241,8 @@ class AdminUserListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_ordering = ('-date_joined', '-id')
+    allow_page_number_pagination = True
     
     def get_queryset(self):
         """
@@ -3,9 +3,11 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
 from django.db.models import Sum, Count, Q
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
 from orders.models import Order
+from orders.rollup_models import OrderRollup
 from payments.models import Transaction
 from accounts.models import User
 from services.models import Service
@@ -40,39 +42,41 @@ class TeamHeadDashboardMetricsView(APIView):
         department_orders = Order.objects.filter(
             service__department_id=department_id
         )
-
-        # Total orders for this department
-        total_orders = department_orders.count()
-        recent_orders = department_orders.filter(created_at__gte=thirty_days_ago).count()
-
-        # Total revenue for this department
-        total_revenue = department_orders.aggregate(
-            total=Sum('price')
-        )['total'] or 0
-
-        recent_revenue = department_orders.filter(
-            created_at__gte=thirty_days_ago
-        ).aggregate(total=Sum('price'))['total'] or 0
+        department_rollups = OrderRollup.objects.filter(
+            department_id=department_id
+        )
+        recent = Q(day__gte=thirty_days_ago.date())
+
+        # Order and revenue totals for this department from the rollups
+        order_totals = department_rollups.aggregate(
+            total_orders=Sum('order_count'),
+            recent_orders=Sum('order_count', filter=recent),
+            total_revenue=Sum('total_price'),
+            recent_revenue=Sum('total_price', filter=recent),
+        )
+        total_orders = order_totals['total_orders'] or 0
+        recent_orders = order_totals['recent_orders'] or 0
+        total_revenue = order_totals['total_revenue'] or 0
+        recent_revenue = order_totals['recent_revenue'] or 0
 
         # Active clients for this department (clients with at least one order)
-        active_clients = User.objects.filter(
-            role='client',
-            orders__service__department_id=department_id
-        ).distinct().count()
+        active_clients = department_rollups.filter(
+            client__role='client'
+        ).values('client_id').distinct().count()
 
         # Orders by status for this department
-        orders_by_status = department_orders.values('status').annotate(
-            count=Count('id')
-        )
+        orders_by_status = department_rollups.values('status').annotate(
+            count=Sum('order_count')
+        ).order_by()
 
         # Services in this department with their performance
         services_performance = Service.objects.filter(
             department_id=department_id
         ).annotate(
-            total_orders=Count('orders'),
-            total_revenue=Sum('orders__price'),
-            completed_orders=Count('orders', filter=Q(orders__status='completed')),
-            pending_orders=Count('orders', filter=Q(orders__status='pending')),
+            total_orders=Coalesce(Sum('order_rollups__order_count'), 0),
+            total_revenue=Sum('order_rollups__total_price'),
+            completed_orders=Coalesce(Sum('order_rollups__order_count', filter=Q(order_rollups__status='completed')), 0),
+            pending_orders=Coalesce(Sum('order_rollups__order_count', filter=Q(order_rollups__status='pending')), 0),
         ).values(
             'id', 'title',
             'total_orders', 'total_revenue',
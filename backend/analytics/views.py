@@ -3,9 +3,11 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
 from django.db.models import Sum, Count, Q
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
 from orders.models import Order
+from orders.rollup_models import OrderRollup
 from payments.models import Transaction
 from accounts.models import User
 from services.models import Service, Department
@@ -23,9 +25,14 @@ class DashboardMetricsView(APIView):
         # Date range for recent activity (last 30 days)
         thirty_days_ago = timezone.now() - timedelta(days=30)
 
-        # Total orders
-        total_orders = Order.objects.count()
-        recent_orders = Order.objects.filter(created_at__gte=thirty_days_ago).count()
+        # Order totals come from the pre-aggregated rollups
+        rollups = OrderRollup.objects.all()
+        order_totals = rollups.aggregate(
+            total_orders=Sum('order_count'),
+            recent_orders=Sum('order_count', filter=Q(day__gte=thirty_days_ago.date())),
+        )
+        total_orders = order_totals['total_orders'] or 0
+        recent_orders = order_totals['recent_orders'] or 0
 
         # Total revenue
         total_revenue = Transaction.objects.aggregate(
@@ -37,23 +44,30 @@ class DashboardMetricsView(APIView):
         ).aggregate(total=Sum('amount'))['total'] or 0
 
         # Active clients (clients with at least one order)
-        active_clients = User.objects.filter(
-            role='client',
-            orders__isnull=False
-        ).distinct().count()
+        active_clients = rollups.filter(
+            client__role='client'
+        ).values('client_id').distinct().count()
 
         # Orders by status
-        orders_by_status = Order.objects.values('status').annotate(
-            count=Count('id')
-        )
+        orders_by_status = rollups.values('status').annotate(
+            count=Sum('order_count')
+        ).order_by()
 
         # Revenue by department
-        revenue_by_department = Order.objects.values(
-            'service__department__title'
+        revenue_by_department = rollups.values(
+            'department__title'
         ).annotate(
-            revenue=Sum('price'),
-            order_count=Count('id')
+            revenue=Sum('total_price'),
+            order_count=Sum('order_count')
         ).order_by('-revenue')[:5]  # Top 5 departments
+        revenue_by_department = [
+            {
+                'service__department__title': row['department__title'],
+                'revenue': row['revenue'],
+                'order_count': row['order_count'],
+            }
+            for row in revenue_by_department
+        ]
 
         # Recent orders (last 10)
         recent_orders_data = Order.objects.select_related(
@@ -178,25 +192,26 @@ class ServiceHeadMetricsView(APIView):
         
         # Filter orders by department services
         department_orders = Order.objects.filter(service__in=department_services)
+        department_rollups = OrderRollup.objects.filter(department=department)
         
         # Date range for recent activity (last 30 days)
         thirty_days_ago = timezone.now() - timedelta(days=30)
+        recent = Q(day__gte=thirty_days_ago.date())
         
-        # Total orders
-        total_orders = department_orders.count()
-        recent_orders_count = department_orders.filter(created_at__gte=thirty_days_ago).count()
-        
-        # Total revenue from department orders
-        total_revenue = department_orders.aggregate(
-            total=Sum('price')
-        )['total'] or 0
-        
-        recent_revenue = department_orders.filter(
-            created_at__gte=thirty_days_ago
-        ).aggregate(total=Sum('price'))['total'] or 0
+        # Order and revenue totals from the pre-aggregated rollups
+        order_totals = department_rollups.aggregate(
+            total_orders=Sum('order_count'),
+            recent_orders=Sum('order_count', filter=recent),
+            total_revenue=Sum('total_price'),
+            recent_revenue=Sum('total_price', filter=recent),
+        )
+        total_orders = order_totals['total_orders'] or 0
+        recent_orders_count = order_totals['recent_orders'] or 0
+        total_revenue = order_totals['total_revenue'] or 0
+        recent_revenue = order_totals['recent_revenue'] or 0
         
         # Active clients (unique clients with orders in this department)
-        active_clients = department_orders.values('client').distinct().count()
+        active_clients = department_rollups.values('client_id').distinct().count()
         
         # Team members in department
         team_members = User.objects.filter(
@@ -208,9 +223,9 @@ class ServiceHeadMetricsView(APIView):
         services_count = department_services.filter(is_active=True).count()
         
         # Orders by status
-        orders_by_status = department_orders.values('status').annotate(
-            count=Count('id')
-        )
+        orders_by_status = department_rollups.values('status').annotate(
+            count=Sum('order_count')
+        ).order_by()
         
         # Recent orders (last 10)
         recent_orders_data = department_orders.select_related(
@@ -222,8 +237,8 @@ class ServiceHeadMetricsView(APIView):
         
         # Services performance
         services_performance = department_services.annotate(
-            total_orders=Count('orders'),
-            total_revenue=Sum('orders__price')
+            total_orders=Coalesce(Sum('order_rollups__order_count'), 0),
+            total_revenue=Sum('order_rollups__total_price')
         ).values(
             'id', 'title', 'total_orders', 'total_revenue'
         ).order_by('-total_revenue')
@@ -68,6 +68,8 @@ REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": (
         "rest_framework.renderers.JSONRenderer",
     ),
+    # Keyset pagination on (created_at, id), when the client asks for pages; see utils/pagination.py
+    "DEFAULT_PAGINATION_CLASS": "utils.pagination.DefaultPagination",
 }
 
 SIMPLE_JWT = {
@@ -262,6 +264,11 @@ DATABASES = {
     }
 }
 
+# File-backed SQLite test database: the default in-memory one fails
+# concurrent writers immediately instead of letting them wait
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    DATABASES["default"]["TEST"] = {"NAME": str(BASE_DIR / "test_db.sqlite3")}
+
 # Override with DATABASE_URL if provided (for Docker/Railway)
 if os.getenv('DATABASE_URL'):
     DATABASES['default'] = dj_database_url.config(
@@ -410,6 +417,26 @@ COMPANY_TAX_ID = os.getenv("COMPANY_TAX_ID", "")
 # Base URL for WeasyPrint (used for loading assets in PDFs)
 WEASYPRINT_BASEURL = os.getenv("WEASYPRINT_BASEURL", "http://localhost:8000")
 
+# PDF download proxy: local LRU cache of PDFs fetched from storage
+PDF_DOWNLOAD_CACHE_DIR = os.getenv("PDF_DOWNLOAD_CACHE_DIR", str(BASE_DIR / "cache" / "pdf_downloads"))
+PDF_DOWNLOAD_CACHE_MAX_BYTES = int(os.getenv("PDF_DOWNLOAD_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PDF_DOWNLOAD_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+# Shared HTTP client for gateways, OAuth providers and storage (see utils/http_client.py)
+HTTP_CLIENT_TIMEOUT = (5, 15)  # (connect, read) seconds, unless a call passes its own
+HTTP_CLIENT_RETRIES = int(os.getenv("HTTP_CLIENT_RETRIES", "2"))
+HTTP_CLIENT_BACKOFF = 0.3  # seconds; doubled per retry, plus up to this much jitter
+HTTP_CLIENT_POOL_HOSTS = 10
+HTTP_CLIENT_POOL_SIZE = 16
+
+# Where generated PDFs are stored (see utils/document_storage.py):
+# utils.dropbox_service.DropboxService, utils.document_storage.LocalFileSystemStorage
+# or utils.document_storage.InMemoryStorage (tests and benchmarks)
+PDF_STORAGE_BACKEND = os.getenv("PDF_STORAGE_BACKEND", "utils.dropbox_service.DropboxService")
+PDF_STORAGE_LOCAL_ROOT = os.getenv("PDF_STORAGE_LOCAL_ROOT", str(BASE_DIR / "documents"))
+# Public base URL of this API, used in links to locally stored documents
+PDF_STORAGE_PUBLIC_URL = os.getenv("PDF_STORAGE_PUBLIC_URL", "http://localhost:8000")
+
 # ============================================
 # IMPORT SECURITY SETTINGS
 # ============================================
@@ -20,6 +20,7 @@ class BlogViewSet(viewsets.ModelViewSet):
     """
     queryset = Blog.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = None  # display-ordered catalog, returned whole
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'is_featured', 'is_published', 'author']
     search_fields = ['title', 'excerpt', 'content', 'tags']
@@ -24,6 +24,7 @@ class ServiceFormViewSet(viewsets.ModelViewSet):
     """
     queryset = ServiceForm.objects.all()
     serializer_class = ServiceFormSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     
     def get_permissions(self):
         # Allow public access to retrieve, list, and submit actions
@@ -203,6 +204,7 @@ class ServiceFormFieldViewSet(viewsets.ModelViewSet):
     """
     queryset = ServiceFormField.objects.all()
     serializer_class = ServiceFormFieldSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [IsAdminOrServiceHead]
     
     def get_queryset(self):
@@ -28,6 +28,9 @@ class Media(models.Model):
     class Meta:
         db_table = 'media'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.file_name or 'Media'} ({self.media_type})"
@@ -17,6 +17,7 @@ class MediaViewSet(viewsets.ModelViewSet):
     filterset_fields = ['media_type', 'owner', 'project', 'service']
     search_fields = ['caption', 'file_name']
     ordering_fields = ['created_at', 'id', 'file_size']
+    ordering = ['-created_at', '-id']
     
     def get_queryset(self):
         queryset = super().get_queryset()
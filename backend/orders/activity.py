@@ -0,0 +1,149 @@
+# orders/activity.py
+"""
+Writers for the ActivityEvent feed.
+
+Each event is fanned out to every scope that can see its order (see
+orders.dashboard.get_order_scopes), so reading a dashboard feed is a single
+index range scan.
+
+Status changes are recorded inside the transaction that makes them, next to
+OrderStatusHistory, so a failure rolls the change back with its history.
+Other events are best effort: failures are logged and never break the
+calling workflow.
+"""
+import logging
+
+from django.db import transaction
+
+from .activity_models import ActivityEvent
+from .dashboard import get_order_scopes
+
+logger = logging.getLogger(__name__)
+
+COMPLETED_STATUSES = ['completed', 'closed', 'payment_done']
+IN_PROGRESS_LABELS = {
+    'in_progress': '0%',
+    '25_done': '25%',
+    '50_done': '50%',
+    '75_done': '75%',
+}
+
+
+def describe_order_status(order):
+    """
+    Describe an order's current status for the activity feed.
+
+    Returns:
+        tuple: (activity_status: str, action: str)
+    """
+    if order.status in COMPLETED_STATUSES:
+        return 'completed', f"Order completed: {order.title}"
+    if order.status in IN_PROGRESS_LABELS:
+        return 'in-progress', f"Order in progress ({IN_PROGRESS_LABELS[order.status]}): {order.title}"
+    if order.status == 'pending':
+        return 'pending', f"Order pending approval: {order.title}"
+    return 'pending', f"Order {order.get_status_display()}: {order.title}"
+
+
+def build_activity_events(order, event_type, action, status='pending', actor=None, metadata=None):
+    """Build (unsaved) activity events for an order, one per scope that can see it"""
+    return [
+        ActivityEvent(
+            scope=scope,
+            event_type=event_type,
+            order=order,
+            actor=actor,
+            action=action[:255],
+            project=order.title[:255],
+            status=status,
+            metadata=metadata or {},
+        )
+        for scope in get_order_scopes(order)
+    ]
+
+
+def record_activity(order, event_type, action, status='pending', actor=None, metadata=None):
+    """
+    Append an activity event for an order to every scope that can see it.
+    """
+    try:
+        # Savepoint: a failed insert must not break the caller's transaction
+        with transaction.atomic():
+            ActivityEvent.objects.bulk_create(
+                build_activity_events(order, event_type, action, status, actor, metadata)
+            )
+    except Exception as e:
+        logger.error(f"Failed to record {event_type} activity for order {order.pk}: {e}")
+
+
+def _status_change_events(order, user, from_status):
+    activity_status, action = describe_order_status(order)
+    return build_activity_events(
+        order, 'order_status', action,
+        status=activity_status,
+        actor=user,
+        metadata={'from_status': from_status, 'to_status': order.status},
+    )
+
+
+def record_status_change(order, user, from_status):
+    """
+    Record an order status transition. Call inside the transaction that
+    changes the status; errors propagate so the change rolls back.
+    """
+    ActivityEvent.objects.bulk_create(_status_change_events(order, user, from_status))
+
+
+def record_status_changes(changes, user):
+    """
+    Record several order status transitions with a single insert, inside
+    the transaction that changes them (errors propagate, as above).
+
+    Args:
+        changes: list of (order, from_status) tuples
+        user: User who made the changes
+    """
+    ActivityEvent.objects.bulk_create([
+        event
+        for order, from_status in changes
+        for event in _status_change_events(order, user, from_status)
+    ])
+
+
+def record_payment(order, payment_order, transaction_id=None):
+    """Record a successful payment"""
+    record_activity(
+        order, 'payment',
+        f"Payment received ({payment_order.currency} {payment_order.amount}): {order.title}",
+        status='completed',
+        actor=payment_order.user,
+        metadata={
+            'payment_order_id': payment_order.id,
+            'transaction_id': transaction_id,
+            'amount': str(payment_order.amount),
+        },
+    )
+
+
+def record_task_assigned(task, actor=None):
+    """Record a task being assigned to a team member"""
+    assignee = task.assignee
+    name = assignee.get_full_name() or assignee.email
+    record_activity(
+        task.order, 'task_assigned',
+        f"Task assigned to {name}: {task.title}",
+        status='in-progress',
+        actor=actor,
+        metadata={'task_id': task.id, 'assignee_id': assignee.id},
+    )
+
+
+def record_deliverable(order, deliverable, actor=None):
+    """Record a deliverable upload"""
+    record_activity(
+        order, 'deliverable',
+        f"Deliverable uploaded ({deliverable.get('filename', 'file')}): {order.title}",
+        status='completed',
+        actor=actor,
+        metadata={'url': deliverable.get('url'), 'filename': deliverable.get('filename')},
+    )
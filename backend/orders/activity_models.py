@@ -0,0 +1,62 @@
+# orders/activity_models.py
+from django.db import models
+from django.utils import timezone
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only activity feed entry.
+
+    One row is written per visibility scope ('all', 'client:<id>',
+    'department:<id>') so each dashboard reads its feed with a single
+    index range scan on (scope, timestamp).
+    """
+    EVENT_TYPES = [
+        ("order_status", "Order Status Change"),
+        ("payment", "Payment Received"),
+        ("task_assigned", "Task Assigned"),
+        ("deliverable", "Deliverable Uploaded"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("in-progress", "In Progress"),
+        ("completed", "Completed"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    scope = models.CharField(max_length=50)
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPES)
+
+    # Events outlive their order; the display fields below keep the text
+    order = models.ForeignKey(
+        "orders.Order",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="activity_events"
+    )
+    actor = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="activity_events"
+    )
+
+    # Denormalised display fields so the feed needs no joins
+    action = models.CharField(max_length=255)
+    project = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    metadata = models.JSONField(default=dict, blank=True)
+
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "activity_events"
+        indexes = [
+            models.Index(fields=["scope", "-timestamp", "-id"]),
+        ]
+
+    def __str__(self):
+        return f"[{self.scope}] {self.action}"
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from .models import Offer, Order, Review
 from .estimation_models import Estimation, Invoice
+from .pdf_job_models import PDFRenderJob
 
 
 @admin.register(Offer)
@@ -46,4 +47,5 @@ class OfferAdmin(admin.ModelAdmin):
 admin.site.register(Review)
 admin.site.register(Order)
 admin.site.register(Estimation)
-admin.site.register(Invoice)
\ No newline at end of file
+admin.site.register(Invoice)
+admin.site.register(PDFRenderJob)
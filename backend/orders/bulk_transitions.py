@@ -0,0 +1,157 @@
+# orders/bulk_transitions.py
+"""
+Bulk order status transitions.
+
+Moving N orders costs a fixed number of queries: the orders are locked and
+read once, every valid transition is applied with a single
+UPDATE ... SET status = CASE id WHEN ... END, and the status history,
+notifications and activity events are written with bulk_create. Rollups
+and dashboard caches are adjusted explicitly since queryset.update() does
+not send Order signals.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Case, CharField, Value, When
+from django.utils import timezone
+
+from .models import Order
+from .workflow import OrderWorkflow
+from .workflow_models import OrderStatusHistory
+from .activity import record_status_changes
+from .dashboard import invalidate_dashboard_stats
+from .rollups import get_rollup_state, move_rollups
+from notifications.models import Notification
+from accounts.models import User
+
+logger = logging.getLogger(__name__)
+
+MAX_BULK_TRANSITIONS = 200
+
+
+def bulk_transition_orders(transitions, user, department=None):
+    """
+    Apply several status transitions at once.
+
+    Args:
+        transitions: list of dicts with order_id, new_status and optional notes
+        user: User making the changes
+        department: If given, only orders for services in this department may change
+
+    Returns:
+        tuple: (updated: list of Order, failures: list of {'order_id', 'error'})
+    """
+    failures = []
+    requested = {}
+    for item in transitions:
+        order_id = item['order_id']
+        if order_id in requested:
+            failures.append({'order_id': order_id, 'error': 'Duplicate order in request'})
+            continue
+        requested[order_id] = item
+
+    with transaction.atomic():
+        orders = {
+            order.id: order
+            for order in Order.objects.select_for_update(of=('self',))
+            .select_related('service', 'client')
+            .filter(id__in=requested)
+        }
+
+        changes = []
+        for order_id, item in requested.items():
+            order = orders.get(order_id)
+            if order is None:
+                failures.append({'order_id': order_id, 'error': 'Order not found'})
+                continue
+
+            if department is not None and order.service.department_id != department.id:
+                failures.append({
+                    'order_id': order_id,
+                    'error': 'You can only update orders for services in your department',
+                })
+                continue
+
+            is_valid, error_msg = OrderWorkflow.validate_transition(order.status, item['new_status'])
+            if not is_valid:
+                failures.append({'order_id': order_id, 'error': error_msg})
+                continue
+
+            changes.append((order, item))
+
+        if not changes:
+            return [], failures
+
+        now = timezone.now()
+        Order.objects.filter(id__in=[order.id for order, _ in changes]).update(
+            status=Case(
+                *[When(id=order.id, then=Value(item['new_status'])) for order, item in changes],
+                output_field=CharField(),
+            ),
+            status_updated_at=now,
+            status_updated_by=user,
+        )
+
+        moves = []
+        history = []
+        activity = []
+        for order, item in changes:
+            previous = get_rollup_state(order)
+            old_status = order.status
+            order.status = item['new_status']
+            order.status_updated_at = now
+            order.status_updated_by = user
+            moves.append((previous, get_rollup_state(order)))
+            history.append(OrderStatusHistory(
+                order=order,
+                from_status=old_status,
+                to_status=order.status,
+                changed_by=user,
+                notes=item.get('notes', ''),
+            ))
+            activity.append((order, old_status))
+
+        OrderStatusHistory.objects.bulk_create(history)
+        record_status_changes(activity, user)
+        Notification.objects.bulk_create(_build_notifications([order for order, _ in changes]))
+
+        try:
+            move_rollups(moves)
+        except Exception as e:
+            logger.error(f"Failed to update rollups for bulk status change: {e}")
+
+    updated = [order for order, _ in changes]
+    invalidate_dashboard_stats(*updated)
+    return updated, failures
+
+
+def _build_notifications(orders):
+    """Client notifications for every order, plus admin notifications for payments"""
+    status_labels = dict(Order.STATUS_CHOICES)
+    notifications = [
+        Notification(
+            user=order.client,
+            title="Order Status Updated",
+            message=f"Order #{order.id} status has been updated to: {status_labels.get(order.status, order.status)}",
+            notification_type="order_update",
+            order=order,
+        )
+        for order in orders
+        if order.client_id
+    ]
+
+    paid = [order for order in orders if order.status == 'payment_done']
+    if paid:
+        for admin in User.objects.filter(role='admin'):
+            notifications.extend(
+                Notification(
+                    user=admin,
+                    title="Payment Received",
+                    message=f"Payment received for Order #{order.id}",
+                    notification_type="payment_received",
+                    order=order,
+                )
+                for order in paid
+            )
+
+    return notifications
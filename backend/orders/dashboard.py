@@ -0,0 +1,166 @@
+# orders/dashboard.py
+"""
+Dashboard statistics for orders.
+
+All counters are computed with a single conditional-aggregation query over
+the order rollups and cached per role scope (all orders, one client, or one
+department). The cache is invalidated from orders/signals.py whenever an
+Order is saved.
+"""
+import logging
+
+from django.core.cache import cache
+from django.db.models import F, Q, Sum
+
+from accounts.utils import get_user_department
+from .rollup_models import OrderRollup
+from .workflow import OrderWorkflow
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ['in_progress', '25_done', '50_done', '75_done']
+COMPLETED_STATUSES = ['completed', 'closed', 'payment_done', 'delivered']
+
+DASHBOARD_STATS_CACHE_TIMEOUT = 300  # 5 minutes
+DASHBOARD_STATS_CACHE_KEY = "orders:dashboard_stats:{scope}"
+
+
+def get_user_scope(user):
+    """
+    Resolve which orders a user can see, as a scope key.
+
+    Returns:
+        str or None: 'all', 'client:<id>', 'department:<id>', or None when
+        the user can see no orders.
+    """
+    if user.role == 'admin':
+        return 'all'
+
+    if user.role == 'client':
+        return f'client:{user.id}'
+
+    if user.role in ['service_head', 'team_member']:
+        department = get_user_department(user)
+        if department:
+            return f'department:{department.id}'
+
+    return None
+
+
+def get_order_scope(user):
+    """
+    Resolve the order rollups visible to a user on the dashboard.
+
+    Returns:
+        tuple: (scope: str or None, queryset: OrderRollup QuerySet)
+        scope is None when the user can see no orders.
+    """
+    scope = get_user_scope(user)
+    if scope is None:
+        return None, OrderRollup.objects.none()
+
+    kind, _, value = scope.partition(':')
+    if kind == 'client':
+        return scope, OrderRollup.objects.filter(client_id=value)
+    if kind == 'department':
+        return scope, OrderRollup.objects.filter(department_id=value)
+    return scope, OrderRollup.objects.all()
+
+
+def get_order_scopes(order):
+    """Return every dashboard scope an order contributes to"""
+    scopes = ['all']
+    if order.client_id:
+        scopes.append(f'client:{order.client_id}')
+
+    department_id = None
+    try:
+        department_id = order.service.department_id
+    except Exception:
+        pass
+    if department_id:
+        scopes.append(f'department:{department_id}')
+
+    return scopes
+
+
+def compute_dashboard_stats(rollups):
+    """
+    Compute dashboard statistics for a queryset of order rollups in one query.
+    """
+    progress = OrderWorkflow.progress_percentage_expression()
+    active = Q(status__in=ACTIVE_STATUSES)
+
+    totals = rollups.aggregate(
+        total_orders=Sum('order_count'),
+        active_orders=Sum('order_count', filter=active),
+        completed_orders=Sum('order_count', filter=Q(status__in=COMPLETED_STATUSES)),
+        pending_orders=Sum('order_count', filter=Q(status='pending')),
+        total_spent=Sum('total_price'),
+        total_paid=Sum('total_paid'),
+        total_progress=Sum(F('order_count') * progress, filter=active),
+    )
+
+    active_orders = totals['active_orders'] or 0
+    total_spent = float(totals['total_spent'] or 0)
+    total_paid = float(totals['total_paid'] or 0)
+
+    return {
+        'total_orders': totals['total_orders'] or 0,
+        'active_orders': active_orders,
+        'completed_orders': totals['completed_orders'] or 0,
+        'pending_orders': totals['pending_orders'] or 0,
+        'total_spent': total_spent,
+        'total_paid': total_paid,
+        'pending_payments': total_spent - total_paid,
+        'avg_progress': (totals['total_progress'] or 0) // active_orders if active_orders else 0,
+    }
+
+
+def get_dashboard_stats(user):
+    """
+    Get (cached) dashboard statistics for the orders visible to a user.
+    """
+    scope, rollups = get_order_scope(user)
+    if scope is None:
+        return compute_dashboard_stats(rollups)
+
+    cache_key = DASHBOARD_STATS_CACHE_KEY.format(scope=scope)
+    try:
+        stats = cache.get(cache_key)
+    except Exception as e:
+        logger.warning(f"Dashboard stats cache read failed: {e}")
+        stats = None
+
+    if stats is None:
+        stats = compute_dashboard_stats(rollups)
+        try:
+            cache.set(cache_key, stats, DASHBOARD_STATS_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Dashboard stats cache write failed: {e}")
+
+    return stats
+
+
+def get_rollup_key_scopes(key):
+    """Return every dashboard scope of an order with the given rollup key"""
+    scopes = ['all']
+    if key.get('client_id'):
+        scopes.append(f"client:{key['client_id']}")
+    if key.get('department_id'):
+        scopes.append(f"department:{key['department_id']}")
+    return scopes
+
+
+def invalidate_dashboard_stats(*orders, extra_scopes=()):
+    """
+    Drop cached dashboard statistics for every scope containing the orders,
+    plus extra_scopes (e.g. the scopes an order was in before it moved).
+    """
+    scopes = {scope for order in orders for scope in get_order_scopes(order)}
+    scopes.update(extra_scopes)
+    keys = [DASHBOARD_STATS_CACHE_KEY.format(scope=scope) for scope in scopes]
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.warning(f"Dashboard stats cache invalidation failed: {e}")
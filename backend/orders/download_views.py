@@ -1,21 +1,25 @@
 # orders/download_views.py
+import logging
 
 import requests
-from django.http import FileResponse, HttpResponse
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from utils.document_storage import get_document_storage, load_document_token
+from utils.pdf_proxy import UpstreamError, proxy_pdf_download, serve_file
 from .estimation_models import Estimation, Invoice
 
+logger = logging.getLogger(__name__)
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def download_estimation_pdf(request, estimation_id):
     """
     Download estimation PDF with proper headers
-    Proxies the Cloudinary URL to handle CORS and force download
+    Proxies the storage URL to handle CORS and force download
     """
     try:
         estimation = Estimation.objects.get(id=estimation_id)
@@ -34,37 +38,36 @@ def download_estimation_pdf(request, estimation_id):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Fetch PDF from Cloudinary - DO NOT use stream=True
-        # Using stream=True with .content can cause corruption
-        pdf_response = requests.get(estimation.pdf_url)
-        
-        if pdf_response.status_code != 200:
-            return Response(
-                {'error': 'Failed to fetch PDF from storage'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
-        # Verify we got actual PDF content
-        content_type = pdf_response.headers.get('Content-Type', '')
-        if 'application/pdf' not in content_type and 'application/octet-stream' not in content_type:
-            return Response(
-                {'error': f'Invalid content type: {content_type}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
-        # Create response with proper headers
-        response = HttpResponse(pdf_response.content, content_type='application/pdf')
-        filename = f"estimation_{estimation.uuid}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['Content-Length'] = len(pdf_response.content)
-        
-        return response
+        # Stream from storage (or the local download cache), honouring Range requests
+        return proxy_pdf_download(
+            estimation.pdf_url,
+            f"estimation_{estimation.uuid}.pdf",
+            range_header=request.META.get('HTTP_RANGE'),
+            file_path=estimation.pdf_file_path,
+        )
         
     except Estimation.DoesNotExist:
         return Response(
             {'error': 'Estimation not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+    except UpstreamError as e:
+        logger.error(f"Failed to fetch PDF from storage: {e}")
+        return Response(
+            {'error': 'Failed to fetch PDF from storage'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    except requests.Timeout:
+        return Response(
+            {'error': 'Timed out fetching PDF from storage'},
+            status=status.HTTP_504_GATEWAY_TIMEOUT
+        )
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch PDF from storage: {e}")
+        return Response(
+            {'error': 'Failed to fetch PDF from storage'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -77,7 +80,7 @@ def download_estimation_pdf(request, estimation_id):
 def download_invoice_pdf(request, invoice_id):
     """
     Download invoice PDF with proper headers
-    Proxies the Cloudinary URL to handle CORS and force download
+    Proxies the storage URL to handle CORS and force download
     """
     try:
         invoice = Invoice.objects.get(id=invoice_id)
@@ -96,39 +99,56 @@ def download_invoice_pdf(request, invoice_id):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Fetch PDF from Cloudinary - DO NOT use stream=True
-        # Using stream=True with .content can cause corruption
-        pdf_response = requests.get(invoice.pdf_url)
-        
-        if pdf_response.status_code != 200:
-            return Response(
-                {'error': 'Failed to fetch PDF from storage'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
-        # Verify we got actual PDF content
-        content_type = pdf_response.headers.get('Content-Type', '')
-        if 'application/pdf' not in content_type and 'application/octet-stream' not in content_type:
-            return Response(
-                {'error': f'Invalid content type: {content_type}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
-        # Create response with proper headers
-        response = HttpResponse(pdf_response.content, content_type='application/pdf')
-        filename = f"invoice_{invoice.invoice_number}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['Content-Length'] = len(pdf_response.content)
-        
-        return response
+        # Stream from storage (or the local download cache), honouring Range requests
+        return proxy_pdf_download(
+            invoice.pdf_url,
+            f"invoice_{invoice.invoice_number}.pdf",
+            range_header=request.META.get('HTTP_RANGE'),
+            file_path=invoice.pdf_file_path,
+        )
         
     except Invoice.DoesNotExist:
         return Response(
             {'error': 'Invoice not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+    except UpstreamError as e:
+        logger.error(f"Failed to fetch PDF from storage: {e}")
+        return Response(
+            {'error': 'Failed to fetch PDF from storage'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    except requests.Timeout:
+        return Response(
+            {'error': 'Timed out fetching PDF from storage'},
+            status=status.HTTP_504_GATEWAY_TIMEOUT
+        )
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch PDF from storage: {e}")
+        return Response(
+            {'error': 'Failed to fetch PDF from storage'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def download_stored_document(request, token):
+    """
+    Serve a document kept in local or in-memory document storage
+    The signed token in the link is the access check, as with Dropbox shared links
+    """
+    file_path = load_document_token(token)
+    stored = get_document_storage().open_file(file_path) if file_path else None
+    if stored is None:
+        return Response(
+            {'error': 'Document not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return serve_file(stored, file_path.rsplit('/', 1)[-1], request.META.get('HTTP_RANGE'))
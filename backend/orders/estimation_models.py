@@ -1,5 +1,6 @@
 # orders/estimation_models.py
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import F
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
@@ -373,18 +374,9 @@ class Invoice(models.Model):
         # Generate invoice number if not exists
         if not self.invoice_number:
             # Format: INV-YYYYMMDD-XXXX
-            today = timezone.now().strftime("%Y%m%d")
-            last_invoice = Invoice.objects.filter(
-                invoice_number__startswith=f"INV-{today}"
-            ).order_by("-invoice_number").first()
-            
-            if last_invoice:
-                last_num = int(last_invoice.invoice_number.split("-")[-1])
-                new_num = last_num + 1
-            else:
-                new_num = 1
-            
-            self.invoice_number = f"INV-{today}-{new_num:04d}"
+            today = timezone.now()
+            new_num = InvoiceNumberCounter.allocate(today.date())
+            self.invoice_number = f"INV-{today.strftime('%Y%m%d')}-{new_num:04d}"
         
         # Auto-calculate totals
         self.calculate_totals()
@@ -409,3 +401,42 @@ class Invoice(models.Model):
         if self.due_date and self.status not in ["paid", "cancelled"]:
             return timezone.now().date() > self.due_date
         return False
+
+
+class InvoiceNumberCounter(models.Model):
+    """
+    Last invoice number handed out per day (the XXXX in INV-YYYYMMDD-XXXX).
+
+    Numbers are allocated with one atomic increment, so concurrent invoice
+    creation never collides. A number is not reused if its invoice fails to
+    save, so the sequence may have gaps.
+    """
+    day = models.DateField(primary_key=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "invoice_number_counters"
+
+    def __str__(self):
+        return f"{self.day}: {self.last_number}"
+
+    @classmethod
+    def allocate(cls, day):
+        """Increment the counter for day and return the new number"""
+        if connection.vendor in ("postgresql", "sqlite"):
+            # Single round trip: create-or-increment returning the new value
+            table = connection.ops.quote_name(cls._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} (day, last_number) VALUES (%s, 1) "
+                    f"ON CONFLICT (day) DO UPDATE SET last_number = {table}.last_number + 1 "
+                    f"RETURNING last_number",
+                    [day]
+                )
+                return cursor.fetchone()[0]
+
+        # Other databases: the UPDATE locks the row until the read below
+        with transaction.atomic():
+            cls.objects.get_or_create(day=day)
+            cls.objects.filter(day=day).update(last_number=F("last_number") + 1)
+            return cls.objects.values_list("last_number", flat=True).get(day=day)
@@ -1,4 +1,6 @@
 # orders/estimation_views.py
+import logging
+
 from rest_framework import status, viewsets, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -14,9 +16,12 @@ from .estimation_serializers import (
     EstimationSerializer, EstimationCreateSerializer,
     InvoiceSerializer, InvoiceGenerateSerializer
 )
-from .pdf_generators import EstimationPDFGenerator, InvoicePDFGenerator
+from .pdf_job_models import PDFRenderJob
+from .pdf_jobs import enqueue_pdf_render, serialize_pdf_job
 from notifications.models import Notification
 
+logger = logging.getLogger(__name__)
+
 
 class EstimationViewSet(viewsets.ModelViewSet):
     """
@@ -104,17 +109,12 @@ def order_estimations(request, order_id):
             if serializer.is_valid():
                 estimation = serializer.save(created_by=user)
                 
-                # Generate PDF is handled downstream but we can wrap it here too just in case
-                # The serializer.save() triggers signal or logic or explicit call?
-                # In the original code, PDF generation was explicit here:
-                
-                # Generate PDF
+                # Render the PDF in the background; pdf_url is filled in when the job finishes
                 try:
-                    pdf_generator = EstimationPDFGenerator(estimation)
-                    pdf_generator.upload_to_dropbox()
+                    enqueue_pdf_render('estimation', estimation.id, user)
                 except Exception as e:
                     # Log but don't fail the request
-                    print(f"PDF generation failed: {e}")
+                    logger.warning(f"PDF render could not be queued for estimation {estimation.id}: {e}")
                 
                 return Response(EstimationSerializer(estimation).data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -155,37 +155,22 @@ def generate_estimation_pdf(request, estimation_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Generate and upload PDF
+        # Queue the PDF render; clients poll the job until pdf_url is set
         try:
-            logger.info("Creating PDF generator...")
-            pdf_generator = EstimationPDFGenerator(estimation)
-            
-            logger.info("Uploading to Cloudinary...")
-            result = pdf_generator.upload_to_dropbox()
-            
-            # Save PDF URL and file path to estimation
-            estimation.pdf_url = result['download_url']
-            estimation.pdf_file_path = result['file_path']
-            estimation.save(update_fields=['pdf_url', 'pdf_file_path'])
-            
-            logger.info(f"PDF generated successfully: {result['download_url']}")
+            job = enqueue_pdf_render('estimation', estimation.id, user)
+            if job.status == 'succeeded':
+                # Content unchanged since the last render; the stored PDF is current
+                return Response({
+                    'success': True,
+                    'message': 'PDF is up to date',
+                    **serialize_pdf_job(job)
+                }, status=status.HTTP_200_OK)
+            logger.info(f"Queued PDF render job {job.uuid} for estimation {estimation_id}")
             return Response({
                 'success': True,
-                'message': 'PDF generated successfully',
-                'pdf_url': result['download_url'],
-                'pdf_file_path': result['file_path']
-            })
-        except RuntimeError as e:
-            # WeasyPrint not available
-            logger.error(f"WeasyPrint RuntimeError: {str(e)}")
-            return Response(
-                {
-                    'error': 'PDF generation is not available',
-                    'message': str(e),
-                    'details': 'WeasyPrint requires GTK+ libraries to be installed on Windows'
-                },
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
-            )
+                'message': 'PDF generation queued',
+                **serialize_pdf_job(job)
+            }, status=status.HTTP_202_ACCEPTED)
         except Exception as e:
             # Log the full traceback
             logger.error(f"Error generating PDF: {str(e)}")
@@ -237,16 +222,15 @@ def send_estimation(request, estimation_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Try to generate PDF if not already generated (optional - won't block if it fails)
+        # Queue the PDF if not already generated (optional - won't block sending)
+        pdf_job = None
         if not estimation.pdf_url:
             try:
-                logger.info(f"Attempting to generate PDF for estimation {estimation_id}")
-                pdf_generator = EstimationPDFGenerator(estimation)
-                pdf_generator.upload_to_dropbox()
-                logger.info("PDF generated successfully")
+                pdf_job = enqueue_pdf_render('estimation', estimation.id, user)
+                logger.info(f"Queued PDF render job {pdf_job.uuid} for estimation {estimation_id}")
             except Exception as e:
                 # Log the error but don't block sending
-                logger.warning(f"PDF generation failed, but continuing to send estimation: {str(e)}")
+                logger.warning(f"PDF render could not be queued, but continuing to send estimation: {str(e)}")
         
         # Update status to sent
         estimation.status = 'sent'
@@ -264,9 +248,10 @@ def send_estimation(request, estimation_id):
         
         return Response({
             'success': True,
-            'message': 'Estimation sent to client successfully' + (' (PDF generation failed - will be available later)' if not estimation.pdf_url else ''),
+            'message': 'Estimation sent to client successfully' + (' (PDF will be available shortly)' if not estimation.pdf_url else ''),
             'estimation': EstimationSerializer(estimation).data,
-            'pdf_generated': bool(estimation.pdf_url)
+            'pdf_generated': bool(estimation.pdf_url),
+            'pdf_job': serialize_pdf_job(pdf_job) if pdf_job else None
         })
     
     except Estimation.DoesNotExist:
@@ -370,23 +355,15 @@ def generate_invoice(request, order_id):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         
-        # Generate PDF
+        # Queue the PDF render; pdf_url is filled in when the job finishes
+        pdf_job = None
         try:
-            logger.info(f"Generating PDF for invoice {invoice.invoice_number}")
-            pdf_generator = InvoicePDFGenerator(invoice)
-            result = pdf_generator.upload_to_dropbox()
-            
-            # Save PDF URL and file path to invoice
-            invoice.pdf_url = result.get('download_url')
-            invoice.pdf_file_path = result.get('file_path')
-            invoice.save(update_fields=['pdf_url', 'pdf_file_path'])
-            
-            logger.info(f"PDF generated and saved successfully: {result.get('download_url')}")
+            pdf_job = enqueue_pdf_render('invoice', invoice.id, user)
+            logger.info(f"Queued PDF render job {pdf_job.uuid} for invoice {invoice.invoice_number}")
         except Exception as e:
-            logger.error(f"PDF generation failed for invoice {invoice.invoice_number}: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            # Don't fail the entire request if PDF generation fails
-            logger.warning("Continuing without PDF - invoice created but PDF generation failed")
+            logger.error(f"Could not queue PDF for invoice {invoice.invoice_number}: {str(e)}")
+            # Don't fail the entire request if the PDF cannot be queued
+            logger.warning("Continuing without PDF - invoice created but PDF render was not queued")
         
         # Send notification to client
         try:
@@ -406,7 +383,8 @@ def generate_invoice(request, order_id):
         return Response({
             'success': True,
             'message': 'Invoice generated successfully',
-            'invoice': InvoiceSerializer(invoice).data
+            'invoice': InvoiceSerializer(invoice).data,
+            'pdf_job': serialize_pdf_job(pdf_job) if pdf_job else None
         }, status=status.HTTP_201_CREATED)
     
     except Order.DoesNotExist:
@@ -454,15 +432,13 @@ def download_invoice(request, invoice_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Generate PDF if not exists
+        # Queue the PDF if not generated yet; the client polls the job for the URL
         if not invoice.pdf_url:
-            logger.info(f"PDF not found for invoice {invoice.invoice_number}, generating now")
+            logger.info(f"PDF not found for invoice {invoice.invoice_number}, queueing render")
             try:
-                pdf_generator = InvoicePDFGenerator(invoice)
-                result = pdf_generator.upload_to_dropbox()
-                logger.info(f"PDF generated successfully: {result.get('download_url')}")
+                job = enqueue_pdf_render('invoice', invoice.id, user)
             except Exception as e:
-                logger.error(f"Failed to generate PDF for invoice {invoice.invoice_number}: {str(e)}")
+                logger.error(f"Failed to queue PDF for invoice {invoice.invoice_number}: {str(e)}")
                 logger.error(f"Traceback: {traceback.format_exc()}")
                 return Response(
                     {
@@ -471,6 +447,11 @@ def download_invoice(request, invoice_id):
                     },
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
+            return Response({
+                'pdf_url': None,
+                'invoice_number': invoice.invoice_number,
+                'pdf_job': serialize_pdf_job(job)
+            }, status=status.HTTP_202_ACCEPTED)
         
         # Return PDF URL for download
         logger.info(f"Returning PDF URL for invoice {invoice.invoice_number}")
@@ -523,37 +504,22 @@ def generate_invoice_pdf(request, invoice_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Generate and upload PDF
+        # Queue the PDF render; clients poll the job until pdf_url is set
         try:
-            logger.info(f"Creating PDF generator for invoice {invoice.invoice_number}")
-            pdf_generator = InvoicePDFGenerator(invoice)
-            
-            logger.info("Uploading to Dropbox...")
-            result = pdf_generator.upload_to_dropbox()
-            
-            # Save PDF URL and file path to invoice
-            invoice.pdf_url = result.get('download_url')
-            invoice.pdf_file_path = result.get('file_path')
-            invoice.save(update_fields=['pdf_url', 'pdf_file_path'])
-            
-            logger.info(f"PDF generated and saved successfully: {result.get('download_url')}")
+            job = enqueue_pdf_render('invoice', invoice.id, user)
+            if job.status == 'succeeded':
+                # Content unchanged since the last render; the stored PDF is current
+                return Response({
+                    'success': True,
+                    'message': 'PDF is up to date',
+                    **serialize_pdf_job(job)
+                }, status=status.HTTP_200_OK)
+            logger.info(f"Queued PDF render job {job.uuid} for invoice {invoice.invoice_number}")
             return Response({
                 'success': True,
-                'message': 'PDF generated successfully',
-                'pdf_url': result.get('download_url'),
-                'pdf_file_path': result.get('file_path')
-            })
-        except RuntimeError as e:
-            # WeasyPrint not available
-            logger.error(f"WeasyPrint RuntimeError: {str(e)}")
-            return Response(
-                {
-                    'error': 'PDF generation is not available',
-                    'message': str(e),
-                    'details': 'WeasyPrint requires GTK+ libraries to be installed on Windows'
-                },
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
-            )
+                'message': 'PDF generation queued',
+                **serialize_pdf_job(job)
+            }, status=status.HTTP_202_ACCEPTED)
         except Exception as e:
             # Log the full traceback
             logger.error(f"Error generating PDF: {str(e)}")
@@ -583,3 +549,37 @@ def generate_invoice_pdf(request, invoice_id):
             },
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def pdf_job_status(request, job_id):
+    """
+    Poll a background PDF render job
+    GET /api/orders/pdf-jobs/<job_uuid>/
+    """
+    try:
+        job = PDFRenderJob.objects.get(uuid=job_id)
+    except PDFRenderJob.DoesNotExist:
+        return Response(
+            {'error': 'PDF job not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    # Check permissions: staff, the requester, or the client owning the document
+    user = request.user
+    if user.role not in ['admin', 'service_head'] and job.requested_by_id != user.id:
+        if job.document_type == 'estimation':
+            allowed = Estimation.objects.filter(id=job.object_id, order__client=user).exists()
+        elif job.document_type == 'invoice':
+            allowed = Invoice.objects.filter(id=job.object_id, order__client=user).exists()
+        else:
+            from payments.models import Transaction
+            allowed = Transaction.objects.filter(id=job.object_id, user=user).exists()
+        if not allowed:
+            return Response(
+                {'error': 'You do not have permission to view this job'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+    
+    return Response(serialize_pdf_job(job))
@@ -0,0 +1,49 @@
+import gc
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from orders.pdf_benchmark import synthetic_invoice
+from orders.pdf_generators import InvoicePDFGenerator, LINE_ITEM_CHUNK_ROWS
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark InvoicePDFGenerator on invoices with many line items, rendering the items '
+        'as one table (single) and as page-sized chunk tables (chunked). Reports render time, '
+        'peak traced memory and PDF size. Uses unsaved in-memory invoices; nothing is written.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000],
+                            help='Line item counts to render')
+        parser.add_argument('--modes', nargs='+', choices=['single', 'chunked'], default=['single', 'chunked'])
+        parser.add_argument('--chunk-rows', type=int, default=LINE_ITEM_CHUNK_ROWS, help='Rows per chunk table')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'items':>7} {'mode':<8} {'time':>10} {'peak mem':>11} {'pdf':>10}")
+        for size in options['sizes']:
+            invoice = synthetic_invoice(size)
+            for mode in options['modes']:
+                chunk_rows = options['chunk_rows'] if mode == 'chunked' else None
+                elapsed, peak, pdf_size = self.measure(InvoicePDFGenerator(invoice, chunk_rows=chunk_rows))
+                self.stdout.write(
+                    f"{size:>7} {mode:<8} {elapsed:>9.2f}s {peak / 2**20:>8.1f} MiB {pdf_size / 1024:>7.0f} KiB"
+                )
+        self.stdout.write(self.style.SUCCESS('Done.'))
+
+    def measure(self, generator):
+        # Timed and memory-traced separately: tracemalloc slows rendering down several times
+        gc.collect()
+        started = time.perf_counter()
+        pdf = generator.generate()
+        elapsed = time.perf_counter() - started
+
+        del pdf
+        gc.collect()
+        tracemalloc.start()
+        pdf = generator.generate()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak, len(pdf.getvalue())
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.estimation_models import Estimation, Invoice
+from orders.pdf_generators import EstimationPDFGenerator, InvoicePDFGenerator
+from payments.models import Transaction
+from payments.receipt_generator import ReceiptPDFGenerator
+from utils.pdf_assets import clear_pdf_asset_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmark per-PDF render time with a cold style/asset registry '
+        '(rebuilt for every PDF, as before) and a warm, shared one. '
+        'Renders existing estimations/invoices/receipts; nothing is uploaded.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='PDFs rendered per document type and mode')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        documents = [
+            ('estimation', EstimationPDFGenerator, Estimation.objects.select_related('order__service__department', 'order__client').first()),
+            ('invoice', InvoicePDFGenerator, Invoice.objects.select_related('order__service__department', 'order__client').first()),
+            ('receipt', ReceiptPDFGenerator, Transaction.objects.select_related('order', 'user').filter(status='success').first()),
+        ]
+
+        for name, generator_class, document in documents:
+            if document is None:
+                self.stdout.write(self.style.WARNING(f'{name}: no document in the database, skipped'))
+                continue
+
+            generator = generator_class(document)
+            try:
+                cold = self.time_renders(generator, iterations, clear_cache=True)
+                warm = self.time_renders(generator, iterations, clear_cache=False)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'{name} #{document.pk}: render failed: {e}'))
+                continue
+            self.stdout.write(
+                f'{name:<11} cold {cold * 1000:8.2f} ms/PDF   warm {warm * 1000:8.2f} ms/PDF   '
+                f'saved {(cold - warm) * 1000:7.2f} ms ({(1 - warm / cold) * 100:5.1f}%)'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
+
+    def time_renders(self, generator, iterations, clear_cache):
+        # Untimed warm-up so imports and database lookups do not skew the first run
+        generator.generate()
+
+        total = 0.0
+        for _ in range(iterations):
+            if clear_cache:
+                clear_pdf_asset_cache()
+            started = time.perf_counter()
+            generator.generate()
+            total += time.perf_counter() - started
+        return total / iterations
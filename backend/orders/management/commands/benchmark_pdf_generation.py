@@ -0,0 +1,123 @@
+import json
+import multiprocessing
+import platform
+from concurrent.futures import ProcessPoolExecutor
+
+import reportlab
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orders.pdf_benchmark import DOCUMENT_TYPES, SIZED_TYPES, run_case
+from orders.pdf_generators import EstimationPDFGenerator, InvoicePDFGenerator
+from orders.pdf_workers import init_render_worker
+from payments.receipt_generator import ReceiptPDFGenerator
+
+TEMPLATE_VERSIONS = {
+    'estimation': EstimationPDFGenerator.TEMPLATE_VERSION,
+    'invoice': InvoicePDFGenerator.TEMPLATE_VERSION,
+    'receipt': ReceiptPDFGenerator.TEMPLATE_VERSION,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark estimation, invoice and receipt PDF generation on synthetic documents of '
+        'several sizes: p50/p95 render time, peak RSS and PDF size, with uploads going to '
+        'in-memory storage. Writes JSON results with --output and fails on regressions '
+        'against a previous results file with --baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--types', nargs='+', choices=DOCUMENT_TYPES, default=list(DOCUMENT_TYPES))
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 1000],
+                            help='Line item counts for estimations and invoices')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed renders per case')
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--baseline', help='Compare against a JSON file written by --output')
+        parser.add_argument('--threshold', type=float, default=0.20,
+                            help='Allowed p50/p95 slowdown or PDF growth over the baseline (default: 0.20)')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        cases = [
+            (document_type, size)
+            for document_type in options['types']
+            for size in (options['sizes'] if document_type in SIZED_TYPES else [1])
+        ]
+
+        self.stdout.write(
+            f"{'type':<11} {'items':>6} {'p50':>10} {'p95':>10} {'peak rss':>10} {'rss +':>9} {'pdf':>10}"
+        )
+        results = []
+        # One fresh process per case, run one at a time: peak RSS belongs to that
+        # case alone and cases do not compete for CPU
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=init_render_worker,
+                                 max_tasks_per_child=1) as pool:
+            for document_type, size in cases:
+                try:
+                    result = pool.submit(run_case, document_type, size, options['iterations']).result()
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'{document_type} x{size}: failed: {e}'))
+                    continue
+                results.append(result)
+                self.write_row(result)
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'reportlab': reportlab.Version,
+                'platform': platform.platform(),
+                'iterations': options['iterations'],
+                'template_versions': TEMPLATE_VERSIONS,
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            self.compare(report, options['baseline'], options['threshold'])
+        self.stdout.write(self.style.SUCCESS('Done.'))
+
+    def write_row(self, result):
+        items = result['items'] if result['items'] is not None else '-'
+        peak = f"{result['peak_rss_bytes'] / 2**20:.1f} MiB" if result['peak_rss_bytes'] is not None else 'n/a'
+        growth = f"{result['rss_growth_bytes'] / 2**20:.1f} MiB" if result['rss_growth_bytes'] is not None else 'n/a'
+        self.stdout.write(
+            f"{result['type']:<11} {items:>6} {result['p50_ms']:>8.1f}ms {result['p95_ms']:>8.1f}ms "
+            f"{peak:>10} {growth:>9} {result['pdf_bytes'] / 1024:>6.0f} KiB"
+        )
+
+    def compare(self, report, baseline_path, threshold):
+        try:
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read baseline {baseline_path}: {e}')
+
+        previous = {(r['type'], r['items']): r for r in baseline.get('results', [])}
+        regressions = []
+        for result in report['results']:
+            before = previous.get((result['type'], result['items']))
+            if not before:
+                continue
+            for metric in ('p50_ms', 'p95_ms', 'pdf_bytes'):
+                if before[metric] and result[metric] > before[metric] * (1 + threshold):
+                    regressions.append(
+                        f"{result['type']} x{result['items'] or 1} {metric}: "
+                        f"{before[metric]} -> {result[metric]} (+{(result[metric] / before[metric] - 1) * 100:.0f}%)"
+                    )
+
+        if baseline.get('meta', {}).get('template_versions') != TEMPLATE_VERSIONS:
+            self.stdout.write(self.style.WARNING('Template versions differ from the baseline.'))
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(f'  {line}'))
+            raise CommandError(f'{len(regressions)} regressions over {threshold:.0%} against {baseline_path}')
+        self.stdout.write(self.style.SUCCESS(f'No regressions over {threshold:.0%} against {baseline_path}'))
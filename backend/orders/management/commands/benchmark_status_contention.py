@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from accounts.models import User
+from services.models import Department, Service
+from orders.activity_models import ActivityEvent
+from orders.models import Order
+from orders.workflow_models import OrderStatusHistory
+
+# Two statuses that can move back and forth, so writers never run out of work
+STATUS_TOGGLE = {'25_done': '50_done', '50_done': '25_done'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark Order.update_status under contention: N concurrent writers '
+        'toggle the status of a few shared orders. Use a server database '
+        '(PostgreSQL/MySQL); SQLite serialises writers and reports lock errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=20, help='Concurrent writer threads')
+        parser.add_argument('--orders', type=int, default=5, help='Orders the writers compete for')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds to run')
+        parser.add_argument(
+            '--mode', choices=['optimistic', 'locking'], default='optimistic',
+            help='optimistic: conditional UPDATE only; locking: select_for_update first (baseline)'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'SQLite allows a single writer; expect "database is locked" errors.'
+            ))
+
+        tag = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            username=f'bench-{tag}', email=f'bench-{tag}@example.invalid', role='service_head'
+        )
+        department = Department.objects.create(title=f'Benchmark {tag}', slug=f'benchmark-{tag}')
+        service = Service.objects.create(title=f'Benchmark {tag}', slug=f'benchmark-{tag}', department=department)
+        order_ids = [
+            Order.objects.create(
+                client=user, service=service, title=f'Benchmark {tag} #{i}', price=100, status='25_done'
+            ).id
+            for i in range(options['orders'])
+        ]
+
+        try:
+            results = self.run_writers(order_ids, user, options)
+            self.report(order_ids, results, options)
+        finally:
+            # Feed events outlive their order (SET_NULL), so remove them first
+            ActivityEvent.objects.filter(order_id__in=order_ids).delete()
+            Order.objects.filter(id__in=order_ids).delete()
+            service.delete()
+            department.delete()
+            user.delete()
+
+    def run_writers(self, order_ids, user, options):
+        window = {}
+
+        def start_clock():
+            window['started'] = time.monotonic()
+            window['deadline'] = window['started'] + options['duration']
+
+        barrier = threading.Barrier(options['writers'], action=start_clock)
+        results = []
+        lock = threading.Lock()
+
+        def writer():
+            counts = {'committed': 0, 'conflicts': 0, 'errors': 0}
+            try:
+                barrier.wait()
+                while time.monotonic() < window['deadline']:
+                    order_id = random.choice(order_ids)
+                    try:
+                        if options['mode'] == 'locking':
+                            with transaction.atomic():
+                                order = Order.objects.select_for_update().get(pk=order_id)
+                                order.update_status(STATUS_TOGGLE[order.status], user)
+                        else:
+                            order = Order.objects.get(pk=order_id)
+                            order.update_status(STATUS_TOGGLE[order.status], user)
+                        counts['committed'] += 1
+                    except ValueError:
+                        counts['conflicts'] += 1
+                    except Exception:
+                        counts['errors'] += 1
+            finally:
+                connection.close()
+                with lock:
+                    results.append(counts)
+
+        threads = [threading.Thread(target=writer) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - window['started']
+
+        totals = {key: sum(r[key] for r in results) for key in ('committed', 'conflicts', 'errors')}
+        totals['elapsed'] = elapsed
+        return totals
+
+    def report(self, order_ids, results, options):
+        elapsed = results['elapsed']
+        attempts = results['committed'] + results['conflicts'] + results['errors']
+        self.stdout.write(
+            f"mode={options['mode']} writers={options['writers']} orders={options['orders']} "
+            f"elapsed={elapsed:.2f}s"
+        )
+        self.stdout.write(f"  committed: {results['committed']} ({results['committed'] / elapsed:.1f}/s)")
+        self.stdout.write(f"  conflicts: {results['conflicts']}")
+        self.stdout.write(f"  errors:    {results['errors']}")
+        self.stdout.write(f"  attempts:  {attempts} ({attempts / elapsed:.1f}/s)")
+
+        # Every committed transition must have exactly one history row; with
+        # toggling statuses an even count per order means it is back at 25_done
+        history = OrderStatusHistory.objects.filter(order_id__in=order_ids).count()
+        lost = [
+            order.id
+            for order in Order.objects.filter(id__in=order_ids)
+            if (order.status == '25_done') != (order.status_history.count() % 2 == 0)
+        ]
+        if history == results['committed'] and not lost:
+            self.stdout.write(self.style.SUCCESS('No lost updates: history matches committed transitions.'))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f'Inconsistent state: {history} history rows for {results["committed"]} commits, '
+                f'orders out of sync: {lost}'
+            ))
@@ -1,34 +1,25 @@
 from django.core.management.base import BaseCommand
-from orders.models import Order
-from payments.models import Transaction, PaymentOrder
-from django.db.models import Sum, F
-from decimal import Decimal
+
+from payments.ledger import find_balance_drift, reconcile_order_balances
+
 
 class Command(BaseCommand):
-    help = 'Recalculate total_paid for all orders based on successful transactions'
+    help = (
+        'Reconcile total_paid for all orders with the payment ledger. Drift is found with one '
+        'aggregate query and corrected with one set-based UPDATE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the orders that would change')
 
     def handle(self, *args, **options):
-        self.stdout.write('Recalculating order totals...')
-        
-        orders = Order.objects.all()
-        updated_count = 0
-        
-        for order in orders:
-            # Calculate total from successful verified transactions
-            # We use Transaction model as source of truth for "paid money"
-            total_transaction_amount = Transaction.objects.filter(
-                order=order,
-                status='success',
-                is_verified=True
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-            
-            # Also check paid PaymentOrders that might not have transactions (though they should)
-            # This is a fallback but let's stick to transactions first as they represent actual money flow
-            
-            if total_transaction_amount != order.total_paid:
-                self.stdout.write(f'Updating Order #{order.id}: {order.total_paid} -> {total_transaction_amount}')
-                order.total_paid = total_transaction_amount
-                order.save(update_fields=['total_paid'])
-                updated_count += 1
-                
-        self.stdout.write(self.style.SUCCESS(f'Successfully updated {updated_count} orders.'))
+        self.stdout.write('Reconciling order totals with the payment ledger...')
+
+        drift = find_balance_drift() if options['dry_run'] else reconcile_order_balances()
+        for order_id, total_paid, balance in drift:
+            self.stdout.write(f'Order #{order_id}: {total_paid} -> {balance}')
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(drift)} orders would be updated.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Successfully updated {len(drift)} orders.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from orders.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the order rollup tables used by dashboards from the orders table'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding order rollups...')
+        count = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Successfully wrote {count} rollup rows.'))
@@ -0,0 +1,225 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from io import BytesIO
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from orders.pdf_jobs import DOCUMENT_RENDERERS, load_renderer, record_rendered_pdf
+from orders.pdf_workers import init_render_worker, render_document
+from utils.document_storage import get_document_storage
+
+# document_type -> (date lookup for --from/--to, default statuses)
+SELECTIONS = {
+    'estimation': ('created_at__date', None),
+    'invoice': ('invoice_date', None),
+    # Only successful payments have receipts
+    'receipt': ('completed_at__date', ['success']),
+}
+
+# How long an uploader waits for more rendered PDFs to fill its batch
+BATCH_WAIT = 0.5
+
+
+class Command(BaseCommand):
+    help = (
+        'Regenerate estimation, invoice and receipt PDFs in bulk (e.g. after a template change). '
+        'Renders across a process pool, uploads in batches through a bounded queue and can bundle '
+        'every PDF into one zip archive. Documents whose PDF is already up to date are '
+        'skipped unless --force is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', nargs='+', choices=sorted(DOCUMENT_RENDERERS), required=True,
+                            dest='types', help='Document types to regenerate')
+        parser.add_argument('--from', type=date.fromisoformat, dest='date_from',
+                            help='First document date (YYYY-MM-DD)')
+        parser.add_argument('--to', type=date.fromisoformat, dest='date_to',
+                            help='Last document date (YYYY-MM-DD)')
+        parser.add_argument('--status', nargs='+', help='Only documents in these statuses')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Render processes (default: CPU count)')
+        parser.add_argument('--upload-threads', type=int, default=4, help='Concurrent storage uploads')
+        parser.add_argument('--upload-batch', type=int, default=25,
+                            help='PDFs committed to storage per batch upload (one Dropbox batch commit)')
+        parser.add_argument('--queue-size', type=int, default=None,
+                            help='Rendered PDFs waiting for upload before rendering pauses (default: 2 x workers)')
+        parser.add_argument('--zip', dest='archive', help='Also write every PDF into this zip archive')
+        parser.add_argument('--no-upload', action='store_true', help='Do not upload (use with --zip)')
+        parser.add_argument('--force', action='store_true', help='Re-render PDFs that are already up to date')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the selected documents')
+
+    def handle(self, *args, **options):
+        if options['no_upload'] and not options['archive']:
+            raise CommandError('--no-upload only makes sense with --zip')
+        if options['workers'] < 1 or options['upload_threads'] < 1 or options['upload_batch'] < 1:
+            raise CommandError('--workers, --upload-threads and --upload-batch must be at least 1')
+
+        documents = self.select_documents(options)
+        self.stdout.write(f'Selected {len(documents)} documents')
+        if options['dry_run'] or not documents:
+            return
+
+        started = time.monotonic()
+        stats = {'rendered': 0, 'skipped': 0, 'uploaded': 0, 'archived': 0}
+        failures = []
+        lock = threading.Lock()
+
+        uploads = queue.Queue(maxsize=options['queue_size'] or options['workers'] * 2)
+        uploaders = [
+            threading.Thread(target=self.upload_worker,
+                             args=(uploads, options['upload_batch'], stats, failures, lock))
+            for _ in range(options['upload_threads'])
+        ]
+        for thread in uploaders:
+            thread.start()
+
+        archive = zipfile.ZipFile(options['archive'], 'w', zipfile.ZIP_DEFLATED) if options['archive'] else None
+        try:
+            self.render_all(documents, options, uploads, archive, stats, failures, lock)
+        finally:
+            for _ in uploaders:
+                uploads.put(None)
+            for thread in uploaders:
+                thread.join()
+            if archive:
+                archive.close()
+
+        self.report(time.monotonic() - started, stats, failures, options)
+
+    def select_documents(self, options):
+        documents = []
+        for document_type in options['types']:
+            model_label = DOCUMENT_RENDERERS[document_type][0]
+            date_lookup, default_statuses = SELECTIONS[document_type]
+            queryset = apps.get_model(model_label).objects.all()
+            if options['date_from']:
+                queryset = queryset.filter(**{f'{date_lookup}__gte': options['date_from']})
+            if options['date_to']:
+                queryset = queryset.filter(**{f'{date_lookup}__lte': options['date_to']})
+            statuses = options['status'] or default_statuses
+            if statuses:
+                queryset = queryset.filter(status__in=statuses)
+            documents.extend((document_type, pk) for pk in queryset.order_by('pk').values_list('pk', flat=True))
+        return documents
+
+    def render_all(self, documents, options, uploads, archive, stats, failures, lock):
+        # Spawned workers get their own database connections instead of forked copies
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context,
+                                 initializer=init_render_worker) as pool:
+            # Keep a bounded number of renders in flight so memory stays flat
+            in_flight = {}
+            for item in documents:
+                future = pool.submit(render_document, *item, options['force'], bool(archive))
+                in_flight[future] = item
+                if len(in_flight) >= options['workers'] * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.handle_rendered(future, in_flight.pop(future), options, uploads, archive,
+                                             stats, failures, lock)
+            for future in list(in_flight):
+                self.handle_rendered(future, in_flight.pop(future), options, uploads, archive,
+                                     stats, failures, lock)
+
+    def handle_rendered(self, future, item, options, uploads, archive, stats, failures, lock):
+        try:
+            document_type, object_id, content_hash, name, data, current = future.result()
+        except Exception as e:
+            with lock:
+                failures.append((*item, f'render failed: {e}'))
+            return
+
+        if data is not None:
+            with lock:
+                stats['rendered'] += 1
+        if archive and data is not None:
+            archive.writestr(name, data)
+            stats['archived'] += 1
+
+        if current and not options['force']:
+            with lock:
+                stats['skipped'] += 1
+        elif not options['no_upload']:
+            # Blocks when uploads fall behind, which in turn pauses rendering
+            uploads.put((document_type, object_id, content_hash, data))
+
+    def upload_worker(self, uploads, batch_size, stats, failures, lock):
+        try:
+            finished = False
+            while not finished:
+                batch = []
+                item = uploads.get()
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= batch_size:
+                        break
+                    try:
+                        item = uploads.get(timeout=BATCH_WAIT)
+                    except queue.Empty:
+                        break
+                finished = item is None
+                if batch:
+                    self.upload_batch(batch, stats, failures, lock)
+        finally:
+            connection.close()
+
+    def upload_batch(self, batch, stats, failures, lock):
+        """Upload rendered PDFs in one storage batch, then record each on its document"""
+        prepared, files = [], []
+        for document_type, object_id, content_hash, data in batch:
+            try:
+                document, generator = load_renderer(document_type, object_id)
+                folder_path, filename = generator.storage_location()
+            except Exception as e:
+                with lock:
+                    failures.append((document_type, object_id, f'upload failed: {e}'))
+                continue
+            prepared.append((document_type, object_id, document, content_hash))
+            files.append((BytesIO(data), filename, folder_path))
+        if not files:
+            return
+
+        try:
+            results = get_document_storage().upload_pdfs(files)
+        except Exception as e:
+            results = [e] * len(files)
+
+        for (document_type, object_id, document, content_hash), result in zip(prepared, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                record_rendered_pdf(document_type, document, content_hash, result)
+                with lock:
+                    stats['uploaded'] += 1
+            except Exception as e:
+                with lock:
+                    failures.append((document_type, object_id, f'upload failed: {e}'))
+
+    def report(self, elapsed, stats, failures, options):
+        rate = stats['rendered'] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"Rendered {stats['rendered']} PDFs in {elapsed:.1f}s ({rate:.1f}/s) "
+            f"with {options['workers']} workers"
+        )
+        self.stdout.write(f"  up to date (not uploaded): {stats['skipped']}")
+        if not options['no_upload']:
+            self.stdout.write(f"  uploaded: {stats['uploaded']}")
+        if options['archive']:
+            self.stdout.write(f"  archived: {stats['archived']} -> {options['archive']}")
+
+        if not failures:
+            self.stdout.write(self.style.SUCCESS('No failures.'))
+            return
+        self.stdout.write(self.style.ERROR(f'{len(failures)} failures:'))
+        for document_type, object_id, error in failures[:50]:
+            self.stdout.write(f'  {document_type} #{object_id}: {error}')
+        if len(failures) > 50:
+            self.stdout.write(f'  ... and {len(failures) - 50} more')
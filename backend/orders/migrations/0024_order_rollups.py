@@ -0,0 +1,71 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:24
+# Modified to populate rollups from existing orders
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_order_rollups(apps, schema_editor):
+    """Build rollup rows for all existing orders"""
+    Order = apps.get_model('orders', 'Order')
+    OrderRollup = apps.get_model('orders', 'OrderRollup')
+
+    rows = Order.objects.annotate(
+        day=TruncDate('created_at')
+    ).values(
+        'service__department_id', 'service_id', 'client_id', 'status', 'day'
+    ).annotate(
+        order_count=Count('id'),
+        total_price=Sum('price'),
+        total_paid=Sum('total_paid'),
+    ).order_by()
+
+    OrderRollup.objects.bulk_create([
+        OrderRollup(
+            department_id=row['service__department_id'],
+            service_id=row['service_id'],
+            client_id=row['client_id'],
+            status=row['status'],
+            day=row['day'],
+            order_count=row['order_count'],
+            total_price=row['total_price'] or 0,
+            total_paid=row['total_paid'] or 0,
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0023_remove_price_card_price'),
+        ('services', '0016_department_hero_bg_desktop_department_hero_bg_mobile_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('status', models.CharField(max_length=30)),
+                ('day', models.DateField()),
+                ('order_count', models.IntegerField(default=0)),
+                ('total_price', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_rollups', to='services.department')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_rollups', to='services.service')),
+            ],
+            options={
+                'db_table': 'order_rollups',
+                'indexes': [models.Index(fields=['department', 'status'], name='order_rollu_departm_a0679d_idx'), models.Index(fields=['client', 'status'], name='order_rollu_client__b09eb0_idx'), models.Index(fields=['day'], name='order_rollu_day_603822_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('client__isnull', False)), fields=('department', 'service', 'client', 'status', 'day'), name='order_rollup_unique_key'), models.UniqueConstraint(condition=models.Q(('client__isnull', True)), fields=('department', 'service', 'status', 'day'), name='order_rollup_unique_key_no_client')],
+            },
+        ),
+        migrations.RunPython(populate_order_rollups, reverse_code=migrations.RunPython.noop),
+    ]
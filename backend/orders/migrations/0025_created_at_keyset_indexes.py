@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0004_alter_serviceformfield_field_type'),
+        ('orders', '0024_order_rollups'),
+        ('portfolio', '0008_clientlogo'),
+        ('services', '0016_department_hero_bg_desktop_department_hero_bg_mobile_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at', '-id'], name='orders_created_826ed5_idx'),
+        ),
+    ]
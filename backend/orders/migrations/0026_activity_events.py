@@ -0,0 +1,74 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:34
+# Modified to seed the feed from existing status history
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_activity_events(apps, schema_editor):
+    """Create feed entries for existing order status changes"""
+    OrderStatusHistory = apps.get_model('orders', 'OrderStatusHistory')
+    ActivityEvent = apps.get_model('orders', 'ActivityEvent')
+
+    status_labels = {
+        'pending': 'pending', 'completed': 'completed', 'closed': 'completed',
+        'payment_done': 'completed', 'in_progress': 'in-progress',
+        '25_done': 'in-progress', '50_done': 'in-progress', '75_done': 'in-progress',
+    }
+
+    history = OrderStatusHistory.objects.select_related('order__service').order_by('timestamp')
+    events = []
+    for entry in history.iterator():
+        order = entry.order
+        scopes = ['all']
+        if order.client_id:
+            scopes.append(f'client:{order.client_id}')
+        scopes.append(f'department:{order.service.department_id}')
+
+        for scope in scopes:
+            events.append(ActivityEvent(
+                scope=scope,
+                event_type='order_status',
+                order_id=order.id,
+                actor_id=entry.changed_by_id,
+                action=f"Order {entry.to_status.replace('_', ' ')}: {order.title}"[:255],
+                project=order.title[:255],
+                status=status_labels.get(entry.to_status, 'pending'),
+                metadata={'from_status': entry.from_status, 'to_status': entry.to_status},
+                timestamp=entry.timestamp,
+            ))
+
+    ActivityEvent.objects.bulk_create(events, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0025_created_at_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('scope', models.CharField(max_length=50)),
+                ('event_type', models.CharField(choices=[('order_status', 'Order Status Change'), ('payment', 'Payment Received'), ('task_assigned', 'Task Assigned'), ('deliverable', 'Deliverable Uploaded')], max_length=30)),
+                ('action', models.CharField(max_length=255)),
+                ('project', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in-progress', 'In Progress'), ('completed', 'Completed')], default='pending', max_length=20)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_events', to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity_events', to='orders.order')),
+            ],
+            options={
+                'db_table': 'activity_events',
+                'indexes': [models.Index(fields=['scope', '-timestamp', '-id'], name='activity_ev_scope_1022d3_idx')],
+            },
+        ),
+        migrations.RunPython(seed_activity_events, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0026_activity_events'),
+        ('services', '0016_department_hero_bg_desktop_department_hero_bg_mobile_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['valid_from'], name='offers_valid_f_ec76b4_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:45
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0027_offer_valid_from_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PDFRenderJob',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('uuid', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, unique=True)),
+                ('document_type', models.CharField(choices=[('estimation', 'Estimation'), ('invoice', 'Invoice'), ('receipt', 'Receipt')], max_length=20)),
+                ('object_id', models.PositiveIntegerField(help_text='ID of the estimation, invoice or transaction')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('pdf_url', models.URLField(blank=True, max_length=500)),
+                ('pdf_file_path', models.CharField(blank=True, max_length=500)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pdf_render_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'pdf_render_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['document_type', 'object_id', 'status'], name='pdf_render__documen_ad8265_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0028_pdf_render_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pdfrenderjob',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text="Hash of the content rendered into the PDF (see the generators' content_hash())", max_length=64),
+        ),
+    ]
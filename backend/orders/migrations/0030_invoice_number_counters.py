@@ -0,0 +1,52 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:33
+# Modified to seed counters from existing invoice numbers
+
+import re
+from datetime import datetime
+
+from django.db import migrations, models
+
+INVOICE_NUMBER_RE = re.compile(r'^INV-(\d{8})-(\d+)$')
+
+
+def seed_invoice_number_counters(apps, schema_editor):
+    """Start each day's counter after the highest invoice number already issued"""
+    Invoice = apps.get_model('orders', 'Invoice')
+    InvoiceNumberCounter = apps.get_model('orders', 'InvoiceNumberCounter')
+
+    last_numbers = {}
+    for invoice_number in Invoice.objects.values_list('invoice_number', flat=True).iterator():
+        match = INVOICE_NUMBER_RE.match(invoice_number or '')
+        if not match:
+            continue
+        try:
+            day = datetime.strptime(match.group(1), '%Y%m%d').date()
+        except ValueError:
+            continue
+        last_numbers[day] = max(last_numbers.get(day, 0), int(match.group(2)))
+
+    InvoiceNumberCounter.objects.bulk_create([
+        InvoiceNumberCounter(day=day, last_number=last_number)
+        for day, last_number in last_numbers.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0029_pdf_job_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceNumberCounter',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'invoice_number_counters',
+            },
+        ),
+        migrations.RunPython(seed_invoice_number_counters, migrations.RunPython.noop),
+    ]
@@ -3,9 +3,12 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.utils.text import slugify
+import logging
 import math
 import uuid
 
+logger = logging.getLogger(__name__)
+
 
 class Order(models.Model):
     STATUS_CHOICES = [
@@ -96,6 +99,9 @@ class Order(models.Model):
 
     class Meta:
         db_table = "orders"
+        indexes = [
+            models.Index(fields=["-created_at", "-id"]),
+        ]
     
     def __str__(self):
         return f"Order #{self.id} - {self.title}"
@@ -111,9 +117,22 @@ class Order(models.Model):
     
     def update_status(self, new_status, user, notes=""):
         """
-        Update order status with history tracking
+        Update order status with history tracking.
+
+        Only the status columns are written, with a conditional
+        UPDATE ... WHERE status = <old status>, so a concurrent status change
+        makes this call fail instead of being silently overwritten, and
+        concurrent writes to other columns (e.g. total_paid) are preserved.
+
+        Raises:
+            ValueError: if the transition is not allowed, or the order's status
+                changed since it was loaded
         """
+        from django.db import transaction
         from orders.workflow_models import OrderStatusHistory
+        from orders.activity import record_status_change
+        from orders.dashboard import invalidate_dashboard_stats
+        from orders.rollups import get_stored_rollup_state, move_rollup
         
         # Validate transition
         is_valid, error_msg = self.can_transition_to(new_status)
@@ -122,21 +141,49 @@ class Order(models.Model):
         
         # Store old status
         old_status = self.status
+        now = timezone.now()
         
-        # Update status
-        self.status = new_status
-        self.status_updated_at = timezone.now()
-        self.status_updated_by = user
-        self.save()
+        with transaction.atomic():
+            updated = Order.objects.filter(pk=self.pk, status=old_status).update(
+                status=new_status,
+                status_updated_at=now,
+                status_updated_by=user,
+            )
+            if not updated:
+                current = Order.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+                if current is None:
+                    raise ValueError("Order no longer exists")
+                self.status = current
+                raise ValueError(
+                    f"Order status changed to '{current}' while updating from '{old_status}'. Please retry."
+                )
+            
+            # Update status
+            self.status = new_status
+            self.status_updated_at = now
+            self.status_updated_by = user
+            
+            # Create history record
+            OrderStatusHistory.objects.create(
+                order=self,
+                from_status=old_status,
+                to_status=new_status,
+                changed_by=user,
+                notes=notes
+            )
+            
+            # Append to the activity feed, committed with the status and its history
+            record_status_change(self, user, old_status)
+            
+            # queryset.update() skips the Order signals, so move the rollup here
+            try:
+                current_state = get_stored_rollup_state(self.pk)
+                key, price, paid = current_state
+                move_rollup(({**key, 'status': old_status}, price, paid), current_state)
+            except Exception as e:
+                logger.error(f"Failed to update rollups for order {self.pk}: {e}")
         
-        # Create history record
-        OrderStatusHistory.objects.create(
-            order=self,
-            from_status=old_status,
-            to_status=new_status,
-            changed_by=user,
-            notes=notes
-        )
+        invalidate_dashboard_stats(self)
         
         return True
 
@@ -289,6 +336,7 @@ class Offer(models.Model):
             models.Index(fields=["is_featured"]),
             models.Index(fields=["is_approved"]),
             models.Index(fields=["valid_to"]),
+            models.Index(fields=["valid_from"]),
         ]
 
     def save(self, *args, **kwargs):
@@ -391,6 +439,28 @@ class Offer(models.Model):
             return 0.0
         return 0.0
 
+    @classmethod
+    def discount_percentage_expression(cls):
+        """
+        Database-side equivalent of the discount_percentage property.
+        Returns: Case expression usable in annotate()/aggregate()
+        """
+        from django.db.models import Case, When, Value, F, Q, FloatField
+        from django.db.models.functions import Cast, Coalesce, Round
+
+        original = Cast('original_price', FloatField())
+        discounted = Cast('discounted_price', FloatField())
+        return Case(
+            # discount_percentage treats a NULL discount_value as 0, so Avg() must not skip it
+            When(discount_type="percent", then=Coalesce(Cast(F('discount_value'), FloatField()), Value(0.0))),
+            When(
+                Q(original_price__gt=0, discounted_price__isnull=False) & ~Q(discounted_price=0),
+                then=Round((original - discounted) / original * Value(100.0), 2),
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
     # Convenience: check whether a given service is covered
     def includes_service(self, service_obj):
         return self.services.filter(pk=service_obj.pk).exists()
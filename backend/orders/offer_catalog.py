@@ -0,0 +1,194 @@
+# orders/offer_catalog.py
+"""
+Cached public offer data: the offer catalog, stats and current deal.
+
+The catalog is the OfferSerializer output for every approved, active and
+currently valid offer, ordered like the public listing, so it matches the
+database listing field for field. Each entry also keeps the offer's
+service and department ids for the listing filters. Image URLs are
+absolute, so the catalog is cached per site URL.
+
+Every cached value is keyed on an offers version counter and expires at the
+next valid_from / valid_to boundary, so offers appear and expire on time
+without re-querying on every homepage hit. Offer writes and services M2M
+changes bump the version (see orders/signals.py), which orphans all
+previously cached values at once.
+"""
+import logging
+import math
+import time
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .models import Offer
+
+logger = logging.getLogger(__name__)
+
+OFFERS_VERSION_CACHE_KEY = "orders:offers:version"
+OFFERS_CACHE_KEY = "orders:offers:{name}:v{version}"
+# Upper bound in case an invalidation is missed (e.g. queryset.update())
+OFFER_CATALOG_MAX_TIMEOUT = 3600
+
+
+def public_offers_queryset(now=None):
+    """Approved, active offers whose validity window contains now"""
+    now = now or timezone.now()
+    return Offer.objects.filter(
+        is_approved=True, is_active=True, valid_from__lte=now
+    ).filter(
+        Q(valid_to__gte=now) | Q(valid_to__isnull=True)
+    )
+
+
+def next_offer_boundary(now=None):
+    """
+    Return the next moment the set of public offers changes on its own,
+    i.e. the earliest future valid_from or valid_to of a published offer.
+    """
+    now = now or timezone.now()
+    boundaries = Offer.objects.filter(is_approved=True, is_active=True).aggregate(
+        next_start=Min('valid_from', filter=Q(valid_from__gt=now)),
+        next_end=Min('valid_to', filter=Q(valid_to__gte=now)),
+    )
+    candidates = [value for value in boundaries.values() if value is not None]
+    return min(candidates) if candidates else None
+
+
+def seconds_until_next_boundary(now=None, max_timeout=OFFER_CATALOG_MAX_TIMEOUT):
+    """Cache timeout that expires exactly at the next offer validity boundary"""
+    now = now or timezone.now()
+    boundary = next_offer_boundary(now)
+    if boundary is None:
+        return max_timeout
+    # valid_to is inclusive, so expire just after it
+    seconds = math.ceil((boundary - now).total_seconds()) + 1
+    return max(1, min(seconds, max_timeout))
+
+
+def get_offers_version():
+    """Current offers version; seeded from the clock so an evicted counter never reuses old keys"""
+    version = cache.get(OFFERS_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(OFFERS_VERSION_CACHE_KEY, int(time.time() * 1000), None)
+        version = cache.get(OFFERS_VERSION_CACHE_KEY)
+    return version
+
+
+def bump_offers_version():
+    """Invalidate every cached offer value by moving to a new version"""
+    try:
+        try:
+            cache.incr(OFFERS_VERSION_CACHE_KEY)
+        except ValueError:
+            # Counter missing or evicted: start a fresh one
+            cache.add(OFFERS_VERSION_CACHE_KEY, int(time.time() * 1000), None)
+    except Exception as e:
+        logger.warning(f"Offers cache version bump failed: {e}")
+
+
+def get_cached_offer_value(name, builder):
+    """
+    Return builder() through the cache, keyed on the offers version and
+    expiring at the next offer validity boundary.
+    """
+    try:
+        cache_key = OFFERS_CACHE_KEY.format(name=name, version=get_offers_version())
+        value = cache.get(cache_key)
+    except Exception as e:
+        logger.warning(f"Offers cache read failed for {name}: {e}")
+        return builder()
+
+    if value is None:
+        now = timezone.now()
+        value = builder()
+        try:
+            cache.set(cache_key, value, seconds_until_next_boundary(now))
+        except Exception as e:
+            logger.warning(f"Offers cache write failed for {name}: {e}")
+
+    return value
+
+
+def build_offer_catalog(request):
+    """Build the public catalog from the database"""
+    from utils.query_plans import apply_query_plan
+    from .serializers import OfferSerializer
+
+    offers = apply_query_plan(public_offers_queryset(), OfferSerializer).order_by('-priority', '-created_at')
+    context = {'request': request, 'sparse_fields': False}
+    catalog = []
+    for offer in offers:
+        services = offer.services.all()
+        catalog.append({
+            'offer': dict(OfferSerializer(offer, context=context).data),
+            'service_ids': [service.id for service in services],
+            'department_ids': [service.department_id for service in services],
+        })
+    return catalog
+
+
+def get_offer_catalog(request):
+    """
+    Return the public catalog entries, building and caching them on a miss.
+    remaining_days / is_expired are refreshed on every read since they
+    depend on the current time rather than on the offers themselves.
+    """
+    name = f"catalog:{request.build_absolute_uri('/')}"
+    catalog = get_cached_offer_value(name, lambda: build_offer_catalog(request))
+
+    now = timezone.now()
+    entries = []
+    for entry in catalog:
+        offer = refresh_offer_timing(entry['offer'], now)
+        if offer['is_expired']:
+            continue
+        entries.append(dict(entry, offer=offer))
+    return entries
+
+
+def refresh_offer_timing(offer, now=None):
+    """Return a copy of a cached offer dict with remaining_days / is_expired recomputed"""
+    now = now or timezone.now()
+    offer = dict(offer)
+    valid_to = datetime.fromisoformat(offer['valid_to']) if offer.get('valid_to') else None
+    offer['is_expired'] = bool(valid_to and valid_to < now)
+    if offer['is_expired']:
+        offer['remaining_days'] = 0
+    else:
+        offer['remaining_days'] = (
+            math.ceil((valid_to - now).total_seconds() / (24 * 3600)) if valid_to else None
+        )
+    return offer
+
+
+def filter_offer_catalog(entries, params):
+    """
+    Apply the public listing query params (is_featured, offer_type,
+    offer_category, service, department) to catalog entries and return
+    the matching offers.
+    """
+    is_featured = params.get('is_featured')
+    if is_featured is not None:
+        wanted = is_featured.lower() == 'true'
+        entries = [e for e in entries if e['offer']['is_featured'] == wanted]
+
+    offer_type = params.get('offer_type')
+    if offer_type:
+        entries = [e for e in entries if e['offer']['offer_type'] == offer_type]
+
+    offer_category = params.get('offer_category')
+    if offer_category:
+        entries = [e for e in entries if e['offer']['offer_category'] == offer_category]
+
+    service_id = params.get('service')
+    if service_id:
+        entries = [e for e in entries if any(str(s) == service_id for s in e['service_ids'])]
+
+    department_id = params.get('department')
+    if department_id:
+        entries = [e for e in entries if any(str(d) == department_id for d in e['department_ids'])]
+
+    return [e['offer'] for e in entries]
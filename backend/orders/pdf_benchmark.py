@@ -0,0 +1,149 @@
+# orders/pdf_benchmark.py
+"""
+PDF generation benchmark (benchmark_pdf_generation command).
+
+Builds synthetic, unsaved estimations, invoices and transactions and times
+the full generator path (render plus upload) against InMemoryStorage, so
+no database rows or network calls are involved.
+
+Each case runs in its own freshly spawned process, which makes its peak
+RSS a measurement of that case alone. Like orders/pdf_workers.py, this
+module must be importable before Django is set up.
+"""
+import logging
+import statistics
+import sys
+import time
+
+DOCUMENT_TYPES = ('estimation', 'invoice', 'receipt')
+# Receipts have a fixed layout, so they are benchmarked at a single size
+SIZED_TYPES = ('estimation', 'invoice')
+
+
+def _line_items(size):
+    return [
+        {
+            'item': f'Item {i}',
+            'description': f'Line item number {i} of the benchmark document',
+            'quantity': 1,
+            'rate': 100,
+            'amount': 100,
+        }
+        for i in range(1, size + 1)
+    ]
+
+
+def _order():
+    from accounts.models import User
+    from services.models import Department, Service
+    from .models import Order
+
+    department = Department(id=1, title='Benchmark')
+    client = User(id=1, username='bench-client', email='client@example.invalid', first_name='Bench')
+    return Order(id=1, client=client, service=Service(id=1, title='Benchmark', department=department),
+                 title='Benchmark')
+
+
+def synthetic_estimation(size):
+    from .estimation_models import Estimation
+
+    return Estimation(
+        id=1, order=_order(), title=f'Benchmark estimation with {size} items',
+        description='Synthetic estimation used for benchmarking.',
+        cost_breakdown=_line_items(size), subtotal=100 * size, total_amount=100 * size,
+    )
+
+
+def synthetic_invoice(size):
+    from .estimation_models import Invoice
+
+    return Invoice(
+        id=1, order=_order(), invoice_number=f'BENCH-{size}', title=f'Benchmark invoice with {size} items',
+        line_items=_line_items(size), subtotal=100 * size, total_amount=100 * size,
+        terms_and_conditions='Payable within 30 days.',
+    )
+
+
+def synthetic_transaction():
+    from django.utils import timezone
+    from payments.models import Transaction
+
+    order = _order()
+    return Transaction(
+        id=1, order=order, user=order.client, gateway='razorpay', transaction_id='pay_BENCHMARK',
+        amount=100, currency='INR', payment_method='card', status='success', completed_at=timezone.now(),
+    )
+
+
+def _generator(document_type, size):
+    if document_type == 'receipt':
+        from payments.receipt_generator import ReceiptPDFGenerator
+        return ReceiptPDFGenerator(synthetic_transaction())
+
+    from .pdf_generators import EstimationPDFGenerator, InvoicePDFGenerator
+    if document_type == 'estimation':
+        return EstimationPDFGenerator(synthetic_estimation(size))
+    return InvoicePDFGenerator(synthetic_invoice(size))
+
+
+def _peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def percentile(samples, fraction):
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def run_case(document_type, size, iterations, warmup=1):
+    """
+    Benchmark one (document type, size) case in the current process.
+
+    Returns:
+        dict: timings in milliseconds, peak RSS, RSS growth over the
+              process baseline and output size in bytes
+    """
+    from django.test import override_settings
+    from utils.document_storage import get_document_storage
+
+    # Per-upload INFO logging would drown the results (the process is ours alone)
+    logging.disable(logging.INFO)
+    with override_settings(PDF_STORAGE_BACKEND='utils.document_storage.InMemoryStorage'):
+        storage = get_document_storage()
+        baseline_rss = _peak_rss_bytes()
+
+        timings, pdf_bytes = [], 0
+        for i in range(warmup + iterations):
+            generator = _generator(document_type, size)
+            started = time.perf_counter()
+            result = generator.upload_to_storage()
+            elapsed = time.perf_counter() - started
+
+            pdf_bytes = len(storage.files[result['file_path']])
+            storage.clear()
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+
+        peak_rss = _peak_rss_bytes()
+
+    return {
+        'type': document_type,
+        'items': size if document_type in SIZED_TYPES else None,
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'peak_rss_bytes': peak_rss,
+        'rss_growth_bytes': peak_rss - baseline_rss if peak_rss is not None else None,
+        'pdf_bytes': pdf_bytes,
+    }
@@ -4,18 +4,17 @@ PDF generation using ReportLab - Professional styled PDFs
 """
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm, inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.platypus.flowables import Flowable
-from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
 from reportlab.pdfgen import canvas
 
 from django.conf import settings
 from io import BytesIO
-from datetime import datetime
+from functools import partial
 from django.utils import timezone
-import os
+
+from utils.pdf_assets import PALETTE, content_hash, get_pdf_styles, get_logo, find_image_asset
 
 PDF_AVAILABLE = True
 
@@ -48,17 +47,154 @@ class DiagonalBackground(Flowable):
         self.canv.drawPath(p, fill=1, stroke=0)
 
 
+def _party_fields(document):
+    """Sender and receiver details shown on estimations and invoices"""
+    client = document.order.client
+    service = document.order.service
+    return {
+        'client': [
+            document.client_name, document.client_email, document.client_phone, document.client_address,
+            getattr(client, 'email', ''), client.get_full_name() if client else '',
+            getattr(client, 'phone', ''), getattr(client, 'address', ''),
+        ],
+        'sender': [
+            document.department_head_name, document.department_head_email, document.department_head_phone,
+            getattr(settings, 'COMPANY_PHONE', ''),
+            service.title if service else None,
+            service.department.title if service and service.department else None,
+        ],
+    }
+
+
+LINE_ITEM_COL_WIDTHS = [15*mm, 45*mm, 60*mm, 20*mm, 40*mm]
+# Rows per line-item table. Platypus splits an oversized table page by page,
+# re-measuring every remaining row each time, so thousands of rows in one
+# Table cost quadratic time; stacked page-sized tables keep it linear.
+LINE_ITEM_CHUNK_ROWS = 40
+
+
+def _line_item_table(items, start, stop, item_header, header_color, stripe_color):
+    """Table for items[start:stop]; the first one carries the header row"""
+    styles = get_pdf_styles()
+    rows = [['Sr. No.', item_header, 'DESCRIPTION', 'QTY', 'AMOUNT']] if start == 0 else []
+    for idx, item in enumerate(items[start:stop], start + 1):
+        desc = item.get('description', '') or ''
+        if len(desc) > 50:
+            desc = desc[:47] + "..."
+        
+        rows.append([
+            str(idx),
+            Paragraph(item.get('item', 'N/A'), styles['InfoContent']),
+            Paragraph(desc, styles['ItemDescription']),
+            str(item.get('quantity', 1)),
+            f"₹{float(item.get('amount', 0)):.2f}"
+        ])
+
+    commands = []
+    if start == 0:
+        commands = [
+            ('BACKGROUND', (0, 0), (-1, 0), header_color),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ]
+    first = 1 if start == 0 else 0
+    # Keep the row striping continuous across chunks
+    stripes = [colors.white, stripe_color] if start % 2 == 0 else [stripe_color, colors.white]
+    commands += [
+        ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+        ('ALIGN', (3, 0), (3, -1), 'CENTER'),
+        ('ALIGN', (4, 0), (4, -1), 'RIGHT'),
+        ('FONTSIZE', (0, first), (-1, -1), 9),
+        ('ROWBACKGROUNDS', (0, first), (-1, -1), stripes),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+    ]
+    table = Table(rows, colWidths=LINE_ITEM_COL_WIDTHS)
+    table.setStyle(TableStyle(commands))
+    return table
+
+
+class LineItemChunk(Flowable):
+    """
+    A slice of the line-item table whose Table (and Paragraphs) is built only
+    when the chunk is laid out and dropped once drawn, so memory stays flat
+    however many line items there are.
+    """
+    def __init__(self, build):
+        Flowable.__init__(self)
+        self.hAlign = 'CENTER'  # as Table
+        self._build = build
+        self._table = None
+
+    def _get_table(self):
+        if self._table is None:
+            self._table = self._build()
+        return self._table
+
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = self._get_table().wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        parts = self._get_table().split(availWidth, availHeight)
+        self._table = None
+        return parts
+
+    def draw(self):
+        self._get_table().drawOn(self.canv, 0, 0)
+        self._table = None
+
+
+def line_item_tables(items, item_header, header_color, stripe_color, chunk_rows=LINE_ITEM_CHUNK_ROWS):
+    """
+    Flowables for the line-item table: stacked chunks of at most chunk_rows
+    rows each, or a single Table if chunk_rows is None.
+    """
+    if not chunk_rows:
+        return [_line_item_table(items, 0, len(items), item_header, header_color, stripe_color)]
+    return [
+        LineItemChunk(partial(
+            _line_item_table, items, start, start + chunk_rows, item_header, header_color, stripe_color
+        ))
+        for start in range(0, max(len(items), 1), chunk_rows)
+    ]
+
+
 class EstimationPDFGenerator:
     """Generate professional estimation PDFs using ReportLab"""
+
+    # Bump whenever the layout changes so cached PDFs are re-rendered
+    TEMPLATE_VERSION = 1
     
-    def __init__(self, estimation):
+    def __init__(self, estimation, chunk_rows=LINE_ITEM_CHUNK_ROWS):
         self.estimation = estimation
-        # New color scheme
-        self.navy = colors.HexColor('#0F172A')  # Primary
-        self.teal = colors.HexColor('#14B8A6')  # Secondary
-        self.emerald = colors.HexColor('#10B981')  # Accent
-        self.off_white = colors.HexColor('#F8FAFC')  # Background
-        self.charcoal = colors.HexColor('#1E293B')  # Text
+        self.chunk_rows = chunk_rows
+        # Shared color scheme (utils.pdf_assets)
+        self.navy = PALETTE['navy']  # Primary
+        self.teal = PALETTE['teal']  # Secondary
+        self.emerald = PALETTE['emerald']  # Accent
+        self.off_white = PALETTE['off_white']  # Background
+        self.charcoal = PALETTE['charcoal']  # Text
+    
+    def content_hash(self):
+        """Hash of the content this estimation's PDF shows (the print date is ignored)"""
+        estimation = self.estimation
+        return content_hash(self.TEMPLATE_VERSION, {
+            'id': estimation.id,
+            'title': estimation.title,
+            'items': estimation.cost_breakdown,
+            'totals': [
+                estimation.subtotal, estimation.discount_amount, estimation.tax_percentage,
+                estimation.tax_amount, estimation.total_amount,
+            ],
+            'delivery': [estimation.delivery_date, estimation.estimated_timeline_days],
+            'notes': estimation.client_notes,
+            **_party_fields(estimation),
+        })
     
     def generate(self):
         """Generate PDF and return BytesIO"""
@@ -73,20 +209,17 @@ class EstimationPDFGenerator:
         )
         
         elements = []
-        styles = getSampleStyleSheet()
+        styles = get_pdf_styles()
         
         # Header with company info
         # Header with company info
-        logo_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'UdyogWorks logo.png')
+        logo_asset = get_logo()
         
         logo = None
-        if os.path.exists(logo_path):
-            try:
-                # Reduced size to 25mm width
-                logo = Image(logo_path, width=25*mm, height=12.5*mm)
-                logo.hAlign = 'LEFT'
-            except:
-                pass
+        if logo_asset:
+            # Reduced size to 25mm width
+            logo = logo_asset.flowable(width=25*mm, height=12.5*mm)
+            logo.hAlign = 'LEFT'
         
         company_name_para = Paragraph("<font color='white' size='16'><b>UDYOGWORKS</b></font>", styles['Normal'])
         
@@ -108,30 +241,9 @@ class EstimationPDFGenerator:
             styles['Normal']
         )
         
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Normal'],
-            fontSize=32,
-            textColor=self.teal,
-            alignment=TA_RIGHT,
-            fontName='Helvetica-Bold'
-        )
-        
-        id_style = ParagraphStyle(
-            'IDStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.white,
-            alignment=TA_RIGHT
-        )
-        
-        date_style = ParagraphStyle(
-            'DateStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.white,
-            alignment=TA_RIGHT
-        )
+        title_style = styles['DocTitle']
+        id_style = styles['HeaderMeta']
+        date_style = styles['HeaderMeta']
         
         header_data = [
             [logo_content, Paragraph("ESTIMATION", title_style)],
@@ -153,22 +265,8 @@ class EstimationPDFGenerator:
         elements.append(Spacer(1, 10*mm))
         
         # Sender and Receiver Details
-        info_title_style = ParagraphStyle(
-            'InfoTitle',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.white,
-            fontName='Helvetica-Bold',
-            leftIndent=5,
-            rightIndent=5
-        )
-        
-        info_content_style = ParagraphStyle(
-            'InfoContent',
-            parent=styles['Normal'],
-            fontSize=9,
-            leading=12
-        )
+        info_title_style = styles['InfoTitle']
+        info_content_style = styles['InfoContent']
         
         # Sender details (Department Head)
         # Sender details (Department Head)
@@ -261,46 +359,15 @@ class EstimationPDFGenerator:
         if self.estimation.title:
             title_para = Paragraph(
                 f"<b>{self.estimation.title}</b>",
-                ParagraphStyle('EstTitle', parent=styles['Normal'], fontSize=14, textColor=self.navy, fontName='Helvetica-Bold')
+                styles['DocHeading']
             )
             elements.append(title_para)
             elements.append(Spacer(1, 5*mm))
         
         # Items table
-        items_data = [['Sr. No.', 'ITEM NAME', 'DESCRIPTION', 'QTY', 'AMOUNT']]
-        
-        for idx, item in enumerate(self.estimation.cost_breakdown, 1):
-            desc = item.get('description', '') or ''
-            if len(desc) > 50:
-                desc = desc[:47] + "..."
-            
-            items_data.append([
-                str(idx),
-                Paragraph(item.get('item', 'N/A'), info_content_style),
-                Paragraph(desc, ParagraphStyle('Desc', parent=styles['Normal'], fontSize=8, textColor=self.charcoal)),
-                str(item.get('quantity', 1)),
-                f"₹{float(item.get('amount', 0)):.2f}"
-            ])
-        
-        items_table = Table(items_data, colWidths=[15*mm, 45*mm, 60*mm, 20*mm, 40*mm])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.teal),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-            ('ALIGN', (3, 0), (3, -1), 'CENTER'),
-            ('ALIGN', (4, 0), (4, -1), 'RIGHT'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, self.off_white]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        
-        elements.append(items_table)
+        elements.extend(line_item_tables(
+            self.estimation.cost_breakdown, 'ITEM NAME', self.teal, self.off_white, chunk_rows=self.chunk_rows
+        ))
         elements.append(Spacer(1, 8*mm))
         
         # Totals section
@@ -341,13 +408,7 @@ class EstimationPDFGenerator:
         elements.append(Spacer(1, 2*mm))
         
         # Footer section
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            leading=12,
-            textColor=self.charcoal
-        )
+        footer_style = styles['Footer']
         
         footer_data = []
         
@@ -392,16 +453,10 @@ class EstimationPDFGenerator:
             dept_title = self.estimation.order.service.department.title
             
             # Check extensions: jpeg, jpg, png
-            for ext in ['.jpeg', '.jpg', '.png']:
-                sig_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'DepartmentSignatures', f'{dept_title}{ext}')
-                if os.path.exists(sig_path):
-                    try:
-                        sig_img = Image(sig_path, width=40*mm, height=15*mm)
-                        sig_data = [[sig_img]]
-                        sig_found = True
-                        break
-                    except:
-                        continue
+            sig_asset = find_image_asset('DepartmentSignatures', dept_title)
+            if sig_asset:
+                sig_data = [[sig_asset.flowable(width=40*mm, height=15*mm)]]
+                sig_found = True
         
         if not sig_found:
             sig_data = [[Paragraph("_________________", footer_style)]]
@@ -425,17 +480,22 @@ class EstimationPDFGenerator:
         buffer.seek(0)
         return buffer
     
-    def upload_to_dropbox(self):
-        """Generate PDF and upload to Dropbox"""
+    def storage_location(self):
+        """(folder_path, filename) for this content; unchanged content keeps its path and shared link"""
+        file_name = f"estimation_{self.estimation.uuid}_{self.content_hash()[:16]}.pdf"
+        return f"/estimations/{self.estimation.order.client.id}", file_name
+    
+    def upload_to_storage(self, pdf_file=None):
+        """Generate PDF (unless an already rendered one is given) and upload it to document storage"""
         try:
-            from utils.dropbox_service import get_dropbox_service
+            from utils.document_storage import get_document_storage
             
-            pdf_file = self.generate()
-            dropbox_service = get_dropbox_service()
-            file_name = f"estimation_{self.estimation.uuid}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            folder_path = f"/estimations/{self.estimation.order.client.id}"
+            if pdf_file is None:
+                pdf_file = self.generate()
+            storage = get_document_storage()
+            folder_path, file_name = self.storage_location()
             
-            result = dropbox_service.upload_pdf(
+            result = storage.upload_pdf(
                 pdf_file=pdf_file,
                 filename=file_name,
                 folder_path=folder_path
@@ -443,21 +503,42 @@ class EstimationPDFGenerator:
             
             return result
         except Exception as e:
-            raise RuntimeError(f"PDF upload to Dropbox failed: {str(e)}")
+            raise RuntimeError(f"PDF upload failed: {str(e)}")
 
 
 
 class InvoicePDFGenerator:
     """Generate professional invoice PDFs using ReportLab"""
+
+    # Bump whenever the layout changes so cached PDFs are re-rendered
+    TEMPLATE_VERSION = 1
     
-    def __init__(self, invoice):
+    def __init__(self, invoice, chunk_rows=LINE_ITEM_CHUNK_ROWS):
         self.invoice = invoice
-        # New color scheme
-        self.navy = colors.HexColor('#0F172A')  # Primary
-        self.teal = colors.HexColor('#14B8A6')  # Secondary
-        self.emerald = colors.HexColor('#10B981')  # Accent
-        self.off_white = colors.HexColor('#F8FAFC')  # Background
-        self.charcoal = colors.HexColor('#1E293B')  # Text
+        self.chunk_rows = chunk_rows
+        # Shared color scheme (utils.pdf_assets)
+        self.navy = PALETTE['navy']  # Primary
+        self.teal = PALETTE['teal']  # Secondary
+        self.emerald = PALETTE['emerald']  # Accent
+        self.off_white = PALETTE['off_white']  # Background
+        self.charcoal = PALETTE['charcoal']  # Text
+    
+    def content_hash(self):
+        """Hash of the content this invoice's PDF shows"""
+        invoice = self.invoice
+        return content_hash(self.TEMPLATE_VERSION, {
+            'number': invoice.invoice_number,
+            'dates': [invoice.invoice_date, invoice.due_date],
+            'title': invoice.title,
+            'items': invoice.line_items,
+            'totals': [
+                invoice.subtotal, invoice.discount_amount, invoice.tax_percentage,
+                invoice.tax_amount, invoice.total_amount,
+            ],
+            'notes': [invoice.notes, invoice.referral_policies, invoice.terms_and_conditions],
+            'signatories': [invoice.chairperson_name, invoice.vice_chairperson_name],
+            **_party_fields(invoice),
+        })
     
     def generate(self):
         """Generate PDF and return BytesIO"""
@@ -472,20 +553,17 @@ class InvoicePDFGenerator:
         )
         
         elements = []
-        styles = getSampleStyleSheet()
+        styles = get_pdf_styles()
         
         # Header
         # Header
-        logo_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'UdyogWorks logo.png')
+        logo_asset = get_logo()
         
         logo = None
-        if os.path.exists(logo_path):
-            try:
-                # Reduced size to 25mm width
-                logo = Image(logo_path, width=25*mm, height=12.5*mm)
-                logo.hAlign = 'LEFT'
-            except:
-                pass
+        if logo_asset:
+            # Reduced size to 25mm width
+            logo = logo_asset.flowable(width=25*mm, height=12.5*mm)
+            logo.hAlign = 'LEFT'
         
         company_name_para = Paragraph("<font color='white' size='16'><b>UDYOGWORKS</b></font>", styles['Normal'])
         
@@ -507,30 +585,9 @@ class InvoicePDFGenerator:
             styles['Normal']
         )
         
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Normal'],
-            fontSize=32,
-            textColor=self.teal,
-            alignment=TA_RIGHT,
-            fontName='Helvetica-Bold'
-        )
-        
-        id_style = ParagraphStyle(
-            'IDStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.white,
-            alignment=TA_RIGHT
-        )
-        
-        date_style = ParagraphStyle(
-            'DateStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.white,
-            alignment=TA_RIGHT
-        )
+        title_style = styles['DocTitle']
+        id_style = styles['HeaderMeta']
+        date_style = styles['HeaderMeta']
         
         header_data = [
             [logo_content, Paragraph("INVOICE", title_style)],
@@ -552,22 +609,8 @@ class InvoicePDFGenerator:
         elements.append(Spacer(1, 10*mm))
         
         # Sender and Receiver Details
-        info_title_style = ParagraphStyle(
-            'InfoTitle',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.white,
-            fontName='Helvetica-Bold',
-            leftIndent=5,
-            rightIndent=5
-        )
-        
-        info_content_style = ParagraphStyle(
-            'InfoContent',
-            parent=styles['Normal'],
-            fontSize=9,
-            leading=12
-        )
+        info_title_style = styles['InfoTitle']
+        info_content_style = styles['InfoContent']
         
         # Sender details
         # Sender details
@@ -660,46 +703,15 @@ class InvoicePDFGenerator:
         if self.invoice.title:
             title_para = Paragraph(
                 f"<b>{self.invoice.title}</b>",
-                ParagraphStyle('InvTitle', parent=styles['Normal'], fontSize=14, textColor=self.navy, fontName='Helvetica-Bold')
+                styles['DocHeading']
             )
             elements.append(title_para)
             elements.append(Spacer(1, 5*mm))
         
         # Items table
-        items_data = [['Sr. No.', 'ITEM', 'DESCRIPTION', 'QTY', 'AMOUNT']]
-        
-        for idx, item in enumerate(self.invoice.line_items, 1):
-            desc = item.get('description', '') or ''
-            if len(desc) > 50:
-                desc = desc[:47] + "..."
-            
-            items_data.append([
-                str(idx),
-                Paragraph(item.get('item', 'N/A'), info_content_style),
-                Paragraph(desc, ParagraphStyle('Desc', parent=styles['Normal'], fontSize=8, textColor=self.charcoal)),
-                str(item.get('quantity', 1)),
-                f"₹{float(item.get('amount', 0)):.2f}"
-            ])
-        
-        items_table = Table(items_data, colWidths=[15*mm, 45*mm, 60*mm, 20*mm, 40*mm])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.teal),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-            ('ALIGN', (3, 0), (3, -1), 'CENTER'),
-            ('ALIGN', (4, 0), (4, -1), 'RIGHT'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, self.off_white]),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        
-        elements.append(items_table)
+        elements.extend(line_item_tables(
+            self.invoice.line_items, 'ITEM', self.teal, self.off_white, chunk_rows=self.chunk_rows
+        ))
         elements.append(Spacer(1, 8*mm))
         
         # Totals section
@@ -740,13 +752,7 @@ class InvoicePDFGenerator:
         elements.append(Spacer(1, 2*mm))
         
         # Footer section with referral policies and terms
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            leading=12,
-            textColor=self.charcoal
-        )
+        footer_style = styles['Footer']
         
         footer_data = []
         
@@ -790,11 +796,16 @@ class InvoicePDFGenerator:
                 ('RIGHTPADDING', (0, 0), (-1, -1), 6),
             ])
             
-            left_table = Table([[item] for item in left_content], colWidths=[85*mm])
-            left_table.setStyle(box_style)
+            # A side without content is left blank (ReportLab rejects empty tables)
+            left_table = ''
+            if left_content:
+                left_table = Table([[item] for item in left_content], colWidths=[85*mm])
+                left_table.setStyle(box_style)
             
-            right_table = Table([[item] for item in right_content], colWidths=[85*mm])
-            right_table.setStyle(box_style)
+            right_table = ''
+            if right_content:
+                right_table = Table([[item] for item in right_content], colWidths=[85*mm])
+                right_table.setStyle(box_style)
             
             footer_wrapper = Table([[left_table, right_table]], colWidths=[90*mm, 90*mm])
             footer_wrapper.setStyle(TableStyle([
@@ -809,18 +820,12 @@ class InvoicePDFGenerator:
         # Thank you message
         elements.append(Paragraph(
             "<b>Thank You for Your Business.</b>",
-            ParagraphStyle('ThankYou', parent=styles['Normal'], fontSize=11, fontName='Helvetica-Bold', textColor=self.navy, alignment=TA_CENTER)
+            styles['ThankYou']
         ))
         elements.append(Spacer(1, 2*mm)) # Reduced spacing for signatures # Reduced spacing for signatures
         
         # Three Signatures
-        sig_style = ParagraphStyle(
-            'SigStyle',
-            parent=styles['Normal'],
-            fontSize=8,
-            alignment=TA_CENTER,
-            textColor=self.charcoal
-        )
+        sig_style = styles['Signature']
         
         # Department Head Signature
         dept_sig_data = []
@@ -830,15 +835,10 @@ class InvoicePDFGenerator:
             dept_title = self.invoice.order.service.department.title
             
             # Check extensions: jpeg, jpg, png
-            for ext in ['.jpeg', '.jpg', '.png']:
-                sig_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'DepartmentSignatures', f'{dept_title}{ext}')
-                if os.path.exists(sig_path):
-                    try:
-                        dept_sig_data.append([Image(sig_path, width=35*mm, height=12*mm)])
-                        dept_sig_found = True
-                        break
-                    except:
-                        continue
+            sig_asset = find_image_asset('DepartmentSignatures', dept_title)
+            if sig_asset:
+                dept_sig_data.append([sig_asset.flowable(width=35*mm, height=12*mm)])
+                dept_sig_found = True
         
         if not dept_sig_found:
             dept_sig_data.append([Paragraph("_____________", sig_style)])
@@ -846,32 +846,22 @@ class InvoicePDFGenerator:
         dept_sig_data.append([Paragraph("<b>Department Head's<br/>Signature</b>", sig_style)])
         
         # Chairperson Signature
-        chair_sig_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'AuthoritySignatures', 'Chair.png')
-        if not os.path.exists(chair_sig_path):
-            chair_sig_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'AuthoritySignatures', 'Chair.jpg')
+        chair_sig_asset = find_image_asset('AuthoritySignatures', 'Chair', extensions=('.png', '.jpg'))
         
         chair_sig_data = []
-        if os.path.exists(chair_sig_path):
-            try:
-                chair_sig_data.append([Image(chair_sig_path, width=35*mm, height=12*mm)])
-            except:
-                chair_sig_data.append([Paragraph("_____________", sig_style)])
+        if chair_sig_asset:
+            chair_sig_data.append([chair_sig_asset.flowable(width=35*mm, height=12*mm)])
         else:
             chair_sig_data.append([Paragraph("_____________", sig_style)])
         
         chair_sig_data.append([Paragraph(f"<b>Chairperson's<br/>Signature</b><br/>{self.invoice.chairperson_name}", sig_style)])
         
         # Vice-Chairperson Signature
-        vice_sig_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'AuthoritySignatures', 'Vice-Chair.png')
-        if not os.path.exists(vice_sig_path):
-            vice_sig_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'AuthoritySignatures', 'Vice-Chair.jpg')
+        vice_sig_asset = find_image_asset('AuthoritySignatures', 'Vice-Chair', extensions=('.png', '.jpg'))
         
         vice_sig_data = []
-        if os.path.exists(vice_sig_path):
-            try:
-                vice_sig_data.append([Image(vice_sig_path, width=35*mm, height=12*mm)])
-            except:
-                vice_sig_data.append([Paragraph("_____________", sig_style)])
+        if vice_sig_asset:
+            vice_sig_data.append([vice_sig_asset.flowable(width=35*mm, height=12*mm)])
         else:
             vice_sig_data.append([Paragraph("_____________", sig_style)])
         
@@ -912,17 +902,22 @@ class InvoicePDFGenerator:
         buffer.seek(0)
         return buffer
     
-    def upload_to_dropbox(self):
-        """Generate PDF and upload to Dropbox"""
+    def storage_location(self):
+        """(folder_path, filename) for this content; unchanged content keeps its path and shared link"""
+        file_name = f"invoice_{self.invoice.invoice_number}_{self.content_hash()[:16]}.pdf"
+        return f"/invoices/{self.invoice.order.client.id}", file_name
+    
+    def upload_to_storage(self, pdf_file=None):
+        """Generate PDF (unless an already rendered one is given) and upload it to document storage"""
         try:
-            from utils.dropbox_service import get_dropbox_service
+            from utils.document_storage import get_document_storage
             
-            pdf_file = self.generate()
-            dropbox_service = get_dropbox_service()
-            file_name = f"invoice_{self.invoice.invoice_number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            folder_path = f"/invoices/{self.invoice.order.client.id}"
+            if pdf_file is None:
+                pdf_file = self.generate()
+            storage = get_document_storage()
+            folder_path, file_name = self.storage_location()
             
-            result = dropbox_service.upload_pdf(
+            result = storage.upload_pdf(
                 pdf_file=pdf_file,
                 filename=file_name,
                 folder_path=folder_path
@@ -930,5 +925,5 @@ class InvoicePDFGenerator:
             
             return result
         except Exception as e:
-            raise RuntimeError(f"PDF upload to Dropbox failed: {str(e)}")
+            raise RuntimeError(f"PDF upload failed: {str(e)}")
 
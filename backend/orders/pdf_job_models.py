@@ -0,0 +1,61 @@
+# orders/pdf_job_models.py
+from django.db import models
+import uuid
+
+
+class PDFRenderJob(models.Model):
+    """
+    Background render of an estimation, invoice or receipt PDF.
+    Created by the API, processed by the render_pdf_job Celery task and
+    polled by clients through /api/orders/pdf-jobs/<uuid>/.
+    """
+    DOCUMENT_TYPES = [
+        ("estimation", "Estimation"),
+        ("invoice", "Invoice"),
+        ("receipt", "Receipt"),
+    ]
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, db_index=True)
+    document_type = models.CharField(max_length=20, choices=DOCUMENT_TYPES)
+    object_id = models.PositiveIntegerField(help_text="ID of the estimation, invoice or transaction")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+
+    pdf_url = models.URLField(blank=True, max_length=500)
+    pdf_file_path = models.CharField(max_length=500, blank=True)
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of the content rendered into the PDF (see the generators' content_hash())"
+    )
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    requested_by = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="pdf_render_jobs"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "pdf_render_jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["document_type", "object_id", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.document_type} #{self.object_id} PDF ({self.status})"
@@ -0,0 +1,291 @@
+# orders/pdf_jobs.py
+"""
+Asynchronous PDF rendering.
+
+API views call enqueue_pdf_render() and return the job straight away; the
+render_pdf_job Celery task generates the PDF, uploads it to document storage and
+stores the URL on both the job and the document. Clients poll
+GET /api/orders/pdf-jobs/<uuid>/ until the job has succeeded or failed.
+
+PDFs are content-addressed: every job records the generator's
+content_hash(), and a document whose current PDF was rendered from the
+same content is neither re-rendered nor re-uploaded.
+"""
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .pdf_job_models import PDFRenderJob
+
+logger = logging.getLogger(__name__)
+
+# document_type -> (model, generator, url field, file path field)
+DOCUMENT_RENDERERS = {
+    'estimation': ('orders.Estimation', 'orders.pdf_generators.EstimationPDFGenerator',
+                   'pdf_url', 'pdf_file_path'),
+    'invoice': ('orders.Invoice', 'orders.pdf_generators.InvoicePDFGenerator',
+                'pdf_url', 'pdf_file_path'),
+    'receipt': ('payments.Transaction', 'payments.receipt_generator.ReceiptPDFGenerator',
+                'receipt_pdf_url', 'receipt_pdf_dropbox_path'),
+}
+
+ACTIVE_STATUSES = ('queued', 'running')
+# Queued/running jobs older than this are assumed lost (e.g. worker restart)
+STALE_JOB_AFTER = timedelta(minutes=10)
+
+RENDER_LOCK_KEY = "orders:pdf-render-lock:{document_type}:{object_id}"
+# The lock only covers the check-and-enqueue step, not the render itself
+RENDER_LOCK_TIMEOUT = 30
+RENDER_LOCK_WAIT = 5
+RENDER_LOCK_POLL = 0.05
+
+
+def load_renderer(document_type, object_id):
+    """
+    Returns:
+        tuple: (document, generator)
+    """
+    model_label, generator_path, _, _ = DOCUMENT_RENDERERS[document_type]
+    document = apps.get_model(model_label).objects.get(pk=object_id)
+    return document, import_string(generator_path)(document)
+
+
+def find_current_artifact(document_type, document, content_hash):
+    """
+    The succeeded job that rendered this exact content into the document's
+    current PDF, or None if the PDF is missing or stale.
+    """
+    url_field = DOCUMENT_RENDERERS[document_type][2]
+    current_url = getattr(document, url_field)
+    if not current_url:
+        return None
+    return PDFRenderJob.objects.filter(
+        document_type=document_type, object_id=document.pk, status='succeeded',
+        content_hash=content_hash, pdf_url=current_url,
+    ).first()
+
+
+# Locks this thread holds until its transaction commits: key -> expiry
+_held_locks = threading.local()
+
+
+def _locks_held():
+    if not hasattr(_held_locks, 'expiry'):
+        _held_locks.expiry = {}
+    return _held_locks.expiry
+
+
+@contextmanager
+def render_lock(document_type, object_id):
+    """
+    Single-flight lock serialising concurrent enqueues for one document, so
+    they all see the first caller's job. It is held until the transaction
+    commits (and is re-entrant within it). If the cache is unreachable or
+    the holder does not finish within RENDER_LOCK_WAIT, callers go ahead
+    unlocked; the worst case is a duplicate render.
+    """
+    key = RENDER_LOCK_KEY.format(document_type=document_type, object_id=object_id)
+    if _locks_held().get(key, 0) > time.monotonic():
+        yield
+        return
+
+    token = uuid.uuid4().hex
+    acquired = False
+    try:
+        deadline = time.monotonic() + RENDER_LOCK_WAIT
+        while not acquired:
+            acquired = cache.add(key, token, RENDER_LOCK_TIMEOUT)
+            if not acquired:
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Timed out waiting for {key}; enqueueing without it")
+                    break
+                time.sleep(RENDER_LOCK_POLL)
+    except Exception as e:
+        logger.warning(f"PDF render lock unavailable for {key}: {e}")
+
+    if acquired:
+        _locks_held()[key] = time.monotonic() + RENDER_LOCK_TIMEOUT
+    try:
+        yield
+    except Exception:
+        if acquired:
+            _release_lock(key, token)
+        raise
+    if acquired:
+        # Keep other callers out until the new job row is visible to them
+        transaction.on_commit(lambda: _release_lock(key, token))
+
+
+def _release_lock(key, token):
+    _locks_held().pop(key, None)
+    try:
+        if cache.get(key) == token:
+            cache.delete(key)
+    except Exception as e:
+        logger.warning(f"Could not release {key}: {e}")
+
+
+def enqueue_pdf_render(document_type, object_id, user=None):
+    """
+    Queue a PDF render for a document.
+
+    Nothing is queued when the document's current PDF was rendered from the
+    same content: the succeeded job that produced it is returned instead.
+    A job already queued or running for the same content is reused.
+
+    Returns:
+        PDFRenderJob
+    """
+    if document_type not in DOCUMENT_RENDERERS:
+        raise ValueError(f"Unknown document type: {document_type}")
+
+    document, generator = load_renderer(document_type, object_id)
+    content_hash = generator.content_hash()
+
+    with render_lock(document_type, object_id):
+        job = find_current_artifact(document_type, document, content_hash)
+        if job:
+            logger.info(f"{document_type} #{object_id} PDF is up to date, skipping render")
+            return job
+
+        job = PDFRenderJob.objects.filter(
+            document_type=document_type, object_id=object_id, status__in=ACTIVE_STATUSES,
+            content_hash=content_hash, created_at__gte=timezone.now() - STALE_JOB_AFTER,
+        ).first()
+        if job:
+            return job
+
+        job = PDFRenderJob.objects.create(
+            document_type=document_type,
+            object_id=object_id,
+            content_hash=content_hash,
+            requested_by=user if user and user.is_authenticated else None,
+        )
+        transaction.on_commit(lambda: _dispatch(job))
+        return job
+
+
+def _dispatch(job):
+    """Hand a job to Celery; mark it failed if the broker is unreachable"""
+    from .tasks import render_pdf_job
+    try:
+        render_pdf_job.delay(job.id)
+    except Exception as e:
+        logger.error(f"Failed to queue PDF render job {job.uuid}: {e}")
+        PDFRenderJob.objects.filter(pk=job.pk, status='queued').update(
+            status='failed', error=f"Render queue unavailable: {e}", finished_at=timezone.now()
+        )
+
+
+def run_pdf_job(job_id):
+    """
+    Render and upload the PDF for a job. Called by the Celery task.
+
+    Returns:
+        PDFRenderJob, or None if another worker already claimed the job
+    """
+    claimed = PDFRenderJob.objects.filter(pk=job_id, status='queued').update(
+        status='running', started_at=timezone.now(), error='', attempts=F('attempts') + 1
+    )
+    if not claimed:
+        return None
+
+    job = PDFRenderJob.objects.get(pk=job_id)
+
+    document, generator = load_renderer(job.document_type, job.object_id)
+    # The document may have changed (or changed back) since the job was queued
+    content_hash = generator.content_hash()
+    artifact = find_current_artifact(job.document_type, document, content_hash)
+
+    if artifact:
+        pdf_url, pdf_file_path = artifact.pdf_url, artifact.pdf_file_path
+        logger.info(f"{job.document_type} #{job.object_id} PDF is up to date, skipping render")
+    else:
+        pdf_url, pdf_file_path = store_pdf_result(job.document_type, document, generator.upload_to_storage())
+        logger.info(f"Rendered {job.document_type} #{job.object_id} PDF: {pdf_url}")
+
+    job.status = 'succeeded'
+    job.content_hash = content_hash
+    job.pdf_url = pdf_url
+    job.pdf_file_path = pdf_file_path
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'content_hash', 'pdf_url', 'pdf_file_path', 'finished_at'])
+    return job
+
+
+def store_pdf_result(document_type, document, result):
+    """
+    Save a storage upload result on its document.
+
+    Returns:
+        tuple: (pdf_url, pdf_file_path)
+    """
+    _, _, url_field, path_field = DOCUMENT_RENDERERS[document_type]
+    pdf_url = result.get('download_url') or result.get('url') or ''
+    pdf_file_path = result.get('file_path') or ''
+    setattr(document, url_field, pdf_url)
+    setattr(document, path_field, pdf_file_path)
+    document.save(update_fields=[url_field, path_field])
+    return pdf_url, pdf_file_path
+
+
+def record_rendered_pdf(document_type, document, content_hash, result, user=None):
+    """
+    Store a PDF rendered outside the job queue (e.g. by regenerate_pdfs),
+    with a succeeded job so later requests treat it as current.
+
+    Returns:
+        PDFRenderJob
+    """
+    pdf_url, pdf_file_path = store_pdf_result(document_type, document, result)
+    now = timezone.now()
+    return PDFRenderJob.objects.create(
+        document_type=document_type,
+        object_id=document.pk,
+        status='succeeded',
+        content_hash=content_hash,
+        pdf_url=pdf_url,
+        pdf_file_path=pdf_file_path,
+        attempts=1,
+        requested_by=user,
+        started_at=now,
+        finished_at=now,
+    )
+
+
+def retry_pdf_job(job_id, error):
+    """Put a failed attempt back in the queue"""
+    PDFRenderJob.objects.filter(pk=job_id, status='running').update(status='queued', error=str(error))
+
+
+def fail_pdf_job(job_id, error):
+    """Mark a job as permanently failed"""
+    PDFRenderJob.objects.filter(pk=job_id).update(
+        status='failed', error=str(error), finished_at=timezone.now()
+    )
+
+
+def serialize_pdf_job(job):
+    """Polling payload for a job"""
+    return {
+        'job_id': str(job.uuid),
+        'document_type': job.document_type,
+        'object_id': job.object_id,
+        'status': job.status,
+        'pdf_url': job.pdf_url or None,
+        'pdf_file_path': job.pdf_file_path or None,
+        'error': job.error or None,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+        'status_url': f"/api/orders/pdf-jobs/{job.uuid}/",
+    }
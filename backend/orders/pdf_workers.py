@@ -0,0 +1,47 @@
+# orders/pdf_workers.py
+"""
+Process-pool entry points for bulk PDF rendering (regenerate_pdfs).
+
+Workers are spawned fresh, so this module must be importable before
+Django is set up: everything Django-related is imported inside the
+functions.
+"""
+
+ARCHIVE_NAMES = {
+    'estimation': lambda document: f"estimations/EST-{document.id:04d}.pdf",
+    'invoice': lambda document: f"invoices/{document.invoice_number}.pdf",
+    'receipt': lambda document: f"receipts/{document.uuid}.pdf",
+}
+
+
+def init_render_worker():
+    """Pool initializer: set Django up in the new process"""
+    import django
+    django.setup()
+
+
+def render_document(document_type, object_id, force=False, archive=False):
+    """
+    Render one PDF in a worker process.
+
+    Args:
+        force: render even if the document's stored PDF is up to date
+        archive: the PDF bytes are needed for an archive regardless
+
+    Returns:
+        tuple: (document_type, object_id, content_hash, archive name,
+                PDF bytes or None if not rendered, whether the stored PDF is up to date)
+    """
+    from django.db import connection
+    from .pdf_jobs import find_current_artifact, load_renderer
+
+    try:
+        document, generator = load_renderer(document_type, object_id)
+        content_hash = generator.content_hash()
+        current = find_current_artifact(document_type, document, content_hash) is not None
+        data = None
+        if force or archive or not current:
+            data = generator.generate().getvalue()
+        return document_type, object_id, content_hash, ARCHIVE_NAMES[document_type](document), data, current
+    finally:
+        connection.close()
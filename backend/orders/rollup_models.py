@@ -0,0 +1,66 @@
+# orders/rollup_models.py
+from django.db import models
+from django.db.models import Q
+
+
+class OrderRollup(models.Model):
+    """
+    Pre-aggregated order totals per (department, service, client, status, day).
+
+    Maintained incrementally by orders/rollups.py from Order save/delete, and
+    rebuilt from scratch by the `rebuild_order_rollups` management command.
+    Dashboards read these rows instead of scanning the orders table.
+    """
+    id = models.BigAutoField(primary_key=True)
+    department = models.ForeignKey(
+        "services.Department",
+        on_delete=models.CASCADE,
+        related_name="order_rollups"
+    )
+    service = models.ForeignKey(
+        "services.Service",
+        on_delete=models.CASCADE,
+        related_name="order_rollups"
+    )
+    # Orders keep their rollup contribution when a client account is removed,
+    # so this is a plain reference rather than an enforced foreign key.
+    client = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    status = models.CharField(max_length=30)
+    day = models.DateField()
+
+    # Aggregates
+    order_count = models.IntegerField(default=0)
+    total_price = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "order_rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["department", "service", "client", "status", "day"],
+                condition=Q(client__isnull=False),
+                name="order_rollup_unique_key",
+            ),
+            models.UniqueConstraint(
+                fields=["department", "service", "status", "day"],
+                condition=Q(client__isnull=True),
+                name="order_rollup_unique_key_no_client",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["department", "status"]),
+            models.Index(fields=["client", "status"]),
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.service_id}/{self.client_id}/{self.status}/{self.day}: {self.order_count}"
@@ -0,0 +1,186 @@
+# orders/rollups.py
+"""
+Incremental maintenance of OrderRollup rows.
+
+Each order contributes (1, price, total_paid) to exactly one rollup row,
+identified by its department, service, client, status and creation day.
+On save we subtract the previous contribution and add the new one; on
+delete we subtract it. When a service changes department, its rows move
+with it.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Order
+from .rollup_models import OrderRollup
+
+logger = logging.getLogger(__name__)
+
+# Order fields that change which rollup row an order belongs to or its totals
+ROLLUP_FIELDS = {'service', 'client', 'status', 'price', 'total_paid', 'created_at'}
+
+
+def get_rollup_state(order):
+    """
+    Return (key, price, total_paid) describing an order's rollup contribution.
+    """
+    created_at = order.created_at or timezone.now()
+    key = {
+        'department_id': order.service.department_id,
+        'service_id': order.service_id,
+        'client_id': order.client_id,
+        'status': order.status,
+        'day': timezone.localdate(created_at),
+    }
+    return key, Decimal(order.price or 0), Decimal(order.total_paid or 0)
+
+
+def get_stored_rollup_state(order_id):
+    """Read an order's current rollup contribution straight from the database"""
+    row = Order.objects.filter(pk=order_id).values(
+        'service_id', 'service__department_id', 'client_id',
+        'status', 'created_at', 'price', 'total_paid'
+    ).first()
+    if row is None:
+        return None
+
+    key = {
+        'department_id': row['service__department_id'],
+        'service_id': row['service_id'],
+        'client_id': row['client_id'],
+        'status': row['status'],
+        'day': timezone.localdate(row['created_at']),
+    }
+    return key, Decimal(row['price'] or 0), Decimal(row['total_paid'] or 0)
+
+
+def apply_rollup_delta(key, count, price, paid):
+    """
+    Add (count, price, paid) to the rollup row for key, creating it if needed.
+    """
+    if not count and not price and not paid:
+        return
+
+    with transaction.atomic():
+        rows = OrderRollup.objects.filter(**key)
+        updated = rows.update(
+            order_count=F('order_count') + count,
+            total_price=F('total_price') + price,
+            total_paid=F('total_paid') + paid,
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    OrderRollup.objects.create(
+                        order_count=count, total_price=price, total_paid=paid, **key
+                    )
+            except IntegrityError:
+                # Another writer created the row first
+                rows.update(
+                    order_count=F('order_count') + count,
+                    total_price=F('total_price') + price,
+                    total_paid=F('total_paid') + paid,
+                )
+
+        if count < 0:
+            rows.filter(order_count__lte=0).delete()
+
+
+def move_rollup(previous, current):
+    """
+    Move an order's contribution from the previous state to the current one.
+    Either state may be None (order created / deleted).
+    """
+    if previous and current and previous[0] == current[0]:
+        apply_rollup_delta(current[0], 0, current[1] - previous[1], current[2] - previous[2])
+        return
+
+    if previous:
+        key, price, paid = previous
+        apply_rollup_delta(key, -1, -price, -paid)
+    if current:
+        key, price, paid = current
+        apply_rollup_delta(key, 1, price, paid)
+
+
+def move_service_rollups(service_id, old_department_id, new_department_id):
+    """
+    Move a service's rollup rows from its old department to its new one,
+    after the service itself changed department.
+    """
+    with transaction.atomic():
+        rows = list(OrderRollup.objects.select_for_update().filter(
+            service_id=service_id, department_id=old_department_id
+        ))
+        for row in rows:
+            key = {
+                'department_id': new_department_id,
+                'service_id': service_id,
+                'client_id': row.client_id,
+                'status': row.status,
+                'day': row.day,
+            }
+            apply_rollup_delta(key, row.order_count, row.total_price, row.total_paid)
+        OrderRollup.objects.filter(pk__in=[row.pk for row in rows]).delete()
+
+
+def move_rollups(moves):
+    """
+    Apply several (previous, current) moves at once, touching each affected
+    rollup row only once.
+    """
+    deltas = {}
+    for previous, current in moves:
+        for state, sign in ((previous, -1), (current, 1)):
+            if not state:
+                continue
+            key, price, paid = state
+            group = tuple(sorted(key.items()))
+            count_total, price_total, paid_total = deltas.get(group, (0, Decimal(0), Decimal(0)))
+            deltas[group] = (count_total + sign, price_total + sign * price, paid_total + sign * paid)
+
+    for group, (count, price, paid) in deltas.items():
+        apply_rollup_delta(dict(group), count, price, paid)
+
+
+def rebuild_rollups():
+    """
+    Recompute every rollup row from the orders table.
+
+    Returns:
+        int: number of rollup rows written
+    """
+    rows = Order.objects.annotate(
+        day=TruncDate('created_at')
+    ).values(
+        'service__department_id', 'service_id', 'client_id', 'status', 'day'
+    ).annotate(
+        order_count=Count('id'),
+        total_price=Sum('price'),
+        total_paid=Sum('total_paid'),
+    ).order_by()
+
+    rollups = [
+        OrderRollup(
+            department_id=row['service__department_id'],
+            service_id=row['service_id'],
+            client_id=row['client_id'],
+            status=row['status'],
+            day=row['day'],
+            order_count=row['order_count'],
+            total_price=row['total_price'] or 0,
+            total_paid=row['total_paid'] or 0,
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        OrderRollup.objects.all().delete()
+        OrderRollup.objects.bulk_create(rollups, batch_size=500)
+
+    return len(rollups)
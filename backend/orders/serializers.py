@@ -6,6 +6,7 @@ from django.utils import timezone
 from django.utils import timezone
 
 from .models import Order, Offer
+from utils.dynamic_fields import DynamicFieldsMixin
 
 # Import Service and PortfolioProject
 try:
@@ -20,7 +21,7 @@ except Exception:
     PortfolioProject = None
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Add new fields
     whatsapp_number = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     price_card_title = serializers.CharField(required=False, allow_blank=True, allow_null=True)
@@ -70,6 +71,22 @@ class OrderSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'status_updated_at', 'status_updated_by'] # Added read_only_fields
+        # Relations read by each field (see utils/query_plans.py)
+        select_related = {
+            'client_name': ['client'],
+            'client_phone': ['client'],
+            'client_address': ['client'],
+            'service_title': ['service'],
+            'department_head': ['service__department__team_head'],
+            'portfolio_project_data': ['portfolio_project'],
+            'form_submission_data': ['form_submission'],
+        }
+        # Columns read by method fields, beyond their relations above
+        field_columns = {
+            'remaining_amount': ['price', 'total_paid'],
+        }
+        # Heavy fields only returned on request once ?fields= / ?expand= is used
+        expandable_fields = ['form_submission_data', 'department_head', 'portfolio_project_data']
     
     def get_portfolio_project_data(self, obj):
         if not obj.portfolio_project:
@@ -111,7 +128,7 @@ class OrderSerializer(serializers.ModelSerializer):
         return None
 
 
-class OfferSerializer(serializers.ModelSerializer):
+class OfferSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Offer model.
 
@@ -182,9 +199,29 @@ class OfferSerializer(serializers.ModelSerializer):
             'approved_by', 'approved_at',
             'created_at', 'updated_at'
         ]
+        # Relations read by each field (see utils/query_plans.py)
+        select_related = {
+            'created_by': ['created_by'],
+            'created_by_email': ['created_by'],
+            'created_by_department': ['created_by_department'],
+            'approved_by': ['approved_by'],
+        }
+        prefetch_related = {
+            'services_info': ['services'],
+        }
+        # Columns read by method fields, beyond their relations above
+        field_columns = {
+            'is_limited_time': ['offer_type', 'is_limited_time'],
+        }
+        # Heavy fields only returned on request once ?fields= / ?expand= is used
+        expandable_fields = ['services_info', 'features', 'conditions', 'terms']
 
     def get_services_info(self, obj):
-        return list(obj.services.values('id', 'title', 'slug'))
+        # Iterate .all() so a prefetched services cache is used
+        return [
+            {'id': service.id, 'title': service.title, 'slug': service.slug}
+            for service in obj.services.all()
+        ]
 
     def get_is_limited_time(self, obj):
         # Maintain compatibility with frontend boolean "is_limited_time"
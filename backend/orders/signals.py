@@ -0,0 +1,87 @@
+# orders/signals.py
+import logging
+
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from services.models import Service
+from .models import Order, Offer
+from .dashboard import get_rollup_key_scopes, invalidate_dashboard_stats
+from .offer_catalog import bump_offers_version
+from .rollups import (
+    ROLLUP_FIELDS, get_rollup_state, get_stored_rollup_state, move_rollup, move_service_rollups,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Order)
+def order_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the order's stored rollup contribution before it changes"""
+    instance._rollup_previous = None
+    instance._rollup_skip = bool(update_fields) and not ROLLUP_FIELDS.intersection(update_fields)
+    if instance.pk and not instance._rollup_skip:
+        try:
+            instance._rollup_previous = get_stored_rollup_state(instance.pk)
+        except Exception as e:
+            logger.error(f"Failed to read rollup state for order {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, **kwargs):
+    """Update order rollups and invalidate cached dashboard stats"""
+    if not getattr(instance, '_rollup_skip', False):
+        try:
+            move_rollup(getattr(instance, '_rollup_previous', None), get_rollup_state(instance))
+        except Exception as e:
+            logger.error(f"Failed to update rollups for order {instance.pk}: {e}")
+    # A changed client, service or department leaves stale stats in the old scopes too
+    previous = getattr(instance, '_rollup_previous', None)
+    invalidate_dashboard_stats(instance, extra_scopes=get_rollup_key_scopes(previous[0]) if previous else ())
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    """Remove the order from rollups and invalidate cached dashboard stats"""
+    try:
+        move_rollup(get_rollup_state(instance), None)
+    except Exception as e:
+        logger.error(f"Failed to update rollups for deleted order {instance.pk}: {e}")
+    invalidate_dashboard_stats(instance)
+
+
+@receiver(pre_save, sender=Service)
+def service_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the service's stored department, whose rollup rows may have to move"""
+    instance._previous_department_id = None
+    if instance.pk and (not update_fields or 'department' in update_fields):
+        instance._previous_department_id = Service.objects.filter(pk=instance.pk).values_list(
+            'department_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Service)
+def service_saved(sender, instance, **kwargs):
+    """Move the service's order rollups when it changes department"""
+    previous = getattr(instance, '_previous_department_id', None)
+    if not previous or previous == instance.department_id:
+        return
+    try:
+        move_service_rollups(instance.pk, previous, instance.department_id)
+    except Exception as e:
+        logger.error(f"Failed to move rollups for service {instance.pk}: {e}")
+    invalidate_dashboard_stats(extra_scopes=[f'department:{previous}', f'department:{instance.department_id}'])
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def offer_changed(sender, instance, **kwargs):
+    """Invalidate cached public offer data when an offer changes"""
+    bump_offers_version()
+
+
+@receiver(m2m_changed, sender=Offer.services.through)
+def offer_services_changed(sender, instance, action, **kwargs):
+    """Invalidate cached public offer data when an offer's services change"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_offers_version()
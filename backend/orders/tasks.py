@@ -92,3 +92,34 @@ def send_order_confirmation(order_id):
     except Exception as e:
         print(f"Failed to send order confirmation: {str(e)}")
         return {'error': str(e)}
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=30, ignore_result=True)
+def render_pdf_job(self, job_id):
+    """
+    Render, upload and record the PDF for a PDFRenderJob.
+    Failed attempts are retried before the job is marked failed; the job
+    row is the result store, so Celery results are not kept.
+    
+    Args:
+        job_id: PDFRenderJob ID
+    
+    Returns:
+        dict: Job status
+    """
+    from orders.pdf_jobs import run_pdf_job, retry_pdf_job, fail_pdf_job
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    try:
+        job = run_pdf_job(job_id)
+        if job is None:
+            return {'job_id': job_id, 'status': 'skipped'}
+        return {'job_id': job_id, 'status': job.status, 'pdf_url': job.pdf_url}
+    except Exception as e:
+        logger.error(f"PDF render job {job_id} failed: {str(e)}")
+        if self.request.retries < self.max_retries:
+            retry_pdf_job(job_id, e)
+            raise self.retry(exc=e)
+        fail_pdf_job(job_id, e)
+        return {'job_id': job_id, 'status': 'failed', 'error': str(e)}
@@ -1,3 +1,650 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from services.models import Department, Service, PriceCard
+from utils.document_storage import get_document_storage
+from utils.dropbox_service import DropboxService
+from utils import http_client
+from utils.pdf_proxy import get_disk_cache, parse_range, proxy_pdf_download
+from .models import Order
+from .estimation_models import Invoice, InvoiceNumberCounter
+from .pdf_job_models import PDFRenderJob
+from .pdf_generators import InvoicePDFGenerator
+from .pdf_jobs import enqueue_pdf_render, run_pdf_job, store_pdf_result
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class OrderListQueryCountTests(TestCase):
+    """The order list must issue a constant number of queries, whatever its size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='x', role='admin'
+        )
+        head = User.objects.create_user(
+            username='head', email='head@example.com', password='x', role='service_head'
+        )
+        cls.department = Department.objects.create(title='Design', slug='design', team_head=head)
+        cls.service = Service.objects.create(title='Logo', slug='logo', department=cls.department)
+        cls.price_card = PriceCard.objects.create(
+            title='basic', department=cls.department, service=cls.service
+        )
+        User.objects.bulk_create([
+            User(username=f'client{i}', email=f'client{i}@example.com', role='client')
+            for i in range(1000)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_orders(self, count):
+        Order.objects.all().delete()
+        clients = list(User.objects.filter(role='client').order_by('id')[:count])
+        Order.objects.bulk_create([
+            Order(
+                client=clients[i],
+                service=self.service,
+                pricing_plan=self.price_card,
+                title=f'Order {i}',
+                price=100,
+            )
+            for i in range(count)
+        ])
+
+    def count_list_queries(self, count):
+        self.create_orders(count)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/orders/', {'page_size': 200})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), min(count, 200))
+        return len(queries)
+
+    def test_lists_are_only_paginated_on_request(self):
+        self.create_orders(60)
+        response = self.client.get('/api/orders/')
+        self.assertEqual(len(response.json()), 60)
+
+        page = self.client.get('/api/orders/', {'page_size': 50}).json()
+        self.assertEqual(len(page['results']), 50)
+        self.assertEqual(len(self.client.get(page['next']).json()['results']), 10)
+
+    def test_order_list_query_count_is_constant(self):
+        counts = {size: self.count_list_queries(size) for size in (10, 100, 1000)}
+        self.assertEqual(counts[10], counts[100], counts)
+        self.assertEqual(counts[10], counts[1000], counts)
+        self.assertLessEqual(counts[1000], 5, counts)
+
+    def test_sparse_fieldset_skips_unrequested_relations(self):
+        self.create_orders(10)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/orders/', {'fields': 'id,title,status'})
+        self.assertEqual(response.status_code, 200)
+        for row in response.json():
+            self.assertEqual(set(row), {'id', 'title', 'status'})
+        self.assertFalse(any('"departments"' in query['sql'] for query in queries))
+        # Columns of dropped fields are not fetched either
+        order_query = next(query['sql'] for query in queries if query['sql'].startswith('SELECT "orders"."id"'))
+        self.assertNotIn('"orders"."details"', order_query)
+        self.assertNotIn('"orders"."form_submission_id"', order_query)
+        self.assertIn('"orders"."title"', order_query)
+
+    def test_expand_includes_heavy_fields_only_on_request(self):
+        self.create_orders(1)
+        row = self.client.get('/api/orders/', {'expand': 'department_head'}).json()[0]
+        self.assertEqual(row['department_head']['email'], 'head@example.com')
+        self.assertNotIn('form_submission_data', row)
+        self.assertIn('service_title', row)
+
+        row = self.client.get('/api/orders/').json()[0]
+        self.assertIn('form_submission_data', row)
+
+    def test_bulk_status_update_reports_failures_per_order(self):
+        from notifications.models import Notification
+        from .rollup_models import OrderRollup
+        from .workflow_models import OrderStatusHistory
+
+        self.create_orders(10)
+        order_ids = list(Order.objects.values_list('id', flat=True))
+        Order.objects.filter(id=order_ids[0]).update(status='closed')
+
+        response = self.client.post('/api/orders/bulk-update-status/', {
+            'order_ids': order_ids + [0],
+            'new_status': 'approved',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(len(body['updated']), 9)
+        self.assertEqual({f['order_id'] for f in body['failed']}, {order_ids[0], 0})
+        self.assertEqual(Order.objects.filter(status='approved').count(), 9)
+        self.assertEqual(OrderStatusHistory.objects.filter(to_status='approved').count(), 9)
+        self.assertEqual(Notification.objects.filter(notification_type='order_update').count(), 9)
+        self.assertEqual(
+            sum(OrderRollup.objects.filter(status='approved').values_list('order_count', flat=True)), 9
+        )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class DashboardStatsCacheTests(TestCase):
+    """Moving an order to another client or department drops the old scope's cached stats"""
+
+    def test_previous_scopes_are_invalidated(self):
+        from .dashboard import get_dashboard_stats
+
+        first = User.objects.create_user(username='first', email='first@example.com', password='x', role='client')
+        second = User.objects.create_user(username='second', email='second@example.com', password='x', role='client')
+        department = Department.objects.create(title='Design', slug='design')
+        service = Service.objects.create(title='Logo', slug='logo', department=department)
+        order = Order.objects.create(client=first, service=service, title='Logo', price=100)
+
+        self.assertEqual(get_dashboard_stats(first)['total_orders'], 1)
+        order.client = second
+        order.save()
+        self.assertEqual(get_dashboard_stats(first)['total_orders'], 0)
+        self.assertEqual(get_dashboard_stats(second)['total_orders'], 1)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ActivityFeedTests(TestCase):
+    """Status feed events commit with the status change and outlive their order"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', role='admin')
+        client = User.objects.create_user(username='client', email='client@example.com', password='x', role='client')
+        department = Department.objects.create(title='Design', slug='design')
+        service = Service.objects.create(title='Logo', slug='logo', department=department)
+        self.order = Order.objects.create(client=client, service=service, title='Logo', price=100)
+
+    def test_failed_feed_write_rolls_back_the_status_change(self):
+        from django.db import DatabaseError
+        from .workflow_models import OrderStatusHistory
+
+        with mock.patch('orders.activity.ActivityEvent.objects.bulk_create', side_effect=DatabaseError('down')):
+            with self.assertRaises(DatabaseError):
+                self.order.update_status('approved', self.admin)
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, 'pending')
+        self.assertFalse(OrderStatusHistory.objects.exists())
+
+    def test_events_are_kept_when_the_order_is_deleted(self):
+        from .activity_models import ActivityEvent
+
+        self.order.update_status('approved', self.admin)
+        self.order.delete()
+        events = ActivityEvent.objects.filter(event_type='order_status')
+        self.assertTrue(events.exists())
+        self.assertEqual({(event.order_id, event.project) for event in events}, {(None, 'Logo')})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RollupMaintenanceTests(TestCase):
+    """Incrementally maintained rollups must match a rebuild from the orders table"""
+
+    def rollups(self):
+        from .rollup_models import OrderRollup
+        return sorted(OrderRollup.objects.values_list(
+            'department_id', 'service_id', 'client_id', 'status', 'day', 'order_count', 'total_price', 'total_paid'
+        ))
+
+    def test_incremental_maintenance_matches_rebuild(self):
+        from payments.ledger import post_entry
+        from .bulk_transitions import bulk_transition_orders
+        from .rollups import rebuild_rollups
+
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', role='admin')
+        clients = [
+            User.objects.create_user(username=f'c{i}', email=f'c{i}@example.com', password='x', role='client')
+            for i in range(2)
+        ]
+        design = Department.objects.create(title='Design', slug='design')
+        print_department = Department.objects.create(title='Print', slug='print', priority=2)
+        logo = Service.objects.create(title='Logo', slug='logo', department=design)
+        flyer = Service.objects.create(title='Flyer', slug='flyer', department=design, priority=2)
+        orders = [
+            Order.objects.create(client=clients[i % 2], service=logo if i % 3 else flyer, title=f'#{i}', price=10 * i)
+            for i in range(6)
+        ]
+
+        orders[0].price = 55
+        orders[0].client = clients[1]
+        orders[0].save()
+        orders[1].delete()
+        orders[2].update_status('approved', admin)
+        bulk_transition_orders(
+            [{'order_id': order.id, 'new_status': 'approved'} for order in orders[3:5]], admin
+        )
+        post_entry(orders[5], 25, 'credit')
+        flyer.department = print_department
+        flyer.save()
+
+        incremental = self.rollups()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.rollups())
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class OfferCatalogTests(TestCase):
+    """Public listings served from the cached catalog must match the database listing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .models import Offer
+
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', role='admin')
+        department = Department.objects.create(title='Design', slug='design')
+        cls.service = Service.objects.create(title='Logo', slug='logo', department=department)
+        valid_to = timezone.now() + timedelta(days=3, hours=12)
+        deal = Offer.objects.create(
+            title='Launch deal', description='Limited launch pricing', offer_type='limited',
+            image='offers/launch.png', original_price=200, discount_value=25, valid_to=valid_to,
+            is_approved=True, approved_by=admin, created_by=admin, features=['Fast'], terms='Once per client',
+        )
+        deal.services.set([cls.service])
+        Offer.objects.create(
+            title='Always on', description='Seasonal pricing', original_price=100, discount_value=10,
+            is_approved=True, created_by=admin, priority=5,
+        )
+
+    def assertMatchesDatabase(self, query):
+        client = APIClient()
+        cached = client.get(f'/api/offers/?{query}')
+        database = client.get(f'/api/offers/?{query}&show_expired=true')
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.json(), database.json())
+        return cached.json()
+
+    def test_catalog_matches_database_listing(self):
+        offers = self.assertMatchesDatabase('')
+        self.assertEqual([offer['title'] for offer in offers], ['Always on', 'Launch deal'])
+        deal = offers[1]
+        self.assertTrue(deal['image'].startswith('http://testserver/'))
+        self.assertTrue(deal['is_limited_time'])
+        self.assertEqual(deal['created_by'], 'admin')
+        self.assertEqual(deal['approved_by'], 'admin')
+
+        self.assertMatchesDatabase('fields=id,title')
+        self.assertMatchesDatabase('expand=services_info')
+        self.assertMatchesDatabase('fields=id&expand=terms')
+        self.assertEqual(len(self.assertMatchesDatabase(f'service={self.service.id}')), 1)
+
+    def test_current_deal_cache_ignores_sparse_fields(self):
+        client = APIClient()
+        client.get('/api/offers/current_deal/?fields=id')
+        deal = client.get('/api/offers/current_deal/').json()
+        self.assertEqual(deal['title'], 'Launch deal')
+        self.assertTrue(deal['image'].startswith('http://testserver/'))
+        self.assertIn('services_info', deal)
+
+    def test_stats_average_discount_matches_offers(self):
+        from .models import Offer
+
+        live = [offer for offer in Offer.objects.all() if offer.is_approved and not offer.is_expired]
+        expected = round(sum(offer.discount_percentage for offer in live) / len(live), 2)
+        self.assertEqual(APIClient().get('/api/offers/stats/').json()['average_discount'], expected)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PDFRenderCacheTests(TestCase):
+    """Unchanged documents must not be rendered or uploaded again"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='head', email='head@example.com', password='x', role='service_head'
+        )
+        department = Department.objects.create(title='Design', slug='design', team_head=cls.user)
+        service = Service.objects.create(title='Logo', slug='logo', department=department)
+        order = Order.objects.create(client=cls.user, service=service, title='Logo', price=100)
+        cls.invoice = Invoice.objects.create(
+            order=order, invoice_number='INV-TEST-1', title='Logo design',
+            line_items=[{'item': 'Logo', 'quantity': 1, 'rate': 100, 'amount': 100}],
+            subtotal=100, total_amount=100,
+        )
+
+    def render(self, upload):
+        with mock.patch('orders.pdf_jobs._dispatch'):
+            with self.captureOnCommitCallbacks(execute=True):
+                job = enqueue_pdf_render('invoice', self.invoice.id, self.user)
+        if job.status == 'queued':
+            with mock.patch('orders.pdf_generators.InvoicePDFGenerator.upload_to_storage', upload):
+                run_pdf_job(job.id)
+            job.refresh_from_db()
+        return job
+
+    def test_unchanged_invoice_reuses_stored_pdf(self):
+        upload = mock.Mock(side_effect=[
+            {'url': 'https://example.com/1.pdf', 'file_path': '/invoices/1.pdf'},
+            {'url': 'https://example.com/2.pdf', 'file_path': '/invoices/2.pdf'},
+        ])
+
+        first = self.render(upload)
+        second = self.render(upload)
+        self.assertEqual(upload.call_count, 1)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.pdf_url, 'https://example.com/1.pdf')
+
+        Invoice.objects.filter(pk=self.invoice.pk).update(discount_amount=10, total_amount=90)
+        third = self.render(upload)
+        self.assertEqual(upload.call_count, 2)
+        self.assertEqual(third.pdf_url, 'https://example.com/2.pdf')
+        self.assertEqual(PDFRenderJob.objects.filter(document_type='invoice').count(), 2)
+
+    def test_storage_path_follows_content(self):
+        location = InvoicePDFGenerator(self.invoice).storage_location()
+        self.assertEqual(InvoicePDFGenerator(self.invoice).storage_location(), location)
+
+        self.invoice.total_amount = 90
+        self.assertNotEqual(InvoicePDFGenerator(self.invoice).storage_location(), location)
+
+    def test_repeated_requests_share_one_job(self):
+        with mock.patch('orders.pdf_jobs._dispatch') as dispatch:
+            with self.captureOnCommitCallbacks(execute=True):
+                jobs = {enqueue_pdf_render('invoice', self.invoice.id, self.user).pk for _ in range(3)}
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(dispatch.call_count, 1)
+
+
+class FakeUpstream:
+    """Streamed storage response; fail_after breaks the body after that many chunks"""
+
+    def __init__(self, body, status_code=200, headers=None, fail_after=None):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'application/pdf', 'Content-Length': str(len(body)), **(headers or {})}
+        self.fail_after = fail_after
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for index in range(0, len(self.body), 4):
+            if self.fail_after is not None and index // 4 >= self.fail_after:
+                raise requests.ConnectionError('connection reset')
+            yield self.body[index:index + 4]
+
+    def close(self):
+        self.closed = True
+
+
+class PDFDownloadProxyTests(TestCase):
+    """The download proxy honours byte ranges and caches only complete downloads"""
+
+    BODY = b'%PDF-1.4 test document'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            PDF_DOWNLOAD_CACHE_DIR=directory.name, PDF_DOWNLOAD_CACHE_MAX_BYTES=len(self.BODY) * 2
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.directory = directory.name
+
+        self.session = mock.Mock()
+        self.session.get.side_effect = lambda url, **kwargs: FakeUpstream(self.BODY)
+        patcher = mock.patch('utils.pdf_proxy.get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def download(self, url, range_header=None):
+        response = proxy_pdf_download(url, 'doc.pdf', range_header)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, body
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=10-', 100), (10, 99))
+        self.assertEqual(parse_range('bytes=10-500', 100), (10, 99))
+        # Suffix ranges: the last N bytes, the whole file if N exceeds it
+        self.assertEqual(parse_range('bytes=-30', 100), (70, 99))
+        self.assertEqual(parse_range('bytes=-300', 100), (0, 99))
+        # Unsatisfiable
+        self.assertIs(parse_range('bytes=-0', 100), False)
+        self.assertIs(parse_range('bytes=100-', 100), False)
+        self.assertIs(parse_range('bytes=50-20', 100), False)
+        # Multiple or malformed ranges are answered with the whole file
+        self.assertIsNone(parse_range('bytes=0-10,20-30', 100))
+        self.assertIsNone(parse_range('bytes=-', 100))
+        self.assertIsNone(parse_range('items=0-10', 100))
+        self.assertIsNone(parse_range(None, 100))
+
+    def test_ranges_are_served_from_the_cache(self):
+        url = 'https://storage.example.com/a.pdf'
+        response, body = self.download(url)
+        self.assertEqual((response.status_code, body), (200, self.BODY))
+
+        response, body = self.download(url, 'bytes=0-3')
+        self.assertEqual((response.status_code, body), (206, b'%PDF'))
+        self.assertEqual(response['Content-Range'], f'bytes 0-3/{len(self.BODY)}')
+
+        response, body = self.download(url, 'bytes=-8')
+        self.assertEqual((response.status_code, body), (206, self.BODY[-8:]))
+
+        response, _ = self.download(url, f'bytes={len(self.BODY)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.BODY)}')
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_range_misses_are_forwarded_upstream(self):
+        size = len(self.BODY)
+        self.session.get.side_effect = [
+            FakeUpstream(self.BODY[:4], status_code=206, headers={'Content-Range': f'bytes 0-3/{size}'}),
+            FakeUpstream(b'', status_code=416, headers={'Content-Range': f'bytes */{size}'}),
+        ]
+        url = 'https://storage.example.com/a.pdf'
+        response, body = self.download(url, 'bytes=0-3')
+        self.assertEqual((response.status_code, body), (206, b'%PDF'))
+        self.assertEqual(response['Content-Range'], f'bytes 0-3/{size}')
+        self.assertEqual(self.session.get.call_args.kwargs['headers'], {'Range': 'bytes=0-3'})
+
+        response, _ = self.download(url, f'bytes={size}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{size}')
+        # Partial bodies are never cached
+        self.assertIsNone(get_disk_cache().get(url))
+
+    def test_least_recently_used_downloads_are_evicted(self):
+        cache = get_disk_cache()
+        urls = [f'https://storage.example.com/{name}.pdf' for name in 'abc']
+        for age, url in zip((300, 200), urls):
+            self.download(url)
+            then = time.time() - age
+            os.utime(cache.path_for(url), (then, then))
+
+        # Reading a marks it as recently used, so b is the one evicted for c
+        self.download(urls[0])
+        self.download(urls[2])
+        self.assertEqual(self.session.get.call_count, 3)
+        self.assertEqual(
+            [os.path.exists(cache.path_for(url)) for url in urls], [True, False, True]
+        )
+
+    def test_interrupted_downloads_are_discarded(self):
+        self.session.get.side_effect = lambda url, **kwargs: FakeUpstream(self.BODY, fail_after=2)
+        url = 'https://storage.example.com/a.pdf'
+        response = proxy_pdf_download(url, 'doc.pdf')
+        with self.assertRaises(requests.ConnectionError):
+            b''.join(response.streaming_content)
+        response.close()
+        self.assertIsNone(get_disk_cache().get(url))
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+@override_settings(
+    ALLOWED_HOSTS=['*'],
+    PDF_STORAGE_BACKEND='utils.document_storage.LocalFileSystemStorage',
+    PDF_STORAGE_PUBLIC_URL='http://testserver',
+)
+class LocalDocumentStorageTests(TestCase):
+    """PDFs kept on local disk are served through signed links and the download proxy"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='head', email='head@example.com', password='x', role='service_head'
+        )
+        department = Department.objects.create(title='Design', slug='design', team_head=cls.user)
+        service = Service.objects.create(title='Logo', slug='logo', department=department)
+        order = Order.objects.create(client=cls.user, service=service, title='Logo', price=100)
+        cls.invoice = Invoice.objects.create(
+            order=order, invoice_number='INV-TEST-1', title='Logo design',
+            line_items=[{'item': 'Logo', 'quantity': 1, 'rate': 100, 'amount': 100}],
+            subtotal=100, total_amount=100,
+        )
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        patcher = mock.patch('utils.document_storage._backends', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        override = self.settings(PDF_STORAGE_LOCAL_ROOT=root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_uploaded_pdf_is_served_locally(self):
+        result = InvoicePDFGenerator(self.invoice).upload_to_storage()
+        store_pdf_result('invoice', self.invoice, result)
+        with get_document_storage().open_file(result['file_path']) as stored:
+            pdf = stored.read()
+        self.assertTrue(result['download_url'].startswith('http://testserver/api/orders/documents/'))
+
+        response = self.client.get(result['download_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content)[:5], b'%PDF-')
+        self.assertEqual(int(response['Content-Length']), len(pdf))
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(f'/api/orders/invoices/{self.invoice.id}/download-pdf/', HTTP_RANGE='bytes=0-4')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-')
+
+        tampered = result['download_url'].rstrip('/') + 'x/'
+        self.assertEqual(self.client.get(tampered).status_code, 404)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class DropboxUploadTests(TestCase):
+    """Shared links are created once per path and bulk uploads commit in one batch"""
+
+    def setUp(self):
+        patcher = mock.patch.object(DropboxService, '_initialize_service')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = DropboxService()
+        self.service.dbx = mock.Mock()
+        self.service.dbx.sharing_create_shared_link_with_settings.side_effect = (
+            lambda path: mock.Mock(url=f'https://dropbox.test{path}?dl=0')
+        )
+
+    def test_reupload_to_known_path_skips_link_creation(self):
+        first = self.service.upload_pdf(BytesIO(b'%PDF-1'), 'a.pdf', '/invoices/1')
+        second = self.service.upload_pdf(BytesIO(b'%PDF-2'), 'a.pdf', '/invoices/1')
+        self.assertEqual(second['download_url'], 'https://dropbox.test/invoices/1/a.pdf?dl=1')
+        self.assertEqual(first, second)
+        self.assertEqual(self.service.dbx.files_upload.call_count, 2)
+        self.assertEqual(self.service.dbx.sharing_create_shared_link_with_settings.call_count, 1)
+        self.service.dbx.sharing_list_shared_links.assert_not_called()
+
+    def test_batch_upload_commits_once(self):
+        dbx = self.service.dbx
+        dbx.files_upload_session_start.side_effect = [mock.Mock(session_id=f's{i}') for i in range(3)]
+        succeeded = mock.Mock(**{'is_failure.return_value': False})
+        failed = mock.Mock(**{'is_failure.return_value': True, 'get_failure.return_value': 'conflict'})
+        dbx.files_upload_session_finish_batch_v2.return_value = mock.Mock(entries=[succeeded, failed, succeeded])
+
+        results = self.service.upload_pdfs([
+            (BytesIO(b'%PDF-a'), f'{name}.pdf', '/receipts/1') for name in 'abc'
+        ])
+        self.assertEqual(dbx.files_upload_session_finish_batch_v2.call_count, 1)
+        dbx.files_upload.assert_not_called()
+        self.assertEqual(results[0]['file_path'], '/receipts/1/a.pdf')
+        self.assertIsInstance(results[1], Exception)
+        self.assertEqual(results[2]['file_path'], '/receipts/1/c.pdf')
+
+
+class InvoiceNumberAllocationTests(TransactionTestCase):
+    """Concurrently created invoices get distinct, consecutive numbers"""
+
+    def test_parallel_invoice_creation(self):
+        head = User.objects.create_user(
+            username='head', email='head@example.com', password='x', role='service_head'
+        )
+        department = Department.objects.create(title='Design', slug='design', team_head=head)
+        service = Service.objects.create(title='Logo', slug='logo', department=department)
+        order = Order.objects.create(client=head, service=service, title='Logo', price=100)
+
+        def create_invoice(i):
+            try:
+                return Invoice.objects.create(
+                    order=order, title=f'Invoice {i}',
+                    line_items=[{'item': 'Logo', 'quantity': 1, 'rate': 100, 'amount': 100}],
+                ).invoice_number
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            numbers = list(pool.map(create_invoice, range(50)))
+
+        self.assertEqual(len(set(numbers)), 50)
+        self.assertEqual(sorted(int(number.rsplit('-', 1)[1]) for number in numbers), list(range(1, 51)))
+        self.assertEqual(InvoiceNumberCounter.objects.get().last_number, 50)
+
+
+class FlakyUpstream(BaseHTTPRequestHandler):
+    """Answers 503 to the first request of each method, then 200"""
+    calls = []
+
+    def respond(self):
+        self.calls.append(self.command)
+        status = 503 if self.calls.count(self.command) == 1 else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(HTTP_CLIENT_RETRIES=2, HTTP_CLIENT_BACKOFF=0)
+class SharedHTTPClientTests(TestCase):
+    """Transient upstream failures are retried for idempotent requests only, and measured"""
+
+    def setUp(self):
+        FlakyUpstream.calls = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyUpstream)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        self.session = http_client.build_session()
+        self.addCleanup(self.session.close)
+        http_client.metrics.reset()
+
+    def test_get_is_retried_and_post_is_not(self):
+        self.assertEqual(self.session.get(self.url).status_code, 200)
+        self.assertEqual(self.session.post(self.url, data={'code': 'x'}).status_code, 503)
+        self.assertEqual(FlakyUpstream.calls, ['GET', 'GET', 'POST'])
+
+        stats = http_client.upstream_metrics()['127.0.0.1']
+        self.assertEqual((stats['requests'], stats['retries'], stats['errors']), (2, 1, 1))
+        self.assertIsNotNone(stats['p95_ms'])
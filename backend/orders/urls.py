@@ -23,6 +23,7 @@ urlpatterns = [
     # Otherwise router catches everything
     
     # Workflow endpoints
+    path('bulk-update-status/', workflow_views.bulk_update_order_status, name='bulk-update-order-status'),
     path('<int:order_id>/update-status/', workflow_views.update_order_status, name='update-order-status'),
     path('<int:order_id>/status-history/', workflow_views.order_status_history, name='order-status-history'),
     path('<int:order_id>/upload-deliverable/', workflow_views.upload_deliverable, name='upload-deliverable'),
@@ -37,10 +38,12 @@ urlpatterns = [
     path('<int:order_id>/invoices/generate/', estimation_views.generate_invoice, name='generate-invoice'),
     path('invoices/<int:invoice_id>/generate-pdf/', estimation_views.generate_invoice_pdf, name='generate-invoice-pdf'),
     path('invoices/<int:invoice_id>/download/', estimation_views.download_invoice, name='download-invoice'),
+    path('pdf-jobs/<uuid:job_id>/', estimation_views.pdf_job_status, name='pdf-job-status'),
     
     # Download proxy endpoints
     path('estimations/<int:estimation_id>/download-pdf/', download_views.download_estimation_pdf, name='download-estimation-pdf'),
     path('invoices/<int:invoice_id>/download-pdf/', download_views.download_invoice_pdf, name='download-invoice-pdf'),
+    path('documents/<str:token>/', download_views.download_stored_document, name='stored-document'),
     
     # Tasks endpoint (for consistency with other order-related endpoints)
     path('<int:order_id>/tasks/', include('tasks.urls_order_tasks')),
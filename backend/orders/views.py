@@ -6,15 +6,25 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db.models import Q, Count, Avg, ProtectedError
 from django.utils import timezone
 
 from .models import Order, Offer
 from .serializers import OrderSerializer, OfferSerializer
+from .dashboard import get_dashboard_stats, get_user_scope
+from .offer_catalog import (
+    get_offer_catalog, filter_offer_catalog, get_cached_offer_value,
+    public_offers_queryset, refresh_offer_timing,
+)
+from .activity_models import ActivityEvent
+from .workflow_serializers import ActivityEventSerializer
 
 # Import your role-based permission helpers
 from accounts.permissions import IsAdmin, IsTeamHead
 from accounts.utils import get_user_department
+from utils.dynamic_fields import select_field_names
+from utils.pagination import paginate_list
+from utils.query_plans import QueryPlanMixin
 
 # Simple permission class used for public read-only access
 class AllowAnyReadOnly(drf_permissions.BasePermission):
@@ -58,7 +68,7 @@ class OfferObjectPermission(drf_permissions.BasePermission):
         return False
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [drf_permissions.IsAuthenticated]
@@ -128,137 +138,42 @@ class OrderViewSet(viewsets.ModelViewSet):
         except Exception as e:
             print(f"Failed to send order confirmation email: {e}")
     
+    def destroy(self, request, *args, **kwargs):
+        """Orders with payment ledger entries are kept, like the entries themselves"""
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {'error': 'Orders with recorded payments cannot be deleted.'},
+                status=status.HTTP_409_CONFLICT
+            )
+    
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         """
         Get dashboard statistics for the current user.
         Returns order counts, spending, and progress metrics.
         """
-        user = request.user
-        
-        # Get user's orders based on role
-        if user.role == 'admin':
-            orders = Order.objects.all()
-        elif user.role == 'client':
-            orders = Order.objects.filter(client=user)
-        elif user.role in ['service_head', 'team_member']:
-            department = get_user_department(user)
-            if department:
-                orders = Order.objects.filter(service__department=department)
-            else:
-                orders = Order.objects.none()
-        else:
-            orders = Order.objects.none()
-        
-        from django.db.models import Sum, Count, Q
-        
-        # Calculate statistics
-        total_orders = orders.count()
-        active_orders = orders.filter(
-            status__in=['in_progress', '25_done', '50_done', '75_done']
-        ).count()
-        completed_orders = orders.filter(
-            status__in=['completed', 'closed', 'payment_done', 'delivered']
-        ).count()
-        pending_orders = orders.filter(status='pending').count()
-        
-        # Financial stats
-        total_spent = orders.aggregate(total=Sum('price'))['total'] or 0
-        total_paid = orders.aggregate(total=Sum('total_paid'))['total'] or 0
-        pending_payments = float(total_spent) - float(total_paid)
-        
-        # Progress calculation
-        progress_orders = orders.filter(
-            status__in=['in_progress', '25_done', '50_done', '75_done']
-        )
-        avg_progress = 0
-        if progress_orders.exists():
-            total_progress = sum([
-                25 if o.status == '25_done' else
-                50 if o.status == '50_done' else
-                75 if o.status == '75_done' else
-                10 if o.status == 'in_progress' else 0
-                for o in progress_orders
-            ])
-            avg_progress = total_progress // progress_orders.count() if progress_orders.count() > 0 else 0
-        
-        return Response({
-            'total_orders': total_orders,
-            'active_orders': active_orders,
-            'completed_orders': completed_orders,
-            'pending_orders': pending_orders,
-            'total_spent': float(total_spent),
-            'total_paid': float(total_paid),
-            'pending_payments': pending_payments,
-            'avg_progress': avg_progress
-        })
+        return Response(get_dashboard_stats(request.user))
     
     @action(detail=False, methods=['get'])
     def recent_activity(self, request):
         """
         Get recent activity for the current user's dashboard.
-        Combines order status changes, notifications, and other events.
+        Reads the ActivityEvent feed for the user's scope, newest first,
+        with keyset pagination (?cursor=, ?page_size=).
         """
-        user = request.user
-        activities = []
+        scope = get_user_scope(request.user)
+        events = ActivityEvent.objects.filter(scope=scope) if scope else ActivityEvent.objects.none()
         
-        # Get user's orders
-        if user.role == 'admin':
-            orders = Order.objects.all()
-        elif user.role == 'client':
-            orders = Order.objects.filter(client=user)
-        elif user.role in ['service_head', 'team_member']:
-            department = get_user_department(user)
-            if department:
-                orders = Order.objects.filter(service__department=department)
-            else:
-                orders = Order.objects.none()
-        else:
-            orders = Order.objects.none()
-        
-        # Get recent order updates (last 10)
-        recent_orders = orders.order_by('-updated_at')[:10]
-        
-        for order in recent_orders:
-            # Determine activity type based on status
-            if order.status in ['completed', 'closed', 'payment_done']:
-                activity_status = 'completed'
-                action = f"Order completed: {order.title}"
-            elif order.status in ['in_progress', '25_done', '50_done', '75_done']:
-                activity_status = 'in-progress'
-                progress_map = {
-                    'in_progress': '0%',
-                    '25_done': '25%',
-                    '50_done': '50%',
-                    '75_done': '75%'
-                }
-                progress = progress_map.get(order.status, '0%')
-                action = f"Order in progress ({progress}): {order.title}"
-            elif order.status == 'pending':
-                activity_status = 'pending'
-                action = f"Order pending approval: {order.title}"
-            else:
-                activity_status = 'pending'
-                action = f"Order {order.get_status_display()}: {order.title}"
-            
-            activities.append({
-                'id': f'order_{order.id}',
-                'type': 'order_update',
-                'action': action,
-                'project': order.title,
-                'status': activity_status,
-                'time': order.updated_at.isoformat(),
-                'order_id': order.id
-            })
-        
-        # Sort by time (most recent first)
-        activities.sort(key=lambda x: x['time'], reverse=True)
-        
-        return Response(activities[:10])
+        return paginate_list(
+            request, events, ActivityEventSerializer,
+            ordering=('-timestamp', '-id')
+        )
 
 
 
-class OfferViewSet(viewsets.ModelViewSet):
+class OfferViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """
     OfferViewSet supports:
       - Public listing/retrieval of approved & active offers (no auth needed)
@@ -268,6 +183,7 @@ class OfferViewSet(viewsets.ModelViewSet):
     """
     queryset = Offer.objects.all()
     serializer_class = OfferSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     parser_classes = [MultiPartParser, FormParser]
 
     # Default permission: allow public reads, authenticated writes
@@ -353,6 +269,32 @@ class OfferViewSet(viewsets.ModelViewSet):
         # Distinct because of M2M joins
         return qs.distinct().order_by('-priority', '-created_at')
 
+    def list(self, request, *args, **kwargs):
+        """
+        Public listings (non-admin, currently valid offers) are served from the
+        cached offer catalog; admins and show_expired queries hit the database.
+        """
+        user = getattr(request, 'user', None)
+        is_admin = bool(user and getattr(user, 'role', '') == 'admin')
+        show_expired = request.query_params.get('show_expired')
+        is_active = request.query_params.get('is_active')
+
+        if (
+            not is_admin
+            and (show_expired is None or show_expired.lower() == 'false')
+            and (is_active is None or is_active.lower() == 'true')
+        ):
+            offers = filter_offer_catalog(get_offer_catalog(request), request.query_params)
+            if 'fields' in request.query_params or 'expand' in request.query_params:
+                expandable = OfferSerializer.Meta.expandable_fields
+                offers = [
+                    {name: offer[name] for name in select_field_names(offer, request.query_params, expandable)}
+                    for offer in offers
+                ]
+            return Response(offers)
+
+        return super().list(request, *args, **kwargs)
+
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """
@@ -362,51 +304,52 @@ class OfferViewSet(viewsets.ModelViewSet):
         - featured_offers
         - limited_time_offers
         - avg_discount (for active offers)
+
+        Computed in one aggregate query and cached per offers version.
         """
-        now = timezone.now()
-        base_qs = Offer.objects.filter(is_approved=True, is_active=True, valid_from__lte=now).filter(Q(valid_to__gte=now) | Q(valid_to__isnull=True))
-
-        total = Offer.objects.count()
-        active = base_qs.count()
-        featured = base_qs.filter(is_featured=True).count()
-        limited = base_qs.filter(offer_type='limited').count()
-
-        # average discount (percentage)
-        avg_discount = 0.0
-        if base_qs.exists():
-            total_pct = 0.0
-            count = 0
-            for o in base_qs:
-                try:
-                    total_pct += float(o.discount_percentage or 0)
-                    count += 1
-                except Exception:
-                    pass
-            if count > 0:
-                avg_discount = total_pct / count
-
-        return Response({
-            "total_offers": total,
-            "active_offers": active,
-            "featured_offers": featured,
-            "limited_time_offers": limited,
-            "average_discount": round(float(avg_discount), 2),
-        })
+        def build_stats():
+            now = timezone.now()
+            live = Q(is_approved=True, is_active=True, valid_from__lte=now) & (
+                Q(valid_to__gte=now) | Q(valid_to__isnull=True)
+            )
+            result = Offer.objects.aggregate(
+                total=Count('id'),
+                active=Count('id', filter=live),
+                featured=Count('id', filter=live & Q(is_featured=True)),
+                limited=Count('id', filter=live & Q(offer_type='limited')),
+                avg_discount=Avg(Offer.discount_percentage_expression(), filter=live),
+            )
+            return {
+                "total_offers": result['total'],
+                "active_offers": result['active'],
+                "featured_offers": result['featured'],
+                "limited_time_offers": result['limited'],
+                "average_discount": round(float(result['avg_discount'] or 0.0), 2),
+            }
+
+        return Response(get_cached_offer_value('stats', build_stats))
 
     @action(detail=False, methods=['get'])
     def current_deal(self, request):
         """
         Return a single current deal (featured prioritized). Public endpoint.
+        The payload is cached per offers version; remaining_days is refreshed on read.
         """
-        now = timezone.now()
-        # pick featured active offer first
-        deal = Offer.objects.filter(is_approved=True, is_active=True, offer_type='limited', valid_from__lte=now).filter(Q(valid_to__gte=now) | Q(valid_to__isnull=True)).order_by('-priority', '-created_at').first()
-        if not deal:
-            deal = Offer.objects.filter(is_approved=True, is_active=True, valid_from__lte=now).filter(Q(valid_to__gte=now) | Q(valid_to__isnull=True)).order_by('-priority', '-created_at').first()
-
+        def build_current_deal():
+            live = public_offers_queryset().order_by('-priority', '-created_at')
+            # pick featured active offer first
+            deal = live.filter(offer_type='limited').first() or live.first()
+            if deal:
+                # Shared by every visitor: render all fields whatever this request's ?fields=
+                context = {'request': request, 'sparse_fields': False}
+                return dict(self.get_serializer(deal, context=context).data)
+            return {}
+
+        # Image URLs are absolute, so the deal is cached per site URL like the catalog
+        name = f"current_deal:{request.build_absolute_uri('/')}"
+        deal = get_cached_offer_value(name, build_current_deal)
         if deal:
-            serializer = self.get_serializer(deal, context={'request': request})
-            return Response(serializer.data)
+            return Response(refresh_offer_timing(deal))
         else:
             return Response({
                 'title': 'No current deals',
@@ -107,21 +107,42 @@ class OrderWorkflow:
         """Check if status is terminal (no further transitions allowed)"""
         return len(cls.ALLOWED_TRANSITIONS.get(status, [])) == 0
     
+    # Progress percentage reported for each status
+    PROGRESS_PERCENTAGES = {
+        "pending": 0,
+        "approved": 5,
+        "estimation_sent": 10,
+        "in_progress": 20,
+        "25_done": 25,
+        "50_done": 50,
+        "75_done": 75,
+        "ready_for_delivery": 90,
+        "delivered": 95,
+        "payment_pending": 97,
+        "payment_done": 99,
+        "closed": 100,
+    }
+    
     @classmethod
     def get_progress_percentage(cls, status):
         """Get progress percentage for a status"""
-        progress_map = {
-            "pending": 0,
-            "approved": 5,
-            "estimation_sent": 10,
-            "in_progress": 20,
-            "25_done": 25,
-            "50_done": 50,
-            "75_done": 75,
-            "ready_for_delivery": 90,
-            "delivered": 95,
-            "payment_pending": 97,
-            "payment_done": 99,
-            "closed": 100,
-        }
-        return progress_map.get(status, 0)
+        return cls.PROGRESS_PERCENTAGES.get(status, 0)
+    
+    @classmethod
+    def progress_percentage_expression(cls, field="status"):
+        """
+        Database-side equivalent of get_progress_percentage().
+        
+        Returns:
+            Case: Expression mapping the status column to its progress percentage
+        """
+        from django.db.models import Case, When, Value, IntegerField
+        
+        return Case(
+            *[
+                When(**{field: status}, then=Value(cls.get_progress_percentage(status)))
+                for status in cls.PROGRESS_PERCENTAGES
+            ],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
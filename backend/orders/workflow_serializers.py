@@ -1,8 +1,10 @@
 # orders/workflow_serializers.py
 from rest_framework import serializers
 from .workflow_models import OrderStatusHistory
+from .activity_models import ActivityEvent
 from .models import Order
 from .workflow import OrderWorkflow
+from .bulk_transitions import MAX_BULK_TRANSITIONS
 
 
 class OrderStatusHistorySerializer(serializers.ModelSerializer):
@@ -57,6 +59,45 @@ class OrderStatusUpdateSerializer(serializers.Serializer):
         return value
 
 
+class OrderStatusTransitionSerializer(serializers.Serializer):
+    """One entry of a bulk status update"""
+
+    order_id = serializers.IntegerField()
+    new_status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+
+class BulkOrderStatusUpdateSerializer(serializers.Serializer):
+    """
+    Serializer for bulk status updates. Accepts either a list of
+    per-order transitions, or order_ids sharing one new_status.
+    Transitions themselves are validated per order by the bulk update.
+    """
+
+    transitions = OrderStatusTransitionSerializer(many=True, required=False)
+    order_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    new_status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        transitions = list(attrs.get('transitions') or [])
+        if attrs.get('order_ids'):
+            if not attrs.get('new_status'):
+                raise serializers.ValidationError({'new_status': 'This field is required with order_ids.'})
+            transitions.extend(
+                {'order_id': order_id, 'new_status': attrs['new_status'], 'notes': attrs.get('notes', '')}
+                for order_id in attrs['order_ids']
+            )
+
+        if not transitions:
+            raise serializers.ValidationError("Provide transitions or order_ids")
+        if len(transitions) > MAX_BULK_TRANSITIONS:
+            raise serializers.ValidationError(f"At most {MAX_BULK_TRANSITIONS} orders can be updated at once")
+
+        attrs['transitions'] = transitions
+        return attrs
+
+
 class OrderDeliverableSerializer(serializers.Serializer):
     """Serializer for uploading order deliverables"""
     
@@ -82,3 +123,19 @@ class OrderWorkflowInfoSerializer(serializers.Serializer):
     progress_percentage = serializers.IntegerField()
     is_terminal = serializers.BooleanField()
     status_color = serializers.CharField()
+
+
+class ActivityEventSerializer(serializers.ModelSerializer):
+    """Activity feed entry, in the shape the dashboards already consume"""
+
+    id = serializers.SerializerMethodField()
+    type = serializers.CharField(source='event_type', read_only=True)
+    time = serializers.DateTimeField(source='timestamp', read_only=True)
+
+    class Meta:
+        model = ActivityEvent
+        fields = ['id', 'type', 'action', 'project', 'status', 'time', 'order_id', 'metadata']
+        read_only_fields = fields
+
+    def get_id(self, obj):
+        return f'event_{obj.id}'
@@ -11,9 +11,12 @@ import logging
 from .models import Order
 from .workflow_models import OrderStatusHistory
 from .workflow import OrderWorkflow
+from .activity import record_deliverable
+from .bulk_transitions import bulk_transition_orders
 from .workflow_serializers import (
     OrderStatusHistorySerializer,
     OrderStatusUpdateSerializer,
+    BulkOrderStatusUpdateSerializer,
     OrderDeliverableSerializer,
     OrderWorkflowInfoSerializer
 )
@@ -142,6 +145,68 @@ def update_order_status(request, order_id):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_update_order_status(request):
+    """
+    Update the status of several orders at once
+    POST /api/orders/bulk-update-status/
+
+    Body: {"order_ids": [1, 2], "new_status": "ready_for_delivery", "notes": ""}
+      or: {"transitions": [{"order_id": 1, "new_status": "...", "notes": ""}, ...]}
+
+    Valid transitions are applied even if others fail; failures are reported per order.
+    """
+    user = request.user
+    if user.role not in ['admin', 'service_head']:
+        return Response(
+            {'error': 'Only admins and service heads can update order status'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    department = None
+    if user.role == 'service_head':
+        from services.models import Department
+        department = Department.objects.filter(team_head=user).first()
+        if not department:
+            return Response(
+                {'error': 'You are not assigned to any department'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+    serializer = BulkOrderStatusUpdateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        updated, failures = bulk_transition_orders(
+            serializer.validated_data['transitions'], user, department=department
+        )
+    except Exception as e:
+        logger.error(f"Error in bulk order status update: {str(e)}", exc_info=True)
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    status_labels = dict(Order.STATUS_CHOICES)
+    return Response({
+        'success': not failures,
+        'message': f'{len(updated)} order(s) updated, {len(failures)} failed',
+        'updated': [
+            {
+                'id': order.id,
+                'status': order.status,
+                'status_display': status_labels.get(order.status),
+                'status_updated_at': order.status_updated_at,
+                'status_updated_by': user.email
+            }
+            for order in updated
+        ],
+        'failed': failures,
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def order_status_history(request, order_id):
@@ -238,6 +303,7 @@ def upload_deliverable(request, order_id):
         
         order.deliverables.append(deliverable_data)
         order.save()
+        record_deliverable(order, deliverable_data, actor=user)
         
         # Send notification to client
         if order.client:
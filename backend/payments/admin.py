@@ -1,6 +1,6 @@
 # payments/admin.py
 from django.contrib import admin
-from .models import PaymentRequest, PaymentOrder, Transaction, WebhookLog
+from .models import LedgerEntry, PaymentRequest, PaymentOrder, Transaction, WebhookLog
 
 
 @admin.register(PaymentRequest)
@@ -30,4 +30,19 @@ class WebhookLogAdmin(admin.ModelAdmin):
     list_filter = ['gateway', 'status', 'is_verified', 'created_at']
     search_fields = ['event_type', 'transaction__transaction_id']
     readonly_fields = ['created_at', 'processed_at']
-    date_hierarchy = 'created_at'
\ No newline at end of file
+    date_hierarchy = 'created_at'
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'order', 'kind', 'amount', 'currency', 'transaction', 'created_by', 'created_at']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['order__id', 'order__title', 'transaction__transaction_id', 'note']
+    date_hierarchy = 'created_at'
+
+    # Append-only: entries are posted through payments.ledger, never edited
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,145 @@
+# payments/ledger.py
+"""
+Order balances from the payment ledger.
+
+Money is recorded as LedgerEntry rows, never edited: a payment posts a
+credit, a refund a negative entry, a correction an adjustment. Each post
+adds its amount to Order.total_paid with an F() expression in the same
+database transaction, so the balance is maintained incrementally and
+always equals the sum of the order's entries.
+
+reconcile_order_balances() recomputes every balance from the ledger in a
+single set-based UPDATE, for repairing drift (e.g. balances written
+outside post_entry()).
+"""
+import logging
+from decimal import Decimal
+
+from django.db import connection, transaction as db_transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import LedgerEntry
+
+logger = logging.getLogger(__name__)
+
+
+def post_entry(order, amount, kind, transaction=None, currency="INR", note="", created_by=None):
+    """
+    Append a ledger entry and apply it to the order's balance.
+    Call inside the database transaction that records the payment.
+
+    Args:
+        order: Order instance (its total_paid is refreshed)
+        amount: signed amount (negative for refunds)
+        kind: 'credit', 'refund' or 'adjustment'
+
+    Returns:
+        LedgerEntry
+    """
+    from orders.dashboard import invalidate_dashboard_stats
+    from orders.models import Order
+    from orders.rollups import get_stored_rollup_state, move_rollup
+
+    amount = Decimal(amount)
+    entry = LedgerEntry.objects.create(
+        order=order,
+        transaction=transaction,
+        kind=kind,
+        amount=amount,
+        currency=currency,
+        note=note,
+        created_by=created_by,
+    )
+
+    Order.objects.filter(pk=order.pk).update(total_paid=F('total_paid') + amount)
+    order.refresh_from_db(fields=['total_paid'])
+
+    # queryset.update() skips the Order signals, so move the rollup here
+    try:
+        current_state = get_stored_rollup_state(order.pk)
+        key, price, paid = current_state
+        move_rollup((key, price, paid - amount), current_state)
+    except Exception as e:
+        logger.error(f"Failed to update rollups for order {order.pk}: {e}")
+    invalidate_dashboard_stats(order)
+
+    return entry
+
+
+def _balances_sql():
+    """Per-order ledger balance (0 for orders without entries)"""
+    from orders.models import Order
+
+    quote = connection.ops.quote_name
+    return (
+        f"SELECT o.id AS order_id, COALESCE(ROUND(SUM(l.amount), 2), 0) AS balance "
+        f"FROM {quote(Order._meta.db_table)} o "
+        f"LEFT JOIN {quote(LedgerEntry._meta.db_table)} l ON l.order_id = o.id "
+        f"GROUP BY o.id"
+    )
+
+
+def find_balance_drift():
+    """
+    Orders whose total_paid differs from their ledger balance, in one query.
+
+    Returns:
+        list: (order id, total_paid, ledger balance)
+    """
+    from orders.models import Order
+
+    orders = connection.ops.quote_name(Order._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT b.order_id, o.total_paid, b.balance FROM {orders} o "
+            f"JOIN ({_balances_sql()}) b ON b.order_id = o.id "
+            f"WHERE o.total_paid <> b.balance ORDER BY b.order_id"
+        )
+        rows = cursor.fetchall()
+    cent = Decimal('0.01')
+    return [
+        (order_id, Decimal(str(paid)).quantize(cent), Decimal(str(balance)).quantize(cent))
+        for order_id, paid, balance in rows
+    ]
+
+
+def reconcile_order_balances():
+    """
+    Set every order's total_paid to its ledger balance.
+
+    Returns:
+        list: (order id, previous total_paid, ledger balance) of the orders corrected
+    """
+    from orders.dashboard import invalidate_dashboard_stats
+    from orders.models import Order
+    from orders.rollups import rebuild_rollups
+
+    with db_transaction.atomic():
+        drift = find_balance_drift()
+        if not drift:
+            return drift
+
+        if connection.vendor in ("postgresql", "sqlite"):
+            # One statement: UPDATE ... FROM an aggregate over the ledger
+            orders = connection.ops.quote_name(Order._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {orders} SET total_paid = b.balance "
+                    f"FROM ({_balances_sql()}) AS b "
+                    f"WHERE {orders}.id = b.order_id AND {orders}.total_paid <> b.balance"
+                )
+        else:
+            balance = LedgerEntry.objects.filter(order=OuterRef('pk')).values('order').annotate(
+                total=Sum('amount')
+            ).values('total')
+            Order.objects.update(total_paid=Coalesce(
+                Subquery(balance), Value(Decimal('0')), output_field=DecimalField(max_digits=12, decimal_places=2)
+            ))
+
+        # Balances changed behind the Order signals: recompute the rollups
+        rebuild_rollups()
+
+    changed = Order.objects.filter(pk__in=[order_id for order_id, _, _ in drift]).select_related('service')
+    invalidate_dashboard_stats(*changed)
+    return drift
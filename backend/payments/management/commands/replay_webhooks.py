@@ -0,0 +1,65 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.models import WebhookLog
+from payments.webhooks import fail_webhook, process_webhook, queue_webhook
+
+REPLAYABLE_STATUSES = ('failed', 'received', 'processing')
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-run stored gateway webhooks that failed (or, with --status, were never processed). '
+        'Events rejected for an invalid signature are never replayed. Runs inline unless --queue '
+        'is given; already processed events are skipped, so replaying twice is harmless.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Webhook log IDs (default: every matching event)')
+        parser.add_argument('--gateway', choices=['razorpay', 'paypal'])
+        parser.add_argument('--status', nargs='+', choices=REPLAYABLE_STATUSES, default=['failed'],
+                            help="Statuses to replay (default: failed). 'processing' recovers events "
+                                 "whose worker died.")
+        parser.add_argument('--since', type=date.fromisoformat, help='Only events received on or after (YYYY-MM-DD)')
+        parser.add_argument('--queue', action='store_true', help='Hand events to Celery instead of running inline')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the matching events')
+
+    def handle(self, *args, **options):
+        webhooks = WebhookLog.objects.filter(status__in=options['status']).exclude(
+            gateway='razorpay', is_verified=False
+        ).order_by('created_at')
+        if options['ids']:
+            webhooks = webhooks.filter(pk__in=options['ids'])
+        if options['gateway']:
+            webhooks = webhooks.filter(gateway=options['gateway'])
+        if options['since']:
+            webhooks = webhooks.filter(created_at__date__gte=options['since'])
+
+        webhooks = list(webhooks.values_list('pk', 'gateway', 'event_type', 'status'))
+        self.stdout.write(f'{len(webhooks)} webhooks to replay')
+        if options['dry_run']:
+            for pk, gateway, event_type, current in webhooks:
+                self.stdout.write(f'  #{pk} {gateway} {event_type} ({current})')
+            return
+        if options['ids'] and not webhooks:
+            raise CommandError('None of the given webhooks is in a replayable status')
+
+        results = {}
+        for pk, gateway, event_type, current in webhooks:
+            if options['queue']:
+                # The task only claims 'received' events
+                WebhookLog.objects.filter(pk=pk, status=current).update(status='received')
+                queue_webhook(pk)
+                results['queued'] = results.get('queued', 0) + 1
+                continue
+            try:
+                outcome = process_webhook(pk, statuses=(current,)) or 'skipped'
+            except Exception as e:
+                fail_webhook(pk, e)
+                outcome = 'failed'
+                self.stdout.write(self.style.ERROR(f'  #{pk} {gateway} {event_type}: {e}'))
+            results[outcome] = results.get(outcome, 0) + 1
+
+        summary = ', '.join(f'{count} {outcome}' for outcome, count in sorted(results.items()))
+        self.stdout.write(self.style.SUCCESS(f'Done: {summary or "nothing replayed"}'))
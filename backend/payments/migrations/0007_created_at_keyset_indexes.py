@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0025_created_at_keyset_indexes'),
+        ('payments', '0006_transaction_receipt_pdf_dropbox_path_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymentrequest',
+            index=models.Index(fields=['-created_at', '-id'], name='payment_req_created_0e4499_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['-created_at', '-id'], name='transaction_created_08f2b0_idx'),
+        ),
+    ]
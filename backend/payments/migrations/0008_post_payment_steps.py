@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_created_at_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostPaymentStep',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('step', models.CharField(choices=[('receipt_render', 'Receipt render'), ('storage_upload', 'Receipt storage upload'), ('client_email', 'Client email'), ('staff_fanout', 'Staff emails'), ('notifications', 'Dashboard notifications')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('detail', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_payment_steps', to='payments.transaction')),
+            ],
+            options={
+                'db_table': 'post_payment_steps',
+                'ordering': ['transaction', 'id'],
+                'indexes': [models.Index(fields=['status'], name='post_paymen_status_aacc92_idx')],
+                'constraints': [models.UniqueConstraint(fields=('transaction', 'step'), name='post_payment_step_unique')],
+            },
+        ),
+    ]
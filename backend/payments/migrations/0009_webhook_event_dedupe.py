@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_post_payment_steps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhooklog',
+            name='event_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='payment_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='webhooklog',
+            constraint=models.UniqueConstraint(condition=models.Q(('event_id', ''), _negated=True), fields=('gateway', 'event_id'), name='webhook_event_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='webhooklog',
+            constraint=models.UniqueConstraint(condition=models.Q(('payment_id', ''), _negated=True), fields=('gateway', 'event_type', 'payment_id'), name='webhook_payment_event_unique'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:51
+# Modified to open the ledger from existing verified payments
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def open_ledger(apps, schema_editor):
+    """
+    Credit every successful verified transaction. Orders whose total_paid
+    differs from their credits are only reported: balances are not
+    changed here, and no entry is invented to cover the difference.
+    Review them with `manage.py fix_order_totals --dry-run`.
+    """
+    Order = apps.get_model('orders', 'Order')
+    Transaction = apps.get_model('payments', 'Transaction')
+    LedgerEntry = apps.get_model('payments', 'LedgerEntry')
+
+    transactions = Transaction.objects.filter(status='success', is_verified=True).order_by('completed_at', 'id')
+    LedgerEntry.objects.bulk_create([
+        LedgerEntry(
+            order_id=txn.order_id, transaction_id=txn.id, kind='credit', amount=txn.amount,
+            currency=txn.currency, note=f'{txn.gateway} {txn.transaction_id}'[:255],
+        )
+        for txn in transactions.iterator()
+    ], batch_size=500)
+
+    credited = dict(
+        LedgerEntry.objects.values('order_id').annotate(total=Sum('amount')).values_list('order_id', 'total')
+    )
+    drift = sum(
+        1 for order_id, total_paid in Order.objects.values_list('id', 'total_paid').iterator()
+        if total_paid != credited.get(order_id, Decimal('0'))
+    )
+    if drift:
+        print(
+            f"\n  {drift} order(s) have a total_paid that differs from their verified payments; "
+            f"review with `manage.py fix_order_totals --dry-run`"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0030_invoice_number_counters'),
+        ('payments', '0009_webhook_event_dedupe'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('credit', 'Payment'), ('refund', 'Refund'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('currency', models.CharField(default='INR', max_length=3)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='orders.order')),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='payments.transaction')),
+            ],
+            options={
+                'db_table': 'ledger_entries',
+                'ordering': ['order', 'id'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('kind', 'credit')), fields=('transaction',), name='ledger_credit_once')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
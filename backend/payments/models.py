@@ -75,6 +75,7 @@ class PaymentRequest(models.Model):
             models.Index(fields=["order"]),
             models.Index(fields=["status"]),
             models.Index(fields=["requested_by"]),
+            models.Index(fields=["-created_at", "-id"]),
         ]
     
     def __str__(self):
@@ -290,6 +291,7 @@ class Transaction(models.Model):
             models.Index(fields=["gateway"]),
             models.Index(fields=["order"]),
             models.Index(fields=["is_verified"]),
+            models.Index(fields=["-created_at", "-id"]),
         ]
     
     def __str__(self):
@@ -335,6 +337,11 @@ class WebhookLog(models.Model):
     gateway = models.CharField(max_length=20, choices=GATEWAY_CHOICES)
     event_type = models.CharField(max_length=100)
     
+    # Gateway identifiers used to drop duplicate deliveries (blank for
+    # unverified webhooks, which must not claim them)
+    event_id = models.CharField(max_length=255, blank=True)
+    payment_id = models.CharField(max_length=255, blank=True)
+    
     # Webhook data
     payload = models.JSONField(default=dict)
     headers = models.JSONField(default=dict)
@@ -365,6 +372,18 @@ class WebhookLog(models.Model):
     class Meta:
         db_table = "webhook_logs"
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["gateway", "event_id"],
+                condition=~models.Q(event_id=""),
+                name="webhook_event_unique",
+            ),
+            models.UniqueConstraint(
+                fields=["gateway", "event_type", "payment_id"],
+                condition=~models.Q(payment_id=""),
+                name="webhook_payment_event_unique",
+            ),
+        ]
         indexes = [
             models.Index(fields=["gateway"]),
             models.Index(fields=["event_type"]),
@@ -374,3 +393,132 @@ class WebhookLog(models.Model):
     
     def __str__(self):
         return f"{self.gateway} - {self.event_type} - {self.status}"
+
+
+class PostPaymentStep(models.Model):
+    """
+    One side effect of a successful payment (receipt, emails, notifications),
+    run by payments/pipeline.py as its own Celery task. A step is claimed
+    before it runs and never repeated once done, so replays are harmless.
+    """
+    STEP_CHOICES = [
+        ("receipt_render", "Receipt render"),
+        ("storage_upload", "Receipt storage upload"),
+        ("client_email", "Client email"),
+        ("staff_fanout", "Staff emails"),
+        ("notifications", "Dashboard notifications"),
+    ]
+    
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.CASCADE,
+        related_name="post_payment_steps"
+    )
+    step = models.CharField(max_length=20, choices=STEP_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    # Step progress, e.g. staff already emailed
+    detail = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = "post_payment_steps"
+        ordering = ["transaction", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["transaction", "step"], name="post_payment_step_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["status"]),
+        ]
+    
+    def __str__(self):
+        return f"{self.transaction_id} - {self.step} - {self.status}"
+
+
+class LedgerEntryQuerySet(models.QuerySet):
+    """Blocks the bulk writes that would bypass LedgerEntry.save() / delete()"""
+
+    def update(self, **kwargs):
+        raise ValueError("Ledger entries cannot be changed; post an adjustment instead")
+
+    def delete(self):
+        raise ValueError("Ledger entries cannot be deleted; post an adjustment instead")
+
+
+class LedgerEntry(models.Model):
+    """
+    Append-only record of money moving on an order: payment credits,
+    refunds (negative) and manual adjustments. Order.total_paid is the sum
+    of an order's entries, kept up to date as each entry is posted
+    (payments/ledger.py) and reconciled with fix_order_totals.
+
+    Entries are never updated or deleted, including through querysets, and
+    orders or transactions that have entries cannot be deleted either.
+    """
+    KIND_CHOICES = [
+        ("credit", "Payment"),
+        ("refund", "Refund"),
+        ("adjustment", "Adjustment"),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    order = models.ForeignKey(
+        "orders.Order",
+        on_delete=models.PROTECT,
+        related_name="ledger_entries"
+    )
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="ledger_entries"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Signed: credits are positive, refunds negative
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    currency = models.CharField(max_length=3, default="INR")
+    note = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="ledger_entries"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = LedgerEntryQuerySet.as_manager()
+    
+    class Meta:
+        db_table = "ledger_entries"
+        ordering = ["order", "id"]
+        constraints = [
+            # A payment is credited once, however many times it is reported
+            models.UniqueConstraint(
+                fields=["transaction"], condition=models.Q(kind="credit"), name="ledger_credit_once"
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Order #{self.order_id} - {self.kind} - {self.amount}"
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Ledger entries cannot be changed; post an adjustment instead")
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ledger entries cannot be deleted; post an adjustment instead")
@@ -0,0 +1,289 @@
+# payments/pipeline.py
+"""
+Post-payment side effects, run after the payment's ledger writes commit.
+
+PaymentProcessor.process_payment_success() only records the payment; on
+commit it calls start_post_payment_pipeline(), which queues one Celery task
+per step (payments/tasks.py):
+
+    receipt_render -> storage_upload -> client_email   (chained: the email attaches the receipt)
+    staff_fanout
+    notifications
+
+Every step has a PostPaymentStep row. A step is claimed before it runs and
+is never repeated once done, so a payment verified by both the redirect
+and the webhook, or a task delivered twice, produces its side effects once.
+"""
+import logging
+import threading
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import transaction as db_transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import PostPaymentStep
+
+logger = logging.getLogger(__name__)
+
+STEPS = ('receipt_render', 'storage_upload', 'client_email', 'staff_fanout', 'notifications')
+# Running steps older than this are assumed lost (e.g. worker restart)
+STALE_STEP_AFTER = timedelta(minutes=10)
+
+# Rendered receipts wait here for the upload and email steps, which may run on other workers
+RECEIPT_PDF_CACHE_KEY = "payments:receipt-pdf:{transaction_id}"
+RECEIPT_PDF_CACHE_TIMEOUT = 24 * 60 * 60
+
+SMTP_TIMEOUT = 10
+
+
+def start_post_payment_pipeline(transaction_id):
+    """Create the step rows for a payment and queue them (missing rows only)"""
+    PostPaymentStep.objects.bulk_create(
+        [PostPaymentStep(transaction_id=transaction_id, step=step) for step in STEPS],
+        ignore_conflicts=True
+    )
+    try:
+        from celery import chain
+        from .tasks import (
+            render_receipt_step, upload_receipt_step, send_client_email_step,
+            send_staff_emails_step, create_notifications_step,
+        )
+        chain(
+            render_receipt_step.si(transaction_id),
+            upload_receipt_step.si(transaction_id),
+            send_client_email_step.si(transaction_id),
+        ).delay()
+        send_staff_emails_step.delay(transaction_id)
+        create_notifications_step.delay(transaction_id)
+    except Exception as e:
+        # No broker: run the steps here, off the request thread, as before
+        logger.error(f"Failed to queue post-payment steps for transaction {transaction_id}: {e}")
+        threading.Thread(target=run_pending_steps, args=(transaction_id,), daemon=True).start()
+
+
+def run_pending_steps(transaction_id):
+    """Run every unfinished step for a payment in order, in this process"""
+    for step in STEPS:
+        try:
+            run_step(transaction_id, step)
+        except Exception as e:
+            logger.error(f"Post-payment step {step} failed for transaction {transaction_id}: {e}")
+            fail_step(transaction_id, step, e)
+
+
+def claim_step(transaction_id, step):
+    """Mark a step running; False if it is done or another worker has it"""
+    claimable = Q(status__in=('pending', 'failed')) | Q(
+        status='running', started_at__lt=timezone.now() - STALE_STEP_AFTER
+    )
+    return PostPaymentStep.objects.filter(claimable, transaction_id=transaction_id, step=step).update(
+        status='running', started_at=timezone.now(), attempts=F('attempts') + 1, error=''
+    ) > 0
+
+
+def retry_step(transaction_id, step, error):
+    """Release a step after a failed attempt so its retry can claim it"""
+    PostPaymentStep.objects.filter(transaction_id=transaction_id, step=step, status='running').update(
+        status='pending', error=str(error)
+    )
+
+
+def fail_step(transaction_id, step, error):
+    """Mark a step as failed once its retries are exhausted"""
+    PostPaymentStep.objects.filter(transaction_id=transaction_id, step=step, status='running').update(
+        status='failed', error=str(error), finished_at=timezone.now()
+    )
+
+
+def _complete_step(transaction_id, step):
+    PostPaymentStep.objects.filter(transaction_id=transaction_id, step=step).update(
+        status='done', finished_at=timezone.now()
+    )
+
+
+def run_step(transaction_id, step):
+    """
+    Run one step unless it is already done or running elsewhere.
+
+    Returns:
+        bool: whether the step ran
+    """
+    if not claim_step(transaction_id, step):
+        return False
+
+    record = PostPaymentStep.objects.select_related(
+        'transaction__order__service__department__team_head', 'transaction__user', 'transaction__payment_order'
+    ).get(transaction_id=transaction_id, step=step)
+    handler, atomic = STEP_HANDLERS[step]
+    if atomic:
+        # Side effects and completion commit together: exactly once
+        with db_transaction.atomic():
+            handler(record.transaction, record)
+            _complete_step(transaction_id, step)
+    else:
+        handler(record.transaction, record)
+        _complete_step(transaction_id, step)
+    return True
+
+
+# ----- Receipt -----
+
+def _receipt_generator(txn):
+    from .receipt_generator import ReceiptPDFGenerator
+    return ReceiptPDFGenerator(txn)
+
+
+def _current_receipt(txn, generator):
+    from orders.pdf_jobs import find_current_artifact
+    return find_current_artifact('receipt', txn, generator.content_hash())
+
+
+def _receipt_bytes(txn):
+    """The rendered receipt, from the render step or rendered again"""
+    key = RECEIPT_PDF_CACHE_KEY.format(transaction_id=txn.pk)
+    data = cache.get(key)
+    if data is None:
+        data = _receipt_generator(txn).generate().getvalue()
+        cache.set(key, data, RECEIPT_PDF_CACHE_TIMEOUT)
+    return data
+
+
+def render_receipt(txn, record):
+    generator = _receipt_generator(txn)
+    if _current_receipt(txn, generator):
+        return
+    cache.set(RECEIPT_PDF_CACHE_KEY.format(transaction_id=txn.pk), generator.generate().getvalue(),
+              RECEIPT_PDF_CACHE_TIMEOUT)
+
+
+def upload_receipt(txn, record):
+    from orders.pdf_jobs import record_rendered_pdf
+
+    generator = _receipt_generator(txn)
+    if _current_receipt(txn, generator):
+        return
+    result = generator.upload_to_storage(pdf_file=BytesIO(_receipt_bytes(txn)))
+    record_rendered_pdf('receipt', txn, generator.content_hash(), result, user=txn.user)
+    logger.info(f"Receipt PDF stored for transaction {txn.pk}")
+
+
+# ----- Emails -----
+
+def send_client_email(txn, record):
+    client, order = txn.user, txn.order
+    if not client or not client.email:
+        return
+
+    html_message = render_to_string('emails/payment_success_client.html', {
+        'client_name': client.get_full_name() or client.email,
+        'order_id': order.id,
+        'order_title': order.title,
+        'amount': txn.amount,
+        'currency': txn.currency,
+        'transaction_id': txn.transaction_id,
+        'payment_method': txn.get_payment_method_display(),
+        'payment_date': txn.completed_at.strftime('%B %d, %Y'),
+        'dashboard_link': f"{settings.FRONTEND_URL}/client-dashboard/orders/{order.id}",
+        'company_email': settings.COMPANY_EMAIL,
+    })
+    email = EmailMessage(
+        subject=f'Payment Receipt - Order #{order.id}',
+        body=html_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[client.email],
+        connection=get_connection(timeout=SMTP_TIMEOUT),
+    )
+    email.content_subtype = "html"
+
+    try:
+        email.attach(f'receipt_{txn.transaction_id}.pdf', _receipt_bytes(txn), 'application/pdf')
+    except Exception as e:
+        logger.error(f"Receipt not attached for transaction {txn.pk}: {e}")
+    email.send()
+    logger.info(f"Client email sent for transaction {txn.pk}")
+
+
+def _staff_recipients(order):
+    """(user, dashboard path) for every admin and the order's service head"""
+    from accounts.models import User
+
+    recipients = [(admin, 'admin') for admin in User.objects.filter(role="admin")]
+    department = getattr(order.service, 'department', None)
+    if department and department.team_head:
+        recipients.append((department.team_head, 'service-head'))
+    return recipients
+
+
+def send_staff_emails(txn, record):
+    """Email each admin and the service head; recipients already emailed are skipped on retry"""
+    client, order, payment_order = txn.user, txn.order, txn.payment_order
+    sent = set(record.detail.get('sent', []))
+    connection = get_connection(timeout=SMTP_TIMEOUT)
+
+    for user, dashboard in _staff_recipients(order):
+        if not user.email or user.email in sent:
+            continue
+        html_message = render_to_string('emails/payment_success_admin.html', {
+            'admin_name': user.get_full_name() or ('Admin' if dashboard == 'admin' else 'Service Head'),
+            'client_name': client.get_full_name() or client.email,
+            'client_email': client.email,
+            'order_id': order.id,
+            'order_title': order.title,
+            'amount': txn.amount,
+            'currency': txn.currency,
+            'gateway': payment_order.get_gateway_display() if payment_order else txn.get_gateway_display(),
+            'transaction_id': txn.transaction_id,
+            'payment_date': txn.completed_at.strftime('%B %d, %Y %I:%M %p'),
+            'dashboard_link': f"{settings.FRONTEND_URL}/{dashboard}/orders/{order.id}",
+        })
+        send_mail(
+            subject=f'Payment Received - Order #{order.id}',
+            message=strip_tags(html_message),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[user.email],
+            html_message=html_message,
+            connection=connection
+        )
+        sent.add(user.email)
+        record.detail['sent'] = sorted(sent)
+        record.save(update_fields=['detail'])
+
+
+# ----- Notifications -----
+
+def create_notifications(txn, record):
+    from notifications.models import Notification
+
+    order = txn.order
+    Notification.objects.create(
+        user=txn.user,
+        title="Payment Successful",
+        message=f"Your payment of {txn.currency} {txn.amount} for Order #{order.id} has been received successfully.",
+        notification_type="payment_received",
+        order=order
+    )
+    for user, _ in _staff_recipients(order):
+        Notification.objects.create(
+            user=user,
+            title="Payment Received",
+            message=f"Payment of {txn.currency} {txn.amount} received for Order #{order.id}",
+            notification_type="payment_received",
+            order=order
+        )
+
+
+# step -> (handler, whether it runs in one database transaction with its completion)
+STEP_HANDLERS = {
+    'receipt_render': (render_receipt, False),
+    'storage_upload': (upload_receipt, False),
+    'client_email': (send_client_email, False),
+    'staff_fanout': (send_staff_emails, False),
+    'notifications': (create_notifications, True),
+}
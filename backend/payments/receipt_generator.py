@@ -4,16 +4,15 @@ PDF generation utility for payment receipts using ReportLab
 """
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm, inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
 
 from django.conf import settings
 from io import BytesIO
-from datetime import datetime
 import logging
 
+from utils.pdf_assets import PALETTE, content_hash, get_pdf_styles
+
 logger = logging.getLogger(__name__)
 PDF_AVAILABLE = True
 
@@ -22,13 +21,33 @@ class ReceiptPDFGenerator:
     """
     Generate PDF receipt for payment transactions using ReportLab
     """
+
+    # Bump whenever the layout changes so cached PDFs are re-rendered
+    TEMPLATE_VERSION = 1
     
     def __init__(self, transaction):
         self.transaction = transaction
-        self.navy = colors.HexColor('#1a233a')
-        self.orange = colors.HexColor('#ff9f00')
-        self.light_gray = colors.HexColor('#f5f5f5')
-        self.green = colors.HexColor('#10b981')
+        self.navy = PALETTE['receipt_navy']
+        self.orange = PALETTE['orange']
+        self.light_gray = PALETTE['light_gray']
+        self.green = PALETTE['green']
+    
+    def content_hash(self):
+        """Hash of the content this receipt shows"""
+        transaction = self.transaction
+        client = transaction.user
+        return content_hash(self.TEMPLATE_VERSION, {
+            'receipt': [str(transaction.uuid), transaction.transaction_id, transaction.completed_at],
+            'payment': [
+                transaction.gateway, transaction.payment_method, transaction.currency, transaction.amount,
+            ],
+            'order': [transaction.order.id, transaction.order.title],
+            'client': [client.get_full_name(), client.email, getattr(client, 'phone', '')],
+            'company': [
+                settings.COMPANY_NAME, getattr(settings, 'COMPANY_EMAIL', ''),
+                getattr(settings, 'COMPANY_PHONE', ''),
+            ],
+        })
     
     def generate(self):
         """Generate PDF and return BytesIO"""
@@ -43,19 +62,18 @@ class ReceiptPDFGenerator:
         )
         
         elements = []
-        styles = getSampleStyleSheet()
+        styles = get_pdf_styles()
         
         # Header with company name and "RECEIPT" title
         header_data = [
             [
                 Paragraph("<font size='20' color='#1a233a'><b>UDYOGWORKS</b></font>", styles['Normal']),
-                Paragraph("<font size='32' color='#ff9f00'><b>RECEIPT</b></font>", 
-                         ParagraphStyle('Title', parent=styles['Normal'], alignment=TA_RIGHT))
+                Paragraph("<font size='32' color='#ff9f00'><b>RECEIPT</b></font>", styles['RightAligned'])
             ],
             [
                 Paragraph("<font size='9' color='#666'>Digital Agency</font>", styles['Normal']),
                 Paragraph(f"<font size='9' color='#666'>Receipt No: {str(self.transaction.uuid)[:16]}</font>",
-                         ParagraphStyle('ID', parent=styles['Normal'], alignment=TA_RIGHT))
+                         styles['RightAligned'])
             ]
         ]
         
@@ -74,13 +92,12 @@ class ReceiptPDFGenerator:
         
         # Success badge
         success_data = [[
-            Paragraph("<font size='16' color='#10b981'><b>✓ Payment Successful</b></font>", 
-                     ParagraphStyle('Success', parent=styles['Normal'], alignment=TA_CENTER))
+            Paragraph("<font size='16' color='#10b981'><b>✓ Payment Successful</b></font>", styles['Centered'])
         ]]
         
         success_table = Table(success_data, colWidths=[180*mm])
         success_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#d1fae5')),
+            ('BACKGROUND', (0, 0), (-1, -1), PALETTE['success_background']),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
             ('TOPPADDING', (0, 0), (-1, -1), 12),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
@@ -95,7 +112,7 @@ class ReceiptPDFGenerator:
         client = self.transaction.user
         client_name = client.get_full_name() if hasattr(client, 'get_full_name') and client.get_full_name() else client.email
         
-        info_style = ParagraphStyle('Info', parent=styles['Normal'], fontSize=9, leading=14)
+        info_style = styles['ReceiptInfo']
         
         # Paid by and order info
         info_data = [
@@ -128,10 +145,10 @@ class ReceiptPDFGenerator:
         elements.append(Spacer(1, 10*mm))
         
         # Payment details table
-        detail_style = ParagraphStyle('Detail', parent=styles['Normal'], fontSize=10)
+        detail_style = styles['ReceiptDetail']
         
         payment_data = [
-            [Paragraph("<b>Payment Details</b>", ParagraphStyle('SectionTitle', parent=styles['Normal'], fontSize=14, textColor=self.navy))]
+            [Paragraph("<b>Payment Details</b>", styles['ReceiptSectionTitle'])]
         ]
         
         details_rows = [
@@ -171,7 +188,7 @@ class ReceiptPDFGenerator:
         amount_data = [[
             Paragraph("<font size='16' color='white'><b>Amount Paid</b></font>", styles['Normal']),
             Paragraph(f"<font size='24' color='white'><b>{self.transaction.currency} {float(self.transaction.amount):.2f}</b></font>",
-                     ParagraphStyle('Amount', parent=styles['Normal'], alignment=TA_RIGHT))
+                     styles['RightAligned'])
         ]]
         
         amount_table = Table(amount_data, colWidths=[90*mm, 90*mm])
@@ -188,11 +205,9 @@ class ReceiptPDFGenerator:
         elements.append(Spacer(1, 15*mm))
         
         # Footer
-        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9, leading=14, alignment=TA_CENTER)
+        footer_style = styles['ReceiptFooter']
         
-        elements.append(Paragraph("<b>Thank You for Your Payment!</b>", 
-                                 ParagraphStyle('ThankYou', parent=styles['Normal'], fontSize=12, 
-                                              fontName='Helvetica-Bold', textColor=self.navy, alignment=TA_CENTER)))
+        elements.append(Paragraph("<b>Thank You for Your Payment!</b>", styles['ReceiptThankYou']))
         elements.append(Spacer(1, 5*mm))
         elements.append(Paragraph("This is an official receipt for your payment.", footer_style))
         elements.append(Paragraph(f"{settings.COMPANY_NAME} | {getattr(settings, 'COMPANY_EMAIL', '')} | {getattr(settings, 'COMPANY_PHONE', '')}", footer_style))
@@ -204,24 +219,29 @@ class ReceiptPDFGenerator:
         buffer.seek(0)
         return buffer
     
-    def upload_to_dropbox(self):
-        """Generate PDF and upload to Dropbox"""
+    def storage_location(self):
+        """(folder_path, filename) for this content; unchanged content keeps its path and shared link"""
+        file_name = f"receipt_{self.transaction.uuid}_{self.content_hash()[:16]}.pdf"
+        return f"/receipts/{self.transaction.user.id}", file_name
+    
+    def upload_to_storage(self, pdf_file=None):
+        """Generate PDF (unless an already rendered one is given) and upload it to document storage"""
         try:
-            from utils.dropbox_service import get_dropbox_service
+            from utils.document_storage import get_document_storage
             
-            pdf_file = self.generate()
-            dropbox_service = get_dropbox_service()
-            file_name = f"receipt_{self.transaction.uuid}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            folder_path = f"/receipts/{self.transaction.user.id}"
+            if pdf_file is None:
+                pdf_file = self.generate()
+            storage = get_document_storage()
+            folder_path, file_name = self.storage_location()
             
-            result = dropbox_service.upload_pdf(
+            result = storage.upload_pdf(
                 pdf_file=pdf_file,
                 filename=file_name,
                 folder_path=folder_path
             )
             
-            logger.info(f"Receipt PDF uploaded to Dropbox for transaction {self.transaction.id}")
+            logger.info(f"Receipt PDF uploaded for transaction {self.transaction.id}")
             return result
         except Exception as e:
-            logger.error(f"PDF upload to Dropbox failed: {str(e)}")
-            raise RuntimeError(f"PDF upload to Dropbox failed: {str(e)}")
+            logger.error(f"PDF upload failed: {str(e)}")
+            raise RuntimeError(f"PDF upload failed: {str(e)}")
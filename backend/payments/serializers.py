@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from .models import PaymentRequest, PaymentOrder, Transaction, WebhookLog
 from orders.models import Order
+from utils.dynamic_fields import DynamicFieldsMixin
 
 
 class PaymentRequestSerializer(serializers.ModelSerializer):
@@ -88,7 +89,7 @@ class PaymentRequestCreateSerializer(serializers.Serializer):
         return data
 
 
-class PaymentOrderSerializer(serializers.ModelSerializer):
+class PaymentOrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for PaymentOrder model"""
     
     order_title = serializers.CharField(source='order.title', read_only=True)
@@ -102,6 +103,13 @@ class PaymentOrderSerializer(serializers.ModelSerializer):
             'status', 'metadata', 'created_at', 'updated_at', 'expires_at'
         ]
         read_only_fields = ['id', 'gateway_order_id', 'created_at', 'updated_at']
+        # Relations read by each field (see utils/query_plans.py)
+        select_related = {
+            'order_title': ['order'],
+            'client_email': ['user'],
+        }
+        # Heavy fields only returned on request once ?fields= / ?expand= is used
+        expandable_fields = ['metadata']
 
 
 class PaymentOrderCreateSerializer(serializers.Serializer):
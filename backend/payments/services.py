@@ -18,7 +18,8 @@ class RazorpayService:
     """
     
     def __init__(self):
-        self.client = razorpay.Client(auth=(
+        from utils.http_client import get_session
+        self.client = razorpay.Client(session=get_session(), auth=(
             settings.RAZORPAY_KEY_ID,
             settings.RAZORPAY_KEY_SECRET
         ))
@@ -117,10 +118,12 @@ class RazorpayService:
         import logging
         logger = logging.getLogger(__name__)
         
+        import requests
+        from utils import http_client
+        
         try:
-            # Set timeout for the request to prevent hanging
-            import requests
-            response = requests.get(
+            # Shared pooled session: keep-alive, retries on transient failures
+            response = http_client.get(
                 f"https://api.razorpay.com/v1/payments/{payment_id}",
                 auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET),
                 timeout=timeout
@@ -254,264 +257,115 @@ class PaymentProcessor:
         """
         Process successful payment
         
+        Only the ledger writes happen here, in one database transaction.
+        Receipt, emails and notifications run as Celery steps once it
+        commits (payments/pipeline.py), so verification returns straight away.
+        
+        The client redirect and the gateway webhook can both report the same
+        payment at once. The payment order row is locked for the duration, so
+        the first caller records the payment and any later one gets the
+        existing Transaction back without touching the order again.
+        
         Args:
             payment_order: PaymentOrder instance
             transaction_data: Dict with transaction details
+        
+        Returns:
+            Transaction: the payment's successful transaction
         """
-        from orders.models import Order
-        from notifications.models import Notification
-        from django.core.mail import EmailMessage
-        from django.template.loader import render_to_string
-        from django.utils.html import strip_tags
-        from django.conf import settings
+        from django.db import transaction as db_transaction
         from django.utils import timezone
+        from .ledger import post_entry
+        from .pipeline import start_post_payment_pipeline
         import logging
         
         logger = logging.getLogger(__name__)
         
-        # Update payment order status
-        payment_order.status = "paid"
-        payment_order.save()
+        with db_transaction.atomic():
+            # Serialise concurrent calls for the same gateway order: first wins
+            payment_order = PaymentOrder.objects.select_for_update().select_related('order', 'user').get(
+                pk=payment_order.pk
+            )
+            if payment_order.status == "paid":
+                existing = payment_order.transactions.filter(status="success").order_by('created_at').first()
+                if existing:
+                    logger.info(
+                        f"Payment order {payment_order.gateway_order_id} already paid; "
+                        f"returning transaction {existing.id}"
+                    )
+                    return existing
 
-        # Update order total_paid
-        order = payment_order.order
-        order.total_paid = order.total_paid + Decimal(payment_order.amount)
-        order.save(update_fields=['total_paid'])
-        
-        # Create/update transaction
-        transaction, created = Transaction.objects.update_or_create(
-            transaction_id=transaction_data.get("transaction_id"),
-            defaults={
-                "order": payment_order.order,
-                "user": payment_order.user,
-                "payment_order": payment_order,
-                "gateway": payment_order.gateway,
-                "amount": payment_order.amount,
-                "currency": payment_order.currency,
-                "status": "success",
-                "is_verified": True,
-                "payment_method": transaction_data.get("payment_method", "other"),
-                "signature": transaction_data.get("signature", ""),
-                "gateway_response": transaction_data.get("gateway_response", {}),
-                "completed_at": timezone.now(),
-            }
-        )
-        
-        # Update order status to payment_done
-        order = payment_order.order
-        try:
-            order.update_status("payment_done", payment_order.user, "Payment received successfully")
-        except ValueError:
-            # If transition is not allowed, just save a note
-            pass
-        
-        # Update payment request if exists
-        # Check direct relationship first
-        if hasattr(payment_order, 'payment_request'):
-            payment_requests = payment_order.payment_request.all()
-            for pr in payment_requests:
-                logger.info(f"Marking linked payment request {pr.id} as paid")
-                pr.mark_paid()
-        
-        # Also check for any pending payment requests for this order with matching amount
-        # This handles cases where the link wasn't established during creation
-        from .models import PaymentRequest
-        matching_requests = PaymentRequest.objects.filter(
-            order=order,
-            status='pending',
-            amount=payment_order.amount
-        )
-        for pr in matching_requests:
-            logger.info(f"Marking matching payment request {pr.id} as paid")
-            pr.mark_paid()
-            # Link it to the payment order for future reference
-            pr.payment_order = payment_order
-            pr.save()
-        
-        # Generate receipt PDF and upload to Dropbox (non-blocking)
-        try:
-            from .receipt_generator import ReceiptPDFGenerator
-            generator = ReceiptPDFGenerator(transaction)
-            result = generator.upload_to_dropbox()
-            transaction.receipt_pdf_url = result['download_url']
-            transaction.receipt_pdf_dropbox_path = result['file_path']
-            transaction.save(update_fields=['receipt_pdf_url', 'receipt_pdf_dropbox_path'])
-            logger.info(f"Receipt PDF generated and uploaded for transaction {transaction.id}")
-        except Exception as e:
-            logger.error(f"Receipt PDF generation/upload failed: {e}")
-            # Non-blocking - payment still succeeds
-        
-        # Send all emails asynchronously to prevent SMTP timeouts from blocking verification
-        import threading
-        
-        def send_emails_async():
-            """Send all emails in background thread"""
-            import logging
-            logger = logging.getLogger(__name__)
+            # Update payment order status
+            payment_order.status = "paid"
+            payment_order.save()
+
+            order = payment_order.order
             
-            # Send email to client with receipt
-            if payment_order.user and payment_order.user.email:
-                try:
-                    html_message = render_to_string('emails/payment_success_client.html', {
-                        'client_name': payment_order.user.get_full_name() or payment_order.user.email,
-                        'order_id': order.id,
-                        'order_title': order.title,
-                        'amount': payment_order.amount,
-                        'currency': payment_order.currency,
-                        'transaction_id': transaction.transaction_id,
-                        'payment_method': transaction.get_payment_method_display(),
-                        'payment_date': transaction.completed_at.strftime('%B %d, %Y'),
-                        'dashboard_link': f"{settings.FRONTEND_URL}/client-dashboard/orders/{order.id}",
-                        'company_email': settings.COMPANY_EMAIL,
-                    })
-                    
-                    plain_message = strip_tags(html_message)
-                    
-                    email = EmailMessage(
-                        subject=f'Payment Receipt - Order #{order.id}',
-                        body=plain_message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        to=[payment_order.user.email],
-                    )
-                    email.content_subtype = "html"
-                    email.body = html_message
-                    
-                    # Attach receipt PDF if generated
-                    if receipt_pdf:
-                        receipt_pdf.seek(0)
-                        email.attach(
-                            f'receipt_{transaction.transaction_id}.pdf',
-                            receipt_pdf.read(),
-                            'application/pdf'
-                        )
-                    
-                    # Set timeout for SMTP connection
-                    from django.core.mail import get_connection
-                    connection = get_connection(timeout=10)
-                    email.connection = connection
-                    email.send(fail_silently=True)
-                    logger.info(f"Client email sent successfully for transaction {transaction.id}")
-                except Exception as e:
-                    logger.error(f"Failed to send client email: {e}")
+            # Create/update transaction
+            transaction, created = Transaction.objects.update_or_create(
+                transaction_id=transaction_data.get("transaction_id"),
+                defaults={
+                    "order": payment_order.order,
+                    "user": payment_order.user,
+                    "payment_order": payment_order,
+                    "gateway": payment_order.gateway,
+                    "amount": payment_order.amount,
+                    "currency": payment_order.currency,
+                    "status": "success",
+                    "is_verified": True,
+                    "payment_method": transaction_data.get("payment_method", "other"),
+                    "signature": transaction_data.get("signature", ""),
+                    "gateway_response": transaction_data.get("gateway_response", {}),
+                    "completed_at": timezone.now(),
+                }
+            )
             
-            # Send email and notification to admin users
-            try:
-                from accounts.models import User
-                admin_users = User.objects.filter(role="admin")
-                for admin in admin_users:
-                    # Send email
-                    try:
-                        html_message = render_to_string('emails/payment_success_admin.html', {
-                            'admin_name': admin.get_full_name() or 'Admin',
-                            'client_name': payment_order.user.get_full_name() or payment_order.user.email,
-                            'client_email': payment_order.user.email,
-                            'order_id': order.id,
-                            'order_title': order.title,
-                            'amount': payment_order.amount,
-                            'currency': payment_order.currency,
-                            'gateway': payment_order.get_gateway_display(),
-                            'transaction_id': transaction.transaction_id,
-                            'payment_date': transaction.completed_at.strftime('%B %d, %Y %I:%M %p'),
-                            'dashboard_link': f"{settings.FRONTEND_URL}/admin/orders/{order.id}",
-                        })
-                        
-                        plain_message = strip_tags(html_message)
-                        
-                        from django.core.mail import get_connection
-                        connection = get_connection(timeout=10)
-                        send_mail(
-                            subject=f'Payment Received - Order #{order.id}',
-                            message=plain_message,
-                            from_email=settings.DEFAULT_FROM_EMAIL,
-                            recipient_list=[admin.email],
-                            html_message=html_message,
-                            fail_silently=True,
-                            connection=connection
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to send admin email: {e}")
-            except Exception as e:
-                logger.error(f"Failed to process admin emails: {e}")
+            # Credit the order: ledger entry plus an F() update of total_paid
+            if not transaction.ledger_entries.filter(kind="credit").exists():
+                post_entry(
+                    order, payment_order.amount, "credit", transaction=transaction,
+                    currency=payment_order.currency, note=f"{payment_order.gateway} {transaction.transaction_id}",
+                )
             
-            # Send email to service head if applicable
+            # Update order status to payment_done
             try:
-                if hasattr(order.service, 'department') and order.service.department and order.service.department.team_head:
-                    service_head = order.service.department.team_head
-                    try:
-                        html_message = render_to_string('emails/payment_success_admin.html', {
-                            'admin_name': service_head.get_full_name() or 'Service Head',
-                            'client_name': payment_order.user.get_full_name() or payment_order.user.email,
-                            'client_email': payment_order.user.email,
-                            'order_id': order.id,
-                            'order_title': order.title,
-                            'amount': payment_order.amount,
-                            'currency': payment_order.currency,
-                            'gateway': payment_order.get_gateway_display(),
-                            'transaction_id': transaction.transaction_id,
-                            'payment_date': transaction.completed_at.strftime('%B %d, %Y %I:%M %p'),
-                            'dashboard_link': f"{settings.FRONTEND_URL}/service-head/orders/{order.id}",
-                        })
-                        
-                        plain_message = strip_tags(html_message)
-                        
-                        from django.core.mail import get_connection
-                        connection = get_connection(timeout=10)
-                        send_mail(
-                            subject=f'Payment Received - Order #{order.id}',
-                            message=plain_message,
-                            from_email=settings.DEFAULT_FROM_EMAIL,
-                            recipient_list=[service_head.email],
-                            html_message=html_message,
-                            fail_silently=True,
-                            connection=connection
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to send service head email: {e}")
-            except Exception as e:
-                logger.error(f"Failed to process service head email: {e}")
+                order.update_status("payment_done", payment_order.user, "Payment received successfully")
+            except ValueError:
+                # If transition is not allowed, just save a note
+                pass
             
-            logger.info(f"Email sending complete for transaction {transaction.id}")
-        
-        # Start email sending in background thread (daemon so it doesn't block shutdown)
-        email_thread = threading.Thread(target=send_emails_async, daemon=True)
-        email_thread.start()
-        logger.info(f"Started async email sending for transaction {transaction.id}")
-        
-        # Send notification to client (quick, non-blocking)
-        Notification.objects.create(
-            user=payment_order.user,
-            title="Payment Successful",
-            message=f"Your payment of {payment_order.currency} {payment_order.amount} for Order #{order.id} has been received successfully.",
-            notification_type="payment_received",
-            order=order
-        )
-        
-        # Send notifications to admin users (quick, non-blocking)
-        from accounts.models import User
-        admin_users = User.objects.filter(role="admin")
-        for admin in admin_users:
-            # Create dashboard notification
-            Notification.objects.create(
-                user=admin,
-                title="Payment Received",
-                message=f"Payment of {payment_order.currency} {payment_order.amount} received for Order #{order.id}",
-                notification_type="payment_received",
-                order=order
-            )
-        
-        
-        # Send notification to service head if applicable
-        if hasattr(order.service, 'department') and order.service.department and order.service.department.team_head:
-            service_head = order.service.department.team_head
-            # Create dashboard notification
-            Notification.objects.create(
-                user=service_head,
-                title="Payment Received",
-                message=f"Payment of {payment_order.currency} {payment_order.amount} received for Order #{order.id}",
-                notification_type="payment_received",
-                order=order
+            # Append to the activity feed
+            from orders.activity import record_payment
+            record_payment(order, payment_order, transaction.transaction_id)
+            
+            # Update payment request if exists
+            # Check direct relationship first
+            if hasattr(payment_order, 'payment_request'):
+                payment_requests = payment_order.payment_request.all()
+                for pr in payment_requests:
+                    logger.info(f"Marking linked payment request {pr.id} as paid")
+                    pr.mark_paid()
+            
+            # Also check for any pending payment requests for this order with matching amount
+            # This handles cases where the link wasn't established during creation
+            from .models import PaymentRequest
+            matching_requests = PaymentRequest.objects.filter(
+                order=order,
+                status='pending',
+                amount=payment_order.amount
             )
+            for pr in matching_requests:
+                logger.info(f"Marking matching payment request {pr.id} as paid")
+                pr.mark_paid()
+                # Link it to the payment order for future reference
+                pr.payment_order = payment_order
+                pr.save()
+            
+            # Receipt, emails and notifications (idempotent: repeated calls add nothing)
+            transaction_id = transaction.id
+            db_transaction.on_commit(lambda: start_post_payment_pipeline(transaction_id))
         
+        logger.info(f"Payment recorded for transaction {transaction.id}; post-payment steps queued")
         return transaction
     
     @staticmethod
@@ -0,0 +1,83 @@
+# payments/tasks.py
+"""
+Celery tasks for payments app.
+Webhook processing, and one task per post-payment step (see
+payments/pipeline.py), each with its own retry policy. Retries back off
+exponentially from default_retry_delay; WebhookLog and PostPaymentStep rows
+are the result store, so Celery results are not kept.
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+def _run_step_task(task, transaction_id, step):
+    """
+    Run a step, retrying on failure. After the last retry the step is marked
+    failed and the task returns normally, so a chain carries on without it
+    (the client email is still sent if the receipt could not be stored).
+    """
+    from payments.pipeline import fail_step, retry_step, run_step
+
+    try:
+        ran = run_step(transaction_id, step)
+        return {'transaction_id': transaction_id, 'step': step, 'status': 'done' if ran else 'skipped'}
+    except Exception as e:
+        logger.error(f"Post-payment step {step} failed for transaction {transaction_id}: {str(e)}")
+        if task.request.retries < task.max_retries:
+            retry_step(transaction_id, step, e)
+            raise task.retry(exc=e, countdown=task.default_retry_delay * 2 ** task.request.retries)
+        fail_step(transaction_id, step, e)
+        return {'transaction_id': transaction_id, 'step': step, 'status': 'failed', 'error': str(e)}
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=10, ignore_result=True)
+def render_receipt_step(self, transaction_id):
+    """Render the receipt PDF (CPU only; rarely worth many retries)"""
+    return _run_step_task(self, transaction_id, 'receipt_render')
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=30, ignore_result=True)
+def upload_receipt_step(self, transaction_id):
+    """Upload the receipt PDF to document storage and record it on the transaction"""
+    return _run_step_task(self, transaction_id, 'storage_upload')
+
+
+@shared_task(bind=True, max_retries=4, default_retry_delay=60, ignore_result=True)
+def send_client_email_step(self, transaction_id):
+    """Email the client their payment receipt"""
+    return _run_step_task(self, transaction_id, 'client_email')
+
+
+@shared_task(bind=True, max_retries=4, default_retry_delay=60, ignore_result=True)
+def send_staff_emails_step(self, transaction_id):
+    """Email admins and the service head"""
+    return _run_step_task(self, transaction_id, 'staff_fanout')
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5, ignore_result=True)
+def create_notifications_step(self, transaction_id):
+    """Create dashboard notifications for the client and staff"""
+    return _run_step_task(self, transaction_id, 'notifications')
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=15, ignore_result=True)
+def process_webhook_event(self, webhook_log_id):
+    """
+    Process a stored gateway webhook (see payments/webhooks.py).
+    Events still failing after the retries are left for replay_webhooks.
+    """
+    from payments.webhooks import fail_webhook, process_webhook, release_webhook
+
+    try:
+        status = process_webhook(webhook_log_id)
+        return {'webhook_log_id': webhook_log_id, 'status': status or 'skipped'}
+    except Exception as e:
+        logger.error(f"Webhook {webhook_log_id} processing failed: {str(e)}")
+        if self.request.retries < self.max_retries:
+            release_webhook(webhook_log_id, e)
+            raise self.retry(exc=e, countdown=self.default_retry_delay * 2 ** self.request.retries)
+        fail_webhook(webhook_log_id, e)
+        return {'webhook_log_id': webhook_log_id, 'status': 'failed', 'error': str(e)}
@@ -1,3 +1,169 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.management import call_command
+from django.db.models import ProtectedError
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from notifications.models import Notification
+from orders.models import Order
+from services.models import Department, Service
+from .ledger import find_balance_drift
+from .models import LedgerEntry, PaymentOrder, PostPaymentStep, Transaction, WebhookLog
+from .pipeline import run_pending_steps
+from .services import PaymentProcessor
+from .webhooks import process_webhook
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    PDF_STORAGE_BACKEND='utils.document_storage.InMemoryStorage',
+)
+class PostPaymentPipelineTests(TestCase):
+    """Side effects of a payment run after commit, as steps, and only once"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = User.objects.create_user(
+            username='client', email='client@example.com', password='x', role='client'
+        )
+        User.objects.create_user(username='admin', email='admin@example.com', password='x', role='admin')
+        head = User.objects.create_user(
+            username='head', email='head@example.com', password='x', role='service_head'
+        )
+        department = Department.objects.create(title='Design', slug='design', team_head=head)
+        service = Service.objects.create(title='Logo', slug='logo', department=department)
+        cls.order = Order.objects.create(client=cls.client_user, service=service, title='Logo', price=100)
+        cls.payment_order = PaymentOrder.objects.create(
+            order=cls.order, user=cls.client_user, gateway='razorpay',
+            gateway_order_id='order_TEST', amount=100,
+        )
+
+    def pay(self, transaction_id='pay_TEST'):
+        with mock.patch('payments.pipeline.start_post_payment_pipeline') as start:
+            with self.captureOnCommitCallbacks(execute=True):
+                transaction = PaymentProcessor.process_payment_success(
+                    self.payment_order, {'transaction_id': transaction_id, 'payment_method': 'card'}
+                )
+        return transaction, start
+
+    def test_side_effects_wait_for_commit_and_run_once(self):
+        transaction, start = self.pay()
+        start.assert_called_once_with(transaction.id)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(Notification.objects.exists())
+
+        # What start_post_payment_pipeline queues, run inline, twice (e.g. redirect + webhook)
+        PostPaymentStep.objects.bulk_create(
+            [PostPaymentStep(transaction=transaction, step=step) for step, _ in PostPaymentStep.STEP_CHOICES]
+        )
+        run_pending_steps(transaction.id)
+        run_pending_steps(transaction.id)
+
+        self.assertEqual(
+            set(PostPaymentStep.objects.filter(transaction=transaction).values_list('status', flat=True)), {'done'}
+        )
+        recipients = sorted(message.to[0] for message in mail.outbox)
+        self.assertEqual(recipients, ['admin@example.com', 'client@example.com', 'head@example.com'])
+        client_email = next(message for message in mail.outbox if message.to == ['client@example.com'])
+        self.assertEqual(client_email.attachments[0][2], 'application/pdf')
+        self.assertEqual(Notification.objects.filter(order=self.order).count(), 3)
+        transaction.refresh_from_db()
+        self.assertTrue(transaction.receipt_pdf_url)
+
+    def test_second_report_of_a_payment_returns_the_first_transaction(self):
+        first, start = self.pay()
+        start.assert_called_once_with(first.id)
+
+        # Webhook after the redirect, with a stale payment order and another payment id
+        second, start = self.pay('pay_OTHER')
+        self.assertEqual(second, first)
+        start.assert_not_called()
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_paid, 100)
+        self.assertEqual(list(self.order.ledger_entries.values_list('kind', 'amount')), [('credit', 100)])
+
+    def test_reconciliation_restores_ledger_balances(self):
+        transaction, _ = self.pay()
+        entry = transaction.ledger_entries.get()
+        with self.assertRaises(ValueError):
+            entry.save()
+        with self.assertRaises(ValueError):
+            LedgerEntry.objects.filter(pk=entry.pk).update(amount=0)
+        with self.assertRaises(ValueError):
+            LedgerEntry.objects.filter(pk=entry.pk).delete()
+        with self.assertRaises(ProtectedError):
+            self.order.delete()
+
+        Order.objects.filter(pk=self.order.pk).update(total_paid=40)
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command('fix_order_totals', '--dry-run', stdout=out)
+        self.assertIn(f'Order #{self.order.pk}: 40.00 -> 100.00', out.getvalue())
+
+        call_command('fix_order_totals', stdout=StringIO())
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_paid, 100)
+        self.assertEqual(find_balance_drift(), [])
+
+
+@override_settings(
+    ALLOWED_HOSTS=['*'],
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    RAZORPAY_WEBHOOK_SECRET='whsec',
+)
+class RazorpayWebhookTests(TestCase):
+    """Webhooks are stored once, acknowledged, and processed once by a worker"""
+
+    @classmethod
+    def setUpTestData(cls):
+        client = User.objects.create_user(username='client', email='client@example.com', password='x', role='client')
+        department = Department.objects.create(title='Design', slug='design')
+        service = Service.objects.create(title='Logo', slug='logo', department=department)
+        order = Order.objects.create(client=client, service=service, title='Logo', price=100)
+        PaymentOrder.objects.create(
+            order=order, user=client, gateway='razorpay', gateway_order_id='order_TEST', amount=100,
+        )
+
+    def deliver(self, event_id):
+        body = json.dumps({
+            'event': 'payment.captured',
+            'payload': {'payment': {'entity': {'id': 'pay_TEST', 'order_id': 'order_TEST', 'method': 'card'}}},
+        })
+        signature = hmac.new(b'whsec', body.encode(), hashlib.sha256).hexdigest()
+        with mock.patch('payments.webhooks.queue_webhook') as queue:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    '/api/payments/webhook/razorpay/', body, content_type='application/json',
+                    HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID=event_id,
+                )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['status'], queue
+
+    def test_redeliveries_are_acknowledged_and_dropped(self):
+        status, queue = self.deliver('evt_1')
+        self.assertEqual(status, 'success')
+        webhook_log = WebhookLog.objects.get()
+        queue.assert_called_once_with(webhook_log.id)
+        self.assertEqual(webhook_log.status, 'received')
+        self.assertFalse(Transaction.objects.exists())
+
+        # Same event again, and the same payment under a new event id
+        for event_id in ('evt_1', 'evt_2'):
+            status, queue = self.deliver(event_id)
+            self.assertEqual(status, 'duplicate')
+            queue.assert_not_called()
+        self.assertEqual(WebhookLog.objects.count(), 1)
+
+        with mock.patch('payments.pipeline.start_post_payment_pipeline'):
+            self.assertEqual(process_webhook(webhook_log.id), 'processed')
+            self.assertIsNone(process_webhook(webhook_log.id))
+        webhook_log.refresh_from_db()
+        self.assertEqual(webhook_log.transaction.transaction_id, 'pay_TEST')
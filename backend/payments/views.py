@@ -11,6 +11,7 @@ from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 import json
+import logging
 
 from .models import PaymentRequest, PaymentOrder, Transaction, WebhookLog
 from .serializers import (
@@ -20,11 +21,16 @@ from .serializers import (
     WebhookLogSerializer
 )
 from .services import RazorpayService, PayPalService, PaymentProcessor
+from .webhooks import paypal_identifiers, razorpay_identifiers, record_webhook
 from orders.models import Order
 from notifications.models import Notification
+from utils.pagination import paginate_list
+from utils.query_plans import QueryPlanMixin
 
+logger = logging.getLogger(__name__)
 
-class PaymentOrderViewSet(viewsets.ModelViewSet):
+
+class PaymentOrderViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """
     ViewSet for PaymentOrder operations
     """
@@ -288,8 +294,10 @@ def list_payment_requests(request):
     if status_filter:
         payment_requests = payment_requests.filter(status=status_filter)
     
-    serializer = PaymentRequestSerializer(payment_requests, many=True)
-    return Response(serializer.data)
+    return paginate_list(
+        request, payment_requests, PaymentRequestSerializer,
+        allow_page_number=user.role == 'admin'
+    )
 
 
 @api_view(['GET'])
@@ -315,10 +323,13 @@ def list_transactions(request):
     queryset = queryset.filter(
         status='success',
         is_verified=True
-    ).select_related('order', 'user', 'payment_order').order_by('-completed_at')
+    ).select_related('order', 'user', 'payment_order').order_by('-completed_at', '-id')
     
-    serializer = TransactionSerializer(queryset, many=True)
-    return Response(serializer.data)
+    return paginate_list(
+        request, queryset, TransactionSerializer,
+        allow_page_number=user.role == 'admin',
+        ordering=('-completed_at', '-id')
+    )
 
 
 @api_view(['POST'])
@@ -514,109 +525,34 @@ def razorpay_webhook(request):
     """
     Handle Razorpay webhook events
     POST /api/payments/webhook/razorpay/
+    
+    The event is stored and acknowledged straight away; a worker processes
+    it (payments/webhooks.py). Redeliveries are acknowledged and dropped.
     """
     # Get webhook signature
     webhook_signature = request.headers.get('X-Razorpay-Signature', '')
     
-    # Get raw body
-    payload = request.body.decode('utf-8')
-    
-    # Create webhook log
-    webhook_log = WebhookLog.objects.create(
-        gateway='razorpay',
-        event_type=request.data.get('event', 'unknown'),
-        payload=request.data,
-        headers=dict(request.headers),
-        signature=webhook_signature,
-        status='received'
-    )
-    
     try:
-        # Verify webhook signature
-        razorpay_service = RazorpayService()
-        is_verified = razorpay_service.verify_webhook_signature(payload, webhook_signature)
-        
-        webhook_log.is_verified = is_verified
-        webhook_log.status = 'processing'
-        webhook_log.save()
-        
-        if not is_verified:
-            webhook_log.status = 'failed'
-            webhook_log.error_message = 'Invalid webhook signature'
-            webhook_log.save()
-            return Response({'status': 'invalid signature'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Process webhook event
-        event = request.data.get('event')
-        payload_data = request.data.get('payload', {})
-        payment_entity = payload_data.get('payment', {}).get('entity', {})
-        
-        if event == 'payment.captured':
-            # Payment successful
-            payment_id = payment_entity.get('id')
-            order_id = payment_entity.get('order_id')
-            
-            try:
-                payment_order = PaymentOrder.objects.get(gateway_order_id=order_id)
-                
-                # Process payment success
-                transaction = PaymentProcessor.process_payment_success(
-                    payment_order=payment_order,
-                    transaction_data={
-                        'transaction_id': payment_id,
-                        'payment_method': payment_entity.get('method', 'other'),
-                        'gateway_response': payment_entity
-                    }
-                )
-                
-                webhook_log.transaction = transaction
-                webhook_log.status = 'processed'
-                webhook_log.save()
-            
-            except PaymentOrder.DoesNotExist:
-                webhook_log.status = 'ignored'
-                webhook_log.error_message = 'Payment order not found'
-                webhook_log.save()
-        
-        elif event == 'payment.failed':
-            # Payment failed
-            payment_id = payment_entity.get('id')
-            order_id = payment_entity.get('order_id')
-            
-            try:
-                payment_order = PaymentOrder.objects.get(gateway_order_id=order_id)
-                
-                # Process payment failure
-                PaymentProcessor.process_payment_failure(
-                    payment_order=payment_order,
-                    error_data={
-                        'transaction_id': payment_id,
-                        'error_code': payment_entity.get('error_code', ''),
-                        'error_message': payment_entity.get('error_description', 'Payment failed'),
-                        'gateway_response': payment_entity
-                    }
-                )
-                
-                webhook_log.status = 'processed'
-                webhook_log.save()
-            
-            except PaymentOrder.DoesNotExist:
-                webhook_log.status = 'ignored'
-                webhook_log.error_message = 'Payment order not found'
-                webhook_log.save()
-        
-        else:
-            webhook_log.status = 'ignored'
-            webhook_log.error_message = f'Unhandled event type: {event}'
-            webhook_log.save()
-        
-        return Response({'status': 'success'})
-    
+        # Verify webhook signature against the raw body
+        is_verified = RazorpayService().verify_webhook_signature(request.body.decode('utf-8'), webhook_signature)
+        event_id, payment_id = razorpay_identifiers(request)
+        webhook_log = record_webhook(
+            'razorpay', request, request.data.get('event', 'unknown'),
+            signature=webhook_signature,
+            is_verified=is_verified,
+            event_id=event_id,
+            payment_id=payment_id,
+            error_message='' if is_verified else 'Invalid webhook signature',
+        )
     except Exception as e:
-        webhook_log.status = 'failed'
-        webhook_log.error_message = str(e)
-        webhook_log.save()
+        logger.error(f"Failed to record Razorpay webhook: {e}")
         return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    if webhook_log is None:
+        return Response({'status': 'duplicate'})
+    if not is_verified:
+        return Response({'status': 'invalid signature'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'status': 'success'})
 
 
 @csrf_exempt
@@ -626,65 +562,26 @@ def paypal_webhook(request):
     """
     Handle PayPal webhook events
     POST /api/payments/webhook/paypal/
-    """
-    # Create webhook log
-    webhook_log = WebhookLog.objects.create(
-        gateway='paypal',
-        event_type=request.data.get('event_type', 'unknown'),
-        payload=request.data,
-        headers=dict(request.headers),
-        status='received'
-    )
     
+    The event is stored and acknowledged straight away; a worker processes
+    it (payments/webhooks.py). Redeliveries are acknowledged and dropped.
+    """
+    # For production, implement proper PayPal webhook verification
+    # using PayPal's webhook verification API
     try:
-        # For production, implement proper PayPal webhook verification
-        # using PayPal's webhook verification API
-        
-        webhook_log.status = 'processing'
-        webhook_log.save()
-        
-        # Process webhook event
-        event_type = request.data.get('event_type')
-        resource = request.data.get('resource', {})
-        
-        if event_type == 'PAYMENT.SALE.COMPLETED':
-            # Payment completed
-            payment_id = resource.get('parent_payment')
-            
-            try:
-                payment_order = PaymentOrder.objects.get(gateway_order_id=payment_id)
-                
-                # Process payment success
-                transaction = PaymentProcessor.process_payment_success(
-                    payment_order=payment_order,
-                    transaction_data={
-                        'transaction_id': resource.get('id'),
-                        'payment_method': 'paypal',
-                        'gateway_response': resource
-                    }
-                )
-                
-                webhook_log.transaction = transaction
-                webhook_log.status = 'processed'
-                webhook_log.save()
-            
-            except PaymentOrder.DoesNotExist:
-                webhook_log.status = 'ignored'
-                webhook_log.error_message = 'Payment order not found'
-                webhook_log.save()
-        
-        else:
-            webhook_log.status = 'ignored'
-            webhook_log.error_message = f'Unhandled event type: {event_type}'
-            webhook_log.save()
-        
-        return Response({'status': 'success'})
-    
+        event_id, payment_id = paypal_identifiers(request)
+        webhook_log = record_webhook(
+            'paypal', request, request.data.get('event_type', 'unknown'),
+            event_id=event_id,
+            payment_id=payment_id,
+        )
     except Exception as e:
-        webhook_log.status = 'failed'
-        webhook_log.error_message = str(e)
-        webhook_log.save()
+        logger.error(f"Failed to record PayPal webhook: {e}")
         return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    if webhook_log is None:
+        return Response({'status': 'duplicate'})
+    return Response({'status': 'success'})
 
 
 @api_view(['GET'])
@@ -818,28 +715,10 @@ def download_receipt(request, transaction_id):
                     url += '&dl=1' if '?' in url else '?dl=1'
             return Response({'url': url})
         
-        # Fallback: Generate receipt PDF on-the-fly and return URL (or base64 logic if needed, but sticking to URL preference)
-        from .receipt_generator import ReceiptPDFGenerator
-        
-        generator = ReceiptPDFGenerator(transaction)
-        # Upload to dropbox to get a URL
-        upload_result = generator.upload_to_dropbox() 
-        # Note: upload_to_dropbox returns metadata including 'url' or similar? 
-        # Checking receipt_generator.py again in my mind... upload_to_dropbox returns result from dropbox_service.upload_pdf
-        # Assuming we save it to transaction:
-        
-        transaction.receipt_pdf_url = upload_result.get('url') or upload_result.get('download_url')
-        transaction.receipt_pdf_dropbox_path = upload_result.get('file_path')
-        transaction.save()
-
-        url = transaction.receipt_pdf_url
-        if 'dropbox.com' in url:
-             if '?dl=0' in url:
-                url = url.replace('?dl=0', '?dl=1')
-             elif '?dl=1' not in url and '&dl=1' not in url:
-                url += '&dl=1' if '?' in url else '?dl=1'
-
-        return Response({'url': url})
+        # Not rendered yet: queue it and let the client poll the job for the URL
+        from orders.pdf_jobs import enqueue_pdf_render, serialize_pdf_job
+        job = enqueue_pdf_render('receipt', transaction.id, user)
+        return Response({'url': None, 'pdf_job': serialize_pdf_job(job)}, status=status.HTTP_202_ACCEPTED)
     
     except Transaction.DoesNotExist:
         return Response(
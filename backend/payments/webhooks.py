@@ -0,0 +1,205 @@
+# payments/webhooks.py
+"""
+Webhook ingestion: store, acknowledge, process later.
+
+The webhook views verify the signature, store the delivery with a single
+insert and answer the gateway straight away. The process_webhook_event
+Celery task then runs the event through PaymentProcessor.
+
+Deliveries are deduplicated by unique constraints on the gateway's event
+id and on (event type, payment id): a redelivered event fails the insert
+and is acknowledged without being processed again. Failed events can be
+re-run with the replay_webhooks management command.
+"""
+import logging
+import threading
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import PaymentOrder, WebhookLog
+
+logger = logging.getLogger(__name__)
+
+
+def razorpay_identifiers(request):
+    """(event id, payment id) of a Razorpay delivery"""
+    entity = request.data.get('payload', {}).get('payment', {}).get('entity', {})
+    return request.headers.get('X-Razorpay-Event-Id', ''), entity.get('id') or ''
+
+
+def paypal_identifiers(request):
+    """(event id, payment id) of a PayPal delivery"""
+    return request.data.get('id') or '', request.data.get('resource', {}).get('id') or ''
+
+
+def record_webhook(gateway, request, event_type, signature='', is_verified=False,
+                   event_id='', payment_id='', error_message=''):
+    """
+    Store a webhook delivery with one insert and queue it for processing
+    if it is verified (or unverifiable, as PayPal's are for now).
+
+    Returns:
+        WebhookLog, or None if the delivery is a duplicate
+    """
+    status = 'failed' if error_message else 'received'
+    if error_message:
+        # Rejected deliveries must not claim the identifiers of the real event
+        event_id = payment_id = ''
+    try:
+        with transaction.atomic():
+            webhook_log = WebhookLog.objects.create(
+                gateway=gateway,
+                event_type=event_type,
+                event_id=event_id[:255],
+                payment_id=payment_id[:255],
+                payload=request.data,
+                headers=dict(request.headers),
+                signature=signature,
+                is_verified=is_verified,
+                status=status,
+                error_message=error_message,
+            )
+    except IntegrityError:
+        logger.info(f"Duplicate {gateway} webhook {event_type} (event {event_id}, payment {payment_id}) ignored")
+        return None
+
+    if status == 'received':
+        transaction.on_commit(lambda: queue_webhook(webhook_log.id))
+    return webhook_log
+
+
+def queue_webhook(webhook_log_id):
+    """Hand a stored webhook to Celery; process it in a background thread if the broker is down"""
+    from .tasks import process_webhook_event
+    try:
+        process_webhook_event.delay(webhook_log_id)
+    except Exception as e:
+        logger.error(f"Failed to queue webhook {webhook_log_id}: {e}")
+        threading.Thread(target=_process_safely, args=(webhook_log_id,), daemon=True).start()
+
+
+def _process_safely(webhook_log_id):
+    try:
+        process_webhook(webhook_log_id)
+    except Exception as e:
+        fail_webhook(webhook_log_id, e)
+
+
+def claim_webhook(webhook_log_id, statuses=('received',)):
+    """Mark a webhook processing; False if another worker has it or it is finished"""
+    return WebhookLog.objects.filter(pk=webhook_log_id, status__in=statuses).update(status='processing') > 0
+
+
+def release_webhook(webhook_log_id, error):
+    """Put a webhook back after a failed attempt so its retry can claim it"""
+    WebhookLog.objects.filter(pk=webhook_log_id, status='processing').update(
+        status='received', error_message=str(error)
+    )
+
+
+def fail_webhook(webhook_log_id, error):
+    """Mark a webhook failed (replay_webhooks picks these up)"""
+    WebhookLog.objects.filter(pk=webhook_log_id, status='processing').update(
+        status='failed', error_message=str(error), processed_at=timezone.now()
+    )
+
+
+def process_webhook(webhook_log_id, statuses=('received',)):
+    """
+    Process a stored webhook unless it is already processing or finished.
+
+    Returns:
+        str: the webhook's new status, or None if it was not claimed
+    """
+    if not claim_webhook(webhook_log_id, statuses):
+        return None
+
+    webhook_log = WebhookLog.objects.get(pk=webhook_log_id)
+    handler = HANDLERS[webhook_log.gateway]
+    with transaction.atomic():
+        status, error_message, payment_transaction = handler(webhook_log)
+        WebhookLog.objects.filter(pk=webhook_log_id).update(
+            status=status,
+            error_message=error_message,
+            transaction=payment_transaction,
+            processed_at=timezone.now(),
+        )
+    return status
+
+
+def _handle_razorpay(webhook_log):
+    """
+    Returns:
+        tuple: (status, error message, Transaction or None)
+    """
+    from .services import PaymentProcessor
+
+    event = webhook_log.payload.get('event')
+    payment_entity = webhook_log.payload.get('payload', {}).get('payment', {}).get('entity', {})
+    if event not in ('payment.captured', 'payment.failed'):
+        return 'ignored', f'Unhandled event type: {event}', None
+
+    try:
+        payment_order = PaymentOrder.objects.get(gateway_order_id=payment_entity.get('order_id'))
+    except PaymentOrder.DoesNotExist:
+        return 'ignored', 'Payment order not found', None
+
+    if event == 'payment.captured':
+        # Payment successful
+        payment_transaction = PaymentProcessor.process_payment_success(
+            payment_order=payment_order,
+            transaction_data={
+                'transaction_id': payment_entity.get('id'),
+                'payment_method': payment_entity.get('method', 'other'),
+                'gateway_response': payment_entity
+            }
+        )
+        return 'processed', '', payment_transaction
+
+    # Payment failed
+    PaymentProcessor.process_payment_failure(
+        payment_order=payment_order,
+        error_data={
+            'transaction_id': payment_entity.get('id'),
+            'error_code': payment_entity.get('error_code', ''),
+            'error_message': payment_entity.get('error_description', 'Payment failed'),
+            'gateway_response': payment_entity
+        }
+    )
+    return 'processed', '', None
+
+
+def _handle_paypal(webhook_log):
+    """
+    Returns:
+        tuple: (status, error message, Transaction or None)
+    """
+    from .services import PaymentProcessor
+
+    event_type = webhook_log.payload.get('event_type')
+    resource = webhook_log.payload.get('resource', {})
+    if event_type != 'PAYMENT.SALE.COMPLETED':
+        return 'ignored', f'Unhandled event type: {event_type}', None
+
+    try:
+        payment_order = PaymentOrder.objects.get(gateway_order_id=resource.get('parent_payment'))
+    except PaymentOrder.DoesNotExist:
+        return 'ignored', 'Payment order not found', None
+
+    # Payment completed
+    payment_transaction = PaymentProcessor.process_payment_success(
+        payment_order=payment_order,
+        transaction_data={
+            'transaction_id': resource.get('id'),
+            'payment_method': 'paypal',
+            'gateway_response': resource
+        }
+    )
+    return 'processed', '', payment_transaction
+
+
+HANDLERS = {
+    'razorpay': _handle_razorpay,
+    'paypal': _handle_paypal,
+}
@@ -10,6 +10,7 @@ from .serializers import PortfolioProjectSerializer, CaseStudySerializer, Client
 class PortfolioProjectViewSet(viewsets.ModelViewSet):
     queryset = PortfolioProject.objects.all()
     serializer_class = PortfolioProjectSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_featured', 'service', 'service__department']
@@ -20,6 +21,7 @@ class PortfolioProjectViewSet(viewsets.ModelViewSet):
 class CaseStudyViewSet(viewsets.ModelViewSet):
     queryset = CaseStudy.objects.filter(is_published=True)
     serializer_class = CaseStudySerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
     
@@ -96,6 +98,7 @@ class CaseStudyStatsView(generics.GenericAPIView):
 class ClientLogoViewSet(viewsets.ModelViewSet):
     queryset = ClientLogo.objects.all()
     serializer_class = ClientLogoSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_active']
\ No newline at end of file
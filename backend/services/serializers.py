@@ -104,6 +104,7 @@ class PriceCardSerializer(serializers.ModelSerializer):
             "is_active",
             "created_at",
         ]
+        select_related = ["service", "department"]
 
 class PricingPlanSerializer(serializers.ModelSerializer):
     service_title = serializers.CharField(source="service.title", read_only=True)
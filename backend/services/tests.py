@@ -1,3 +1,42 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from orders.models import Order
+from payments.ledger import post_entry
+from .models import Department, Service
+
+
+@override_settings(
+    ALLOWED_HOSTS=['*'],
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class CatalogDeletionTests(TestCase):
+    """Departments and services with paid orders cannot be deleted; the rest can"""
+
+    def setUp(self):
+        client = User.objects.create_user(username='client', email='client@example.com', password='x', role='client')
+        self.department = Department.objects.create(title='Design', slug='design')
+        self.paid_service = Service.objects.create(title='Logo', slug='logo', department=self.department)
+        self.unpaid_service = Service.objects.create(
+            title='Flyer', slug='flyer', department=self.department, priority=2
+        )
+        order = Order.objects.create(client=client, service=self.paid_service, title='Logo', price=100)
+        Order.objects.create(client=client, service=self.unpaid_service, title='Flyer', price=50)
+        post_entry(order, 100, 'credit')
+        self.api = APIClient()
+
+    def test_service_with_paid_orders_is_kept(self):
+        response = self.api.delete(f'/api/services/{self.paid_service.id}/')
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(Service.objects.filter(pk=self.paid_service.pk).exists())
+
+        response = self.api.delete(f'/api/services/{self.unpaid_service.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Order.objects.filter(title='Flyer').exists())
+
+    def test_department_with_paid_orders_is_kept(self):
+        response = self.api.delete(f'/api/departments/{self.department.id}/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Service.objects.filter(department=self.department).count(), 2)
+        self.assertEqual(Order.objects.count(), 2)
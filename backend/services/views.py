@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg, Count, Sum
+from django.db.models import Avg, Count, ProtectedError, Sum
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from .models import Department, PriceCard, Service, PricingPlan, PricingComparison
@@ -17,14 +17,36 @@ User = get_user_model()
 class DepartmentViewSet(viewsets.ModelViewSet):
     queryset = Department.objects.prefetch_related('services').all().order_by("priority", "title")
     serializer_class = DepartmentSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
 
+    def destroy(self, request, *args, **kwargs):
+        """Departments with paid orders are kept, like the orders' payment ledger"""
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {'error': 'Departments with paid orders cannot be deleted.'},
+                status=status.HTTP_409_CONFLICT
+            )
+
 class ServiceViewSet(viewsets.ModelViewSet):
     queryset = Service.objects.all().order_by("department__priority", "priority", "title")
     serializer_class = ServiceSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["department"]
+
+    def destroy(self, request, *args, **kwargs):
+        """Services with paid orders are kept, like the orders' payment ledger"""
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {'error': 'Services with paid orders cannot be deleted.'},
+                status=status.HTTP_409_CONFLICT
+            )
     
     def get_queryset(self):
         """
@@ -132,6 +154,7 @@ class ServiceViewSet(viewsets.ModelViewSet):
 class PriceCardViewSet(viewsets.ModelViewSet):
     queryset = PriceCard.objects.all().order_by("service", "title")
     serializer_class = PriceCardSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["service", "department"]
@@ -140,6 +163,7 @@ class PriceCardViewSet(viewsets.ModelViewSet):
 class PricingPlanViewSet(viewsets.ModelViewSet):
     queryset = PricingPlan.objects.filter(is_active=True)
     serializer_class = PricingPlanSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_active', 'service', 'is_popular']
@@ -153,6 +177,7 @@ class PricingPlanViewSet(viewsets.ModelViewSet):
 class PricingComparisonListView(generics.ListAPIView):
     queryset = PricingComparison.objects.all()
     serializer_class = PricingComparisonSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
     
     def get_queryset(self):
@@ -185,6 +210,7 @@ class PublicServiceListView(generics.ListAPIView):
     """Public endpoint for listing services (no auth required)"""
     queryset = Service.objects.filter(is_active=True).select_related('department').prefetch_related('team_members').order_by('department__priority', 'priority', 'title')
     serializer_class = ServiceSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['department']
@@ -1,6 +1,25 @@
 #!/bin/bash
+# Usage: start.sh [web|worker]
+#   web (default): migrations, a Celery worker in the background, then Gunicorn
+#   worker: only the Celery worker, for a separate worker service
+#           (set CELERY_EMBEDDED_WORKER=0 on the web service in that case)
+#
+# Webhooks, post-payment steps (receipts, emails) and PDF renders are queued
+# to Celery, so a worker must be running wherever the web service runs.
+ROLE="${1:-web}"
+
+WORKER_CMD=(celery -A backend worker --loglevel=info --concurrency="${CELERY_WORKER_CONCURRENCY:-2}")
+
+if [ "$ROLE" = "worker" ]; then
+    exec "${WORKER_CMD[@]}"
+fi
+
 # Run migrations at startup (internal network is available at runtime)
 python manage.py migrate --noinput
 
+if [ "${CELERY_EMBEDDED_WORKER:-1}" != "0" ]; then
+    "${WORKER_CMD[@]}" &
+fi
+
 # Start Gunicorn
 exec gunicorn backend.wsgi:application --bind 0.0.0.0:$PORT --workers 2 --timeout 120
@@ -37,6 +37,9 @@ class Task(models.Model):
     class Meta:
         db_table = "tasks"
         ordering = ["-priority", "due_date", "-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"]),
+        ]
     
     def __str__(self):
         return f"Task #{self.id} - {self.title}"
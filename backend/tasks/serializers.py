@@ -3,9 +3,10 @@ from rest_framework import serializers
 from .models import Task
 from accounts.models import User
 from orders.models import Order
+from utils.dynamic_fields import DynamicFieldsMixin
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Task model"""
     
     assignee_name = serializers.SerializerMethodField()
@@ -28,6 +29,21 @@ class TaskSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'completed_at', 'can_edit'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'completed_at']
+        # Relations read by each field (see utils/query_plans.py)
+        select_related = {
+            'assignee_name': ['assignee'],
+            'assignee_details': ['assignee'],
+            'can_edit': ['assignee'],
+            'created_by_name': ['created_by'],
+            'order_title': ['order'],
+            'order_details': ['order__client'],
+        }
+        # Columns read by method fields, beyond their relations above
+        field_columns = {
+            'due_date_formatted': ['due_date'],
+        }
+        # Heavy fields only returned on request once ?fields= / ?expand= is used
+        expandable_fields = ['order_details', 'assignee_details', 'attachments']
     
     def get_assignee_name(self, obj):
         """Get assignee name"""
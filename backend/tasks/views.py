@@ -14,9 +14,11 @@ from .serializers import (
 )
 from orders.models import Order
 from notifications.models import Notification
+from orders.activity import record_task_assigned
+from utils.query_plans import QueryPlanMixin
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """
     ViewSet for Task CRUD operations
     """
@@ -56,6 +58,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 notification_type="task_assigned",
                 task=task
             )
+            record_task_assigned(task, actor=self.request.user)
     
     def perform_update(self, serializer):
         """Update task and send notifications"""
@@ -74,6 +77,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 notification_type="task_assigned",
                 task=task
             )
+            record_task_assigned(task, actor=self.request.user)
         
         # Notify if status changed to done
         if task.status == 'done' and old_status != 'done':
@@ -159,6 +163,7 @@ def order_tasks(request, order_id):
                         notification_type="task_assigned",
                         task=task
                     )
+                    record_task_assigned(task, actor=request.user)
                 
                 return Response(
                     TaskSerializer(task, context={'request': request}).data,
@@ -30,6 +30,7 @@ class IsAdminOrReadOnly(AllowAny):
 class TestimonialViewSet(viewsets.ModelViewSet):
     queryset = Testimonial.objects.all()
     serializer_class = TestimonialSerializer
+    pagination_class = None  # display-ordered catalog, returned whole
     permission_classes = [IsAdminOrReadOnly]
     
     def get_queryset(self):
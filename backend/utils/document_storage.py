@@ -0,0 +1,193 @@
+# utils/document_storage.py
+"""
+Pluggable storage for generated documents (estimation, invoice and receipt PDFs).
+
+settings.PDF_STORAGE_BACKEND selects the backend by dotted path:
+
+- utils.dropbox_service.DropboxService (default): Dropbox, shared links
+- utils.document_storage.LocalFileSystemStorage: files under
+  PDF_STORAGE_LOCAL_ROOT, served by the API through signed links
+- utils.document_storage.InMemoryStorage: a per-process dict with no I/O,
+  for tests and benchmarks
+
+Every backend returns the same upload result as DropboxService.upload_pdf().
+"""
+import os
+import posixpath
+import tempfile
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+DOCUMENT_LINK_SALT = 'utils.document_storage'
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+class DocumentStorage:
+    """Interface implemented by every document storage backend"""
+
+    def upload_pdf(self, pdf_file, filename, folder_path="/PDFs"):
+        """
+        Store a PDF
+
+        Args:
+            pdf_file: BytesIO object or file-like object containing PDF data
+            filename: Name for the file
+            folder_path: Folder to store it in
+
+        Returns:
+            dict: {'file_path': str, 'download_url': str, 'shared_link': str, 'filename': str}
+        """
+        raise NotImplementedError
+
+    def upload_pdfs(self, uploads):
+        """
+        Store several PDFs; backends with a batch API override this
+
+        Args:
+            uploads: list of (pdf_file, filename, folder_path) tuples
+
+        Returns:
+            list: upload_pdf() result dict, or the Exception that file failed
+            with, for each upload in order
+        """
+        results = []
+        for pdf_file, filename, folder_path in uploads:
+            try:
+                results.append(self.upload_pdf(pdf_file, filename, folder_path))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def delete_file(self, file_path):
+        """Delete a stored document; returns whether it existed"""
+        raise NotImplementedError
+
+    def open_file(self, file_path):
+        """
+        Readable binary file for a stored document, or None if the backend
+        only serves documents through their download URL
+        """
+        return None
+
+
+def get_document_storage():
+    """The configured storage backend (one instance per backend per process)"""
+    path = settings.PDF_STORAGE_BACKEND
+    backend = _backends.get(path)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(path)
+            if backend is None:
+                backend = _backends[path] = import_string(path)()
+    return backend
+
+
+def storage_path(folder_path, filename):
+    """Normalised '/folder/filename' path; rejects paths escaping the folder tree"""
+    path = posixpath.normpath(posixpath.join('/', folder_path.strip('/'), filename))
+    if '..' in path.split('/') or path == '/':
+        raise ValueError(f"Invalid document path: {folder_path}/{filename}")
+    return path
+
+
+def signed_document_url(file_path):
+    """Unguessable, non-expiring link to a document (like a Dropbox shared link)"""
+    token = signing.dumps(file_path, salt=DOCUMENT_LINK_SALT)
+    return settings.PDF_STORAGE_PUBLIC_URL.rstrip('/') + reverse('stored-document', args=[token])
+
+
+def load_document_token(token):
+    """File path from a signed document link, or None if the token is invalid"""
+    try:
+        return signing.loads(token, salt=DOCUMENT_LINK_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def _read(pdf_file):
+    pdf_file.seek(0)
+    return pdf_file.read()
+
+
+def _upload_result(file_path, filename):
+    url = signed_document_url(file_path)
+    return {
+        'file_path': file_path,
+        'download_url': url,
+        'shared_link': url,
+        'filename': filename
+    }
+
+
+class LocalFileSystemStorage(DocumentStorage):
+    """Documents stored under PDF_STORAGE_LOCAL_ROOT on this server's disk"""
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or settings.PDF_STORAGE_LOCAL_ROOT)
+
+    def _full_path(self, file_path):
+        full_path = os.path.abspath(os.path.join(self.root, file_path.lstrip('/')))
+        if not full_path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid document path: {file_path}")
+        return full_path
+
+    def upload_pdf(self, pdf_file, filename, folder_path="/PDFs"):
+        file_path = storage_path(folder_path, filename)
+        full_path = self._full_path(file_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        # Write then rename, so readers never see a partial file
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(full_path), suffix='.part', delete=False) as f:
+            f.write(_read(pdf_file))
+        os.replace(f.name, full_path)
+        return _upload_result(file_path, filename)
+
+    def delete_file(self, file_path):
+        try:
+            os.remove(self._full_path(file_path))
+            return True
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def open_file(self, file_path):
+        try:
+            return open(self._full_path(file_path), 'rb')
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+class InMemoryStorage(DocumentStorage):
+    """Documents kept in a dict for the life of the process; no I/O at all"""
+
+    def __init__(self):
+        self.files = {}
+        self.uploads = 0
+        self._lock = threading.Lock()
+
+    def upload_pdf(self, pdf_file, filename, folder_path="/PDFs"):
+        file_path = storage_path(folder_path, filename)
+        data = _read(pdf_file)
+        with self._lock:
+            self.files[file_path] = data
+            self.uploads += 1
+        return _upload_result(file_path, filename)
+
+    def delete_file(self, file_path):
+        with self._lock:
+            return self.files.pop(file_path, None) is not None
+
+    def open_file(self, file_path):
+        data = self.files.get(file_path)
+        return BytesIO(data) if data is not None else None
+
+    def clear(self):
+        with self._lock:
+            self.files.clear()
+            self.uploads = 0
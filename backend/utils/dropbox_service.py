@@ -2,15 +2,43 @@
 """
 Dropbox service for uploading and managing PDF files
 """
+import hashlib
 import os
 from io import BytesIO
 import dropbox
-from dropbox.files import WriteMode
+from django.core.cache import cache
+from dropbox.files import CommitInfo, UploadSessionCursor, UploadSessionFinishArg, WriteMode
 from dropbox.exceptions import ApiError, AuthError
 
+from .document_storage import DocumentStorage
 
-class DropboxService:
-    """Service class for Dropbox operations"""
+# path -> shared link; links do not expire, so re-uploads to a known path skip link creation
+SHARED_LINK_CACHE_KEY = "utils:dropbox-shared-link:{}"
+SHARED_LINK_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+
+# files_upload_session_finish_batch_v2 accepts at most 1000 entries
+UPLOAD_BATCH_LIMIT = 1000
+
+
+def _shared_link_cache_key(full_path):
+    # Dropbox paths are case-insensitive
+    return SHARED_LINK_CACHE_KEY.format(hashlib.sha1(full_path.lower().encode('utf-8')).hexdigest())
+
+
+def _download_url(shared_link):
+    """Convert a shared link to a direct download link (dl=0 -> dl=1)"""
+    if not shared_link:
+        return None
+    if 'dl=0' in shared_link:
+        return shared_link.replace('dl=0', 'dl=1')
+    if 'dl=1' not in shared_link:
+        separator = '&' if '?' in shared_link else '?'
+        return f"{shared_link}{separator}dl=1"
+    return shared_link
+
+
+class DropboxService(DocumentStorage):
+    """Service class for Dropbox operations (the default document storage backend)"""
     
     def __init__(self):
         """Initialize Dropbox service"""
@@ -82,53 +110,102 @@ class DropboxService:
                 autorename=False
             )
             
-            # Create a shared link for the file
-            try:
-                # Try to get existing shared link
-                shared_links = self.dbx.sharing_list_shared_links(path=full_path)
-                if shared_links.links:
-                    shared_link = shared_links.links[0].url
-                else:
-                    # Create new shared link
-                    link_metadata = self.dbx.sharing_create_shared_link_with_settings(full_path)
-                    shared_link = link_metadata.url
-            except ApiError as e:
-                # If link already exists, get it
-                if hasattr(e.error, 'shared_link_already_exists'):
-                    shared_links = self.dbx.sharing_list_shared_links(path=full_path)
-                    shared_link = shared_links.links[0].url if shared_links.links else None
-                else:
-                    shared_link = None
-            
-            
-            # Convert shared link to direct download link
-            # Change dl=0 to dl=1 for direct download (handles any position in URL)
-            if shared_link:
-                if 'dl=0' in shared_link:
-                    download_url = shared_link.replace('dl=0', 'dl=1')
-                elif 'dl=1' not in shared_link:
-                    # Add dl=1 if not present
-                    separator = '&' if '?' in shared_link else '?'
-                    download_url = f"{shared_link}{separator}dl=1"
-                else:
-                    download_url = shared_link
-            else:
-                download_url = None
-            
-            return {
-                'file_path': full_path,
-                'download_url': download_url,
-                'shared_link': shared_link,
-                'filename': filename
-            }
+            return self._upload_result(full_path, filename)
             
         except Exception as e:
             raise Exception(f"Failed to upload PDF to Dropbox: {str(e)}")
     
+    def upload_pdfs(self, uploads):
+        """
+        Upload several PDFs with one upload session per file and a single
+        batch commit, instead of one files_upload commit per file
+        
+        Args:
+            uploads: list of (pdf_file, filename, folder_path) tuples
+            
+        Returns:
+            list: upload_pdf() result dict, or the Exception that file failed
+            with, for each upload in order
+        """
+        results = []
+        for start in range(0, len(uploads), UPLOAD_BATCH_LIMIT):
+            results.extend(self._upload_batch(uploads[start:start + UPLOAD_BATCH_LIMIT]))
+        return results
+    
+    def _upload_batch(self, uploads):
+        results = [None] * len(uploads)
+        entries, pending = [], []
+        for index, (pdf_file, filename, folder_path) in enumerate(uploads):
+            full_path = f"{folder_path}/{filename}"
+            try:
+                pdf_file.seek(0)
+                pdf_content = pdf_file.read()
+                session = self.dbx.files_upload_session_start(pdf_content, close=True)
+            except Exception as e:
+                results[index] = Exception(f"Failed to upload PDF to Dropbox: {str(e)}")
+                continue
+            entries.append(UploadSessionFinishArg(
+                cursor=UploadSessionCursor(session_id=session.session_id, offset=len(pdf_content)),
+                commit=CommitInfo(path=full_path, mode=WriteMode.overwrite, autorename=False),
+            ))
+            pending.append((index, full_path, filename))
+        
+        if not entries:
+            return results
+        try:
+            finished = self.dbx.files_upload_session_finish_batch_v2(entries).entries
+        except Exception as e:
+            for index, _, _ in pending:
+                results[index] = Exception(f"Failed to upload PDF to Dropbox: {str(e)}")
+            return results
+        
+        for (index, full_path, filename), entry in zip(pending, finished):
+            try:
+                if entry.is_failure():
+                    raise Exception(str(entry.get_failure()))
+                results[index] = self._upload_result(full_path, filename)
+            except Exception as e:
+                results[index] = Exception(f"Failed to upload PDF to Dropbox: {str(e)}")
+        return results
+    
+    def _upload_result(self, full_path, filename):
+        shared_link = self.get_shared_link(full_path)
+        return {
+            'file_path': full_path,
+            'download_url': _download_url(shared_link),
+            'shared_link': shared_link,
+            'filename': filename
+        }
+    
+    def get_shared_link(self, full_path):
+        """Shared link for a file, from the cache or created (at most one API call on a miss)"""
+        cache_key = _shared_link_cache_key(full_path)
+        shared_link = cache.get(cache_key)
+        if shared_link:
+            return shared_link
+        
+        try:
+            shared_link = self.dbx.sharing_create_shared_link_with_settings(full_path).url
+        except ApiError as e:
+            if not (hasattr(e.error, 'is_shared_link_already_exists') and e.error.is_shared_link_already_exists()):
+                return None
+            # The error usually carries the existing link; list only when it does not
+            existing = e.error.get_shared_link_already_exists()
+            if existing is not None and existing.is_metadata():
+                shared_link = existing.get_metadata().url
+            else:
+                shared_links = self.dbx.sharing_list_shared_links(path=full_path, direct_only=True)
+                shared_link = shared_links.links[0].url if shared_links.links else None
+        
+        if shared_link:
+            cache.set(cache_key, shared_link, SHARED_LINK_CACHE_TIMEOUT)
+        return shared_link
+    
     def delete_file(self, file_path):
         """Delete a file from Dropbox"""
         try:
             self.dbx.files_delete_v2(file_path)
+            cache.delete(_shared_link_cache_key(file_path))
             return True
         except Exception as e:
             print(f"Error deleting file: {str(e)}")
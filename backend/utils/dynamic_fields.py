@@ -0,0 +1,81 @@
+# utils/dynamic_fields.py
+"""
+Sparse fieldsets and expansion control for serializers.
+
+    GET /api/orders/?fields=id,title,status
+    GET /api/orders/?expand=department_head
+
+Heavy fields are listed in Meta.expandable_fields. They are returned as
+before when neither parameter is given, but once a client passes ?fields=
+or ?expand= they are only included when named explicitly. Dropped fields
+are removed from the serializer, so they are never computed, and
+utils.query_plans skips the relations they would have loaded and defers
+the columns only they read.
+"""
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_list(value):
+    """Parse a comma-separated query parameter into a set of names"""
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def select_field_names(names, params, expandable=()):
+    """
+    Return the names kept for a request's ?fields= / ?expand= params, in
+    order; all of them when neither parameter is given.
+    """
+    if 'fields' not in params and 'expand' not in params:
+        return list(names)
+
+    requested = parse_field_list(params.get('fields'))
+    expanded = parse_field_list(params.get('expand'))
+    kept = []
+    for name in names:
+        if name in requested or name in expanded:
+            kept.append(name)
+        elif not requested and name not in expandable:
+            kept.append(name)
+    return kept
+
+
+class DynamicFieldsMixin:
+    """
+    ModelSerializer mixin adding ?fields= and ?expand= support.
+
+    Only applies to the top-level serializer of a read request; nested and
+    write serializers always keep their full field set. Pass
+    context={'sparse_fields': False} to render every field regardless,
+    e.g. when the output is cached and shared between requests.
+    """
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Fields removed by ?fields= / ?expand=, whose columns need not be fetched
+        self.dropped_fields = {}
+
+        request = self.context.get('request')
+        if (
+            request is None
+            or request.method not in SAFE_METHODS
+            or not self._is_root()
+            or self.context.get('sparse_fields') is False
+        ):
+            return fields
+
+        expandable = getattr(self.Meta, 'expandable_fields', [])
+        kept = set(select_field_names(fields, request.query_params, expandable))
+        for name in list(fields):
+            if name not in kept:
+                self.dropped_fields[name] = fields.pop(name)
+
+        return fields
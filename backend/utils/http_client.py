@@ -0,0 +1,175 @@
+# utils/http_client.py
+"""
+Shared HTTP client for calls to payment gateways, OAuth providers and
+document storage.
+
+One requests session per process, so connections are kept alive and
+reused instead of paying for a new TCP + TLS handshake on every call.
+requests keeps a separate connection pool per host; HTTP_CLIENT_POOL_HOSTS
+of them are cached and each holds up to HTTP_CLIENT_POOL_SIZE connections.
+
+Every request gets HTTP_CLIENT_TIMEOUT unless it passes its own timeout.
+Failures are retried a bounded number of times with jittered exponential
+backoff: connection errors for any method (nothing reached the server),
+and 429/5xx answers or read errors only for idempotent methods, so a POST
+such as an OAuth code exchange is never sent twice.
+
+Latency, error and retry counts are kept per upstream host for this
+process (see upstream_metrics()); slow calls are logged to the
+'performance' logger.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+performance_logger = logging.getLogger('performance')
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Latency samples kept per host for the percentiles in upstream_metrics()
+LATENCY_SAMPLES = 500
+SLOW_REQUEST_SECONDS = 2.0
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class UpstreamMetrics:
+    """Per-host request counters and recent latencies for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host, duration, status_code=None, error=None, retries=0):
+        with self._lock:
+            stats = self._hosts.get(host)
+            if stats is None:
+                stats = self._hosts[host] = {
+                    'requests': 0, 'errors': 0, 'retries': 0, 'latencies': deque(maxlen=LATENCY_SAMPLES),
+                }
+            stats['requests'] += 1
+            stats['retries'] += retries
+            if error is not None or (status_code and status_code >= 500):
+                stats['errors'] += 1
+            stats['latencies'].append(duration)
+
+    def snapshot(self):
+        """{host: {requests, errors, retries, p50_ms, p95_ms, max_ms}}"""
+        with self._lock:
+            hosts = {host: (dict(stats), sorted(stats['latencies'])) for host, stats in self._hosts.items()}
+
+        result = {}
+        for host, (stats, latencies) in hosts.items():
+            def percentile(p):
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+            result[host] = {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'p50_ms': percentile(0.50) if latencies else None,
+                'p95_ms': percentile(0.95) if latencies else None,
+                'max_ms': round(latencies[-1] * 1000, 1) if latencies else None,
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+metrics = UpstreamMetrics()
+
+
+def upstream_metrics():
+    """Latency and error counts per upstream host since this process started"""
+    return metrics.snapshot()
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter that applies the default timeout and records metrics"""
+
+    def __init__(self, timeout=None, **kwargs):
+        self.default_timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.default_timeout
+        host = urlsplit(request.url).hostname or ''
+        start = time.monotonic()
+        try:
+            response = super().send(request, timeout=timeout, **kwargs)
+        except Exception as e:
+            metrics.record(host, time.monotonic() - start, error=e)
+            logger.warning(f"{request.method} {host} failed: {e}")
+            raise
+
+        duration = time.monotonic() - start
+        history = getattr(response.raw, 'retries', None)
+        retries = len(history.history) if history is not None else 0
+        metrics.record(host, duration, status_code=response.status_code, retries=retries)
+        if duration > SLOW_REQUEST_SECONDS:
+            performance_logger.warning(
+                f"Slow upstream call: {request.method} {host} took {duration:.2f}s",
+                extra={'upstream': host, 'duration': duration, 'status_code': response.status_code},
+            )
+        return response
+
+
+def build_retry():
+    return Retry(
+        total=settings.HTTP_CLIENT_RETRIES,
+        connect=settings.HTTP_CLIENT_RETRIES,
+        read=settings.HTTP_CLIENT_RETRIES,
+        status=settings.HTTP_CLIENT_RETRIES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=settings.HTTP_CLIENT_BACKOFF,
+        backoff_jitter=settings.HTTP_CLIENT_BACKOFF,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def build_session():
+    session = requests.Session()
+    adapter = InstrumentedAdapter(
+        timeout=settings.HTTP_CLIENT_TIMEOUT,
+        pool_connections=settings.HTTP_CLIENT_POOL_HOSTS,
+        pool_maxsize=settings.HTTP_CLIENT_POOL_SIZE,
+        max_retries=build_retry(),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """Process-wide pooled HTTP session"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def request(method, url, **kwargs):
+    """requests.request() through the shared session"""
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
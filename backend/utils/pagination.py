@@ -0,0 +1,105 @@
+# utils/pagination.py
+"""
+Project-wide pagination.
+
+List endpoints use keyset (cursor) pagination over the indexed
+(created_at, id) ordering, so every page costs the same no matter how deep
+the client scrolls. Admin tables that need "jump to page N" can opt in to
+page-number mode by setting `allow_page_number_pagination = True` on the
+view; clients then request it with ?page=N.
+
+Pagination is opt-in per request: a list is only paginated when the client
+sends ?cursor=, ?page_size= (or ?page= where allowed). Without them the
+full list is returned as a plain array, as before, until every screen in
+the frontend can page through results.
+"""
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+class AdminPageNumberPagination(PageNumberPagination):
+    """Page-number pagination for admin tables (opt-in, see module docstring)"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by (-created_at, -id).
+
+    Views can override the ordering with a `pagination_ordering` attribute.
+    Models without a created_at field fall back to primary-key order.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        filter_backends = getattr(view, 'filter_backends', None) or []
+        if not any(issubclass(backend, OrderingFilter) for backend in filter_backends):
+            ordering = getattr(view, 'pagination_ordering', None)
+            if ordering is None:
+                field_names = {field.name for field in queryset.model._meta.get_fields()}
+                if 'created_at' not in field_names:
+                    ordering = ('-pk',)
+            if ordering is not None:
+                return tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+
+class DefaultPagination(CreatedAtCursorPagination):
+    """
+    DEFAULT_PAGINATION_CLASS: cursor pagination, with page-number mode for
+    views that set allow_page_number_pagination = True and pass ?page=.
+    """
+    page_number_class = AdminPageNumberPagination
+
+    def is_requested(self, request, view):
+        """Whether the client asked for a page rather than the whole list"""
+        params = request.query_params
+        if self.cursor_query_param in params or self.page_size_query_param in params:
+            return True
+        return getattr(view, 'allow_page_number_pagination', False) and 'page' in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_number_paginator = None
+        if not self.is_requested(request, view):
+            return None
+        if getattr(view, 'allow_page_number_pagination', False) and 'page' in request.query_params:
+            if not queryset.ordered:
+                queryset = queryset.order_by(*self.get_ordering(request, queryset, view))
+            self.page_number_paginator = self.page_number_class()
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+def paginate_list(request, queryset, serializer_class, allow_page_number=False, ordering=None,
+                  **serializer_kwargs):
+    """
+    Paginated list response for function-based views.
+
+    Args:
+        request: DRF request
+        queryset: QuerySet to paginate
+        serializer_class: Serializer used for each item
+        allow_page_number: Enable the opt-in ?page=N mode
+        ordering: Keyset ordering, defaults to (-created_at, -id)
+    """
+    class ListView:
+        allow_page_number_pagination = allow_page_number
+        pagination_ordering = ordering
+
+    paginator = DefaultPagination()
+    page = paginator.paginate_queryset(queryset, request, view=ListView)
+    if page is None:
+        return Response(serializer_class(queryset, many=True, **serializer_kwargs).data)
+    serializer = serializer_class(page, many=True, **serializer_kwargs)
+    return paginator.get_paginated_response(serializer.data)
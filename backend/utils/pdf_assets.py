@@ -0,0 +1,193 @@
+# utils/pdf_assets.py
+"""
+Process-wide ReportLab style and asset registry.
+
+Paragraph styles, the colour palette, decoded images (logo, signatures)
+and registered fonts are built once per process and shared by every PDF
+generator (estimations, invoices, receipts) instead of being rebuilt on
+each generate() call. Everything returned here is shared between
+documents and threads, so treat it as read-only.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+from functools import lru_cache
+from io import BytesIO
+from types import MappingProxyType
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Image
+
+logger = logging.getLogger(__name__)
+
+PALETTE = MappingProxyType({
+    # Estimations / invoices
+    'navy': colors.HexColor('#0F172A'),
+    'teal': colors.HexColor('#14B8A6'),
+    'emerald': colors.HexColor('#10B981'),
+    'off_white': colors.HexColor('#F8FAFC'),
+    'charcoal': colors.HexColor('#1E293B'),
+    # Receipts
+    'receipt_navy': colors.HexColor('#1a233a'),
+    'orange': colors.HexColor('#ff9f00'),
+    'light_gray': colors.HexColor('#f5f5f5'),
+    'green': colors.HexColor('#10b981'),
+    'success_background': colors.HexColor('#d1fae5'),
+})
+
+LOGO_PATH = ('UdyogWorks logo.png',)
+IMAGE_EXTENSIONS = ('.jpeg', '.jpg', '.png')
+
+
+def asset_path(*parts):
+    """Absolute path of a file under staticfiles/"""
+    return os.path.join(settings.BASE_DIR, 'staticfiles', *parts)
+
+
+@lru_cache(maxsize=None)
+def get_registered_fonts():
+    """
+    Register every TTF under staticfiles/fonts/ with ReportLab, once.
+
+    Returns:
+        tuple: registered font names (the file names without extension)
+    """
+    names = []
+    for path in sorted(glob.glob(asset_path('fonts', '*.ttf'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            pdfmetrics.registerFont(TTFont(name, path))
+            names.append(name)
+        except Exception as e:
+            logger.warning(f"Could not register PDF font {path}: {e}")
+    return tuple(names)
+
+
+@lru_cache(maxsize=None)
+def get_pdf_styles():
+    """
+    Return the shared paragraph styles, keyed by name.
+    """
+    get_registered_fonts()
+    sample = getSampleStyleSheet()
+    normal = sample['Normal']
+    navy, teal, charcoal = PALETTE['navy'], PALETTE['teal'], PALETTE['charcoal']
+    receipt_navy = PALETTE['receipt_navy']
+
+    styles = {
+        'Normal': normal,
+        # Estimations / invoices
+        'DocTitle': ParagraphStyle('DocTitle', parent=normal, fontSize=32, textColor=teal,
+                                   alignment=TA_RIGHT, fontName='Helvetica-Bold'),
+        'HeaderMeta': ParagraphStyle('HeaderMeta', parent=normal, fontSize=9, textColor=colors.white,
+                                     alignment=TA_RIGHT),
+        'InfoTitle': ParagraphStyle('InfoTitle', parent=normal, fontSize=10, textColor=colors.white,
+                                    fontName='Helvetica-Bold', leftIndent=5, rightIndent=5),
+        'InfoContent': ParagraphStyle('InfoContent', parent=normal, fontSize=9, leading=12),
+        'DocHeading': ParagraphStyle('DocHeading', parent=normal, fontSize=14, textColor=navy,
+                                     fontName='Helvetica-Bold'),
+        'ItemDescription': ParagraphStyle('ItemDescription', parent=normal, fontSize=8, textColor=charcoal),
+        'Footer': ParagraphStyle('Footer', parent=normal, fontSize=9, leading=12, textColor=charcoal),
+        'ThankYou': ParagraphStyle('ThankYou', parent=normal, fontSize=11, fontName='Helvetica-Bold',
+                                   textColor=navy, alignment=TA_CENTER),
+        'Signature': ParagraphStyle('Signature', parent=normal, fontSize=8, alignment=TA_CENTER,
+                                    textColor=charcoal),
+        # Receipts
+        'RightAligned': ParagraphStyle('RightAligned', parent=normal, alignment=TA_RIGHT),
+        'Centered': ParagraphStyle('Centered', parent=normal, alignment=TA_CENTER),
+        'ReceiptInfo': ParagraphStyle('ReceiptInfo', parent=normal, fontSize=9, leading=14),
+        'ReceiptDetail': ParagraphStyle('ReceiptDetail', parent=normal, fontSize=10),
+        'ReceiptSectionTitle': ParagraphStyle('ReceiptSectionTitle', parent=normal, fontSize=14,
+                                              textColor=receipt_navy),
+        'ReceiptFooter': ParagraphStyle('ReceiptFooter', parent=normal, fontSize=9, leading=14,
+                                        alignment=TA_CENTER),
+        'ReceiptThankYou': ParagraphStyle('ReceiptThankYou', parent=normal, fontSize=12,
+                                          fontName='Helvetica-Bold', textColor=receipt_navy,
+                                          alignment=TA_CENTER),
+    }
+    return MappingProxyType(styles)
+
+
+class SharedImage(Image):
+    """
+    Image flowable drawing a process-wide, already decoded ImageReader,
+    so the file is neither re-read nor re-decoded for each document.
+    """
+
+    def __init__(self, asset, width=None, height=None, kind='direct', mask='auto', hAlign='CENTER'):
+        # Image.__init__ takes a filename or file, not a reader: attach the
+        # shared reader first so it is used instead of decoding the file again
+        self._img = asset.reader
+        super().__init__(BytesIO(asset.data), width=width, height=height, kind=kind, mask=mask, hAlign=hAlign)
+
+
+class ImageAsset:
+    """Raw bytes and decoded ReportLab image data for a static image"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        self.reader = ImageReader(BytesIO(self.data))
+        # Decode now so every document reuses the pixel data
+        self.reader.getRGBData()
+
+    def flowable(self, width, height, **kwargs):
+        """Return an Image flowable for this asset"""
+        return SharedImage(self, width=width, height=height, **kwargs)
+
+
+@lru_cache(maxsize=64)
+def get_image_asset(*parts):
+    """
+    Load and decode an image under staticfiles/, once per process.
+
+    Returns:
+        ImageAsset, or None if the file is missing or unreadable
+    """
+    path = asset_path(*parts)
+    if not os.path.exists(path):
+        return None
+    try:
+        return ImageAsset(path)
+    except Exception as e:
+        logger.warning(f"Could not load PDF image {path}: {e}")
+        return None
+
+
+def find_image_asset(*parts, extensions=IMAGE_EXTENSIONS):
+    """Like get_image_asset(), trying each extension in turn after the last part"""
+    *directory, name = parts
+    for ext in extensions:
+        asset = get_image_asset(*directory, f'{name}{ext}')
+        if asset:
+            return asset
+    return None
+
+
+def get_logo():
+    """The company logo, or None if it is not installed"""
+    return get_image_asset(*LOGO_PATH)
+
+
+def content_hash(template_version, fields):
+    """
+    SHA-256 over the fields a document renders plus its template version.
+    Equal hashes mean the PDFs would show the same content.
+    """
+    payload = json.dumps({'template': template_version, 'fields': fields}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def clear_pdf_asset_cache():
+    """Drop every cached style and image (used by the PDF benchmark)"""
+    get_pdf_styles.cache_clear()
+    get_image_asset.cache_clear()
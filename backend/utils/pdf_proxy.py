@@ -0,0 +1,249 @@
+# utils/pdf_proxy.py
+"""
+Streaming download proxy for PDFs kept in external storage (Dropbox).
+Backends that can read documents directly (see utils.document_storage)
+are served without going through HTTP.
+
+Downloads go through the shared pooled HTTP client (utils.http_client)
+and are streamed to the client rather than buffered. Complete downloads are kept
+in a size-bounded local disk cache, evicted least-recently-used first,
+so repeated downloads of the same PDF are served from disk. Single-range
+HTTP Range requests are answered from the cache, or forwarded upstream
+on a cache miss.
+
+Cached files are keyed by URL: a re-rendered PDF gets a new URL, so the
+cache never serves a stale document.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+from .document_storage import get_document_storage
+from .http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+ALLOWED_CONTENT_TYPES = ('application/pdf', 'application/octet-stream')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UpstreamError(Exception):
+    """The storage backend did not return a usable PDF"""
+
+
+class PDFDiskCache:
+    """
+    Size-bounded directory of downloaded PDFs. A file's mtime is its last
+    use, so eviction order survives restarts and is shared between worker
+    processes using the same directory.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path_for(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.pdf')
+
+    def get(self, url):
+        """Path of the cached copy of url (marking it as recently used), or None"""
+        path = self.path_for(url)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def open_temp(self):
+        """Temporary file in the cache directory, to be committed with commit()"""
+        os.makedirs(self.directory, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self.directory, suffix='.part', delete=False)
+
+    def commit(self, url, temp_path):
+        """Move a completed download into the cache, then evict down to max_bytes"""
+        os.replace(temp_path, self.path_for(url))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.pdf'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def get_disk_cache():
+    return PDFDiskCache(settings.PDF_DOWNLOAD_CACHE_DIR, settings.PDF_DOWNLOAD_CACHE_MAX_BYTES)
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range Range header against a file of the given size.
+
+    Returns:
+        (start, end) inclusive, None to serve the whole file (no header or a
+        multi-range/unsupported one), or False if the range is unsatisfiable
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _attachment(response, filename):
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _read_range(fileobj, start, length):
+    try:
+        fileobj.seek(start)
+        while length > 0:
+            chunk = fileobj.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def serve_file(fileobj, filename, range_header=None):
+    """Response for an open PDF file (which it takes over), honouring a single byte range"""
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    byte_range = parse_range(range_header, size)
+
+    if byte_range is False:
+        fileobj.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        response = FileResponse(fileobj, content_type='application/pdf')
+        response['Content-Length'] = size
+        return _attachment(response, filename)
+
+    start, end = byte_range
+    response = StreamingHttpResponse(_read_range(fileobj, start, end - start + 1), status=206,
+                                     content_type='application/pdf')
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = end - start + 1
+    return _attachment(response, filename)
+
+
+def _stream_upstream(upstream, cache, url):
+    """
+    Relay the upstream body, teeing complete (200) downloads into the cache.
+    An interrupted download is discarded rather than cached.
+    """
+    temp = None
+    if upstream.status_code == 200:
+        try:
+            temp = cache.open_temp()
+        except OSError as e:
+            logger.warning(f"PDF download cache unavailable: {e}")
+    completed = False
+    try:
+        for chunk in upstream.iter_content(CHUNK_SIZE):
+            if temp:
+                temp.write(chunk)
+            yield chunk
+        completed = True
+    finally:
+        upstream.close()
+        if temp:
+            temp.close()
+            if completed:
+                try:
+                    cache.commit(url, temp.name)
+                except OSError as e:
+                    logger.warning(f"Could not cache PDF download {url}: {e}")
+            if os.path.exists(temp.name):
+                os.remove(temp.name)
+
+
+def proxy_pdf_download(url, filename, range_header=None, file_path=None):
+    """
+    Serve the PDF at url as an attachment named filename. If the document
+    storage backend can read file_path itself (local and in-memory storage),
+    the PDF is served from there without an HTTP round trip.
+
+    Raises:
+        UpstreamError: storage answered with an error or a non-PDF body
+        requests.RequestException: storage could not be reached in time
+    """
+    if file_path:
+        stored = get_document_storage().open_file(file_path)
+        if stored is not None:
+            return serve_file(stored, filename, range_header)
+
+    cache = get_disk_cache()
+    path = cache.get(url)
+    if path:
+        try:
+            return serve_file(open(path, 'rb'), filename, range_header)
+        except FileNotFoundError:
+            pass  # Evicted by another process in the meantime
+
+    headers = {'Range': range_header} if range_header else {}
+    upstream = get_session().get(url, headers=headers, stream=True, timeout=settings.PDF_DOWNLOAD_TIMEOUT)
+
+    if upstream.status_code == 416:
+        upstream.close()
+        response = HttpResponse(status=416)
+        if upstream.headers.get('Content-Range'):
+            response['Content-Range'] = upstream.headers['Content-Range']
+        return response
+    if upstream.status_code not in (200, 206):
+        upstream.close()
+        raise UpstreamError(f"Storage returned HTTP {upstream.status_code}")
+
+    content_type = upstream.headers.get('Content-Type', '')
+    if not any(allowed in content_type for allowed in ALLOWED_CONTENT_TYPES):
+        upstream.close()
+        raise UpstreamError(f"Invalid content type: {content_type}")
+
+    response = StreamingHttpResponse(_stream_upstream(upstream, cache, url), status=upstream.status_code,
+                                     content_type='application/pdf')
+    # The body is relayed decoded, so lengths only carry over for unencoded bodies
+    if not upstream.headers.get('Content-Encoding'):
+        for header in ('Content-Length', 'Content-Range'):
+            if upstream.headers.get(header):
+                response[header] = upstream.headers[header]
+    return _attachment(response, filename)
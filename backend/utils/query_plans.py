@@ -0,0 +1,188 @@
+# utils/query_plans.py
+"""
+Declarative select_related / prefetch_related plans for serializers.
+
+A serializer lists the relations it reads in its Meta:
+
+    class Meta:
+        model = Order
+        select_related = ['client', 'service__department__team_head']
+        prefetch_related = ['tags']
+
+A plan can also be keyed by serializer field, so relations are only loaded
+when the field is actually rendered (see utils.dynamic_fields):
+
+        select_related = {
+            'client_name': ['client'],
+            'department_head': ['service__department__team_head'],
+        }
+
+Nested serializers are followed automatically, so a nested PriceCardSerializer
+with its own plan contributes 'pricing_plan__service' etc. Viewsets using
+QueryPlanMixin apply the plan of their serializer class to the queryset used
+by list/retrieve/update, whatever their get_queryset() returns.
+
+When a sparse fieldset drops fields, the columns only those fields read are
+deferred as well. A field's columns come from its source; a
+SerializerMethodField reads the relations listed for it in the plan, plus
+any columns declared for it in Meta.field_columns:
+
+        field_columns = {
+            'remaining_amount': ['price', 'total_paid'],
+        }
+
+If a rendered field's columns cannot be worked out, nothing is deferred,
+since loading a deferred column costs a query per row.
+"""
+import re
+
+from rest_framework import serializers
+
+DISPLAY_METHOD_RE = re.compile(r'^get_(\w+)_display$')
+
+
+def _plan_entries(plan, field_names):
+    """Flatten a list plan, or a {field: [relations]} plan limited to field_names"""
+    if isinstance(plan, dict):
+        return [
+            relation
+            for field_name, relations in plan.items()
+            if field_names is None or field_name in field_names
+            for relation in relations
+        ]
+    return list(plan)
+
+
+def get_query_plan(serializer_class, prefix='', field_names=None):
+    """
+    Collect the relations a serializer (and its nested serializers) reads.
+
+    Args:
+        serializer_class: Serializer declaring Meta.select_related / prefetch_related
+        prefix: Relation path prefix used for nested serializers
+        field_names: Rendered field names, or None for all fields
+
+    Returns:
+        tuple: (select_related: list, prefetch_related: list)
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    select = [prefix + name for name in _plan_entries(getattr(meta, 'select_related', []), field_names)]
+    prefetch = [prefix + name for name in _plan_entries(getattr(meta, 'prefetch_related', []), field_names)]
+
+    for name, field in getattr(serializer_class, '_declared_fields', {}).items():
+        if field.write_only:
+            continue
+        if field_names is not None and name not in field_names:
+            continue
+
+        many = isinstance(field, serializers.ListSerializer)
+        child = field.child if many else field
+        if not isinstance(child, serializers.BaseSerializer):
+            continue
+
+        source = (field.source or name).replace('.', '__')
+        if source == '*':
+            continue
+
+        child_select, child_prefetch = get_query_plan(type(child), prefix=f'{prefix}{source}__')
+        if many:
+            # Everything below a to-many relation has to be prefetched
+            prefetch.append(prefix + source)
+            prefetch.extend(child_select + child_prefetch)
+        else:
+            select.append(prefix + source)
+            select.extend(child_select)
+            prefetch.extend(child_prefetch)
+
+    return list(dict.fromkeys(select)), list(dict.fromkeys(prefetch))
+
+
+def apply_query_plan(queryset, serializer_class, field_names=None):
+    """Apply a serializer's declared query plan to a queryset"""
+    select, prefetch = get_query_plan(serializer_class, field_names=field_names)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def _field_columns(serializer_class, name, field):
+    """Model fields a serializer field reads, or None if unknown"""
+    meta = serializer_class.Meta
+    columns = set(getattr(meta, 'field_columns', {}).get(name, []))
+    planned = {
+        relation.split('__')[0]
+        for plan in (getattr(meta, 'select_related', []), getattr(meta, 'prefetch_related', []))
+        if isinstance(plan, dict)
+        for relation in plan.get(name, [])
+    }
+    columns |= planned
+
+    if isinstance(field, serializers.SerializerMethodField):
+        return columns if columns else None
+
+    source = field.source or name
+    if source == '*':
+        return None
+    root = source.split('.')[0]
+    match = DISPLAY_METHOD_RE.match(root)
+    if match:
+        root = match.group(1)
+    model_fields = {model_field.name for model_field in meta.model._meta.get_fields()}
+    if root not in model_fields:
+        return None
+    return columns | {root}
+
+
+def get_deferred_columns(serializer_class, fields, dropped_fields):
+    """
+    Concrete columns read only by fields a sparse fieldset dropped.
+
+    Args:
+        serializer_class: ModelSerializer class
+        fields: {name: field} that will be rendered
+        dropped_fields: {name: field} removed by utils.dynamic_fields
+
+    Returns:
+        list: column names safe to defer (empty if any rendered field is unknown)
+    """
+    if not dropped_fields:
+        return []
+
+    needed = set()
+    for name, field in fields.items():
+        columns = _field_columns(serializer_class, name, field)
+        if columns is None:
+            return []
+        needed |= columns
+
+    dropped = set()
+    for name, field in dropped_fields.items():
+        dropped |= _field_columns(serializer_class, name, field) or set()
+
+    concrete = {
+        model_field.name for model_field in serializer_class.Meta.model._meta.concrete_fields
+        if not model_field.primary_key
+    }
+    return sorted((dropped & concrete) - needed)
+
+
+class QueryPlanMixin:
+    """
+    ViewSet mixin that eager-loads the relations declared by the serializer,
+    limited to the fields the serializer will actually render, and defers
+    the columns of fields a sparse fieldset dropped.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+        fields = serializer.fields
+        queryset = apply_query_plan(queryset, self.get_serializer_class(), set(fields))
+        deferred = get_deferred_columns(
+            self.get_serializer_class(), fields, getattr(serializer, 'dropped_fields', {})
+        )
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
@@ -33,9 +33,28 @@ api.interceptors.request.use(
   }
 );
 
+export interface Pagination {
+  next: string | null;
+  previous: string | null;
+  count?: number;
+}
+
+// List endpoints return plain arrays unless a request asks for a page
+// (?cursor= / ?page_size= / ?page=), in which case they answer
+// { next, previous, results }. Unwrap those so callers still receive arrays;
+// the links move to response.pagination.
+const isPaginated = (data: any) =>
+  data && typeof data === 'object' && !Array.isArray(data) &&
+  Array.isArray(data.results) && 'next' in data && 'previous' in data;
+
 // Response interceptor
 api.interceptors.response.use(
   (response) => {
+    if (isPaginated(response.data)) {
+      const { results, next, previous, count } = response.data;
+      (response as any).pagination = { next, previous, count } as Pagination;
+      response.data = results;
+    }
     return response;
   },
   async (error) => {
@@ -1,6 +1,7 @@
 // frontend/src/api/estimations.ts
 import api from './api';
 import type { Estimation, EstimationCreateData } from '../types/estimations';
+import { waitForPdfJob, type PdfJob } from './pdfJobs';
 
 // Get all estimations for an order
 export const getOrderEstimations = (orderId: number) =>
@@ -22,15 +23,19 @@ export const updateEstimation = (estimationId: number, data: Partial<EstimationC
 export const deleteEstimation = (estimationId: number) =>
   api.delete(`/api/estimations/${estimationId}/`);
 
-// Generate PDF for estimation
-export const generateEstimationPDF = (estimationId: number) =>
-  api.post<{ success: boolean; message: string; pdf_url: string; pdf_public_id: string }>(
+// Generate PDF for estimation (queued server-side unless unchanged; resolves once the PDF is ready)
+export const generateEstimationPDF = async (estimationId: number) => {
+  const response = await api.post<{ success: boolean; message: string } & PdfJob>(
     `/api/orders/estimations/${estimationId}/generate-pdf/`
   );
+  // Unchanged documents come back with the existing, already-succeeded job
+  if (response.data.status === 'succeeded') return response.data as PdfJob;
+  return waitForPdfJob(response.data.job_id);
+};
 
 // Send estimation to client
 export const sendEstimation = (estimationId: number) =>
-  api.post<{ success: boolean; message: string; estimation: Estimation }>(
+  api.post<{ success: boolean; message: string; estimation: Estimation; pdf_job: PdfJob | null }>(
     `/api/orders/estimations/${estimationId}/send/`
   );
 
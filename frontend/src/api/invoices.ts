@@ -1,10 +1,11 @@
 // frontend/src/api/invoices.ts
 import api from './api';
 import type { Invoice, InvoiceGenerateData } from '../types/invoices';
+import { waitForPdfJob, type PdfJob } from './pdfJobs';
 
 // Generate invoice for an order
 export const generateInvoice = (orderId: number, data: InvoiceGenerateData) =>
-  api.post<{ success: boolean; message: string; invoice: Invoice }>(
+  api.post<{ success: boolean; message: string; invoice: Invoice; pdf_job: PdfJob | null }>(
     `/api/orders/${orderId}/invoices/generate/`,
     data
   );
@@ -21,15 +22,27 @@ export const updateInvoice = (invoiceId: number, data: Partial<Invoice>) =>
 export const deleteInvoice = (invoiceId: number) =>
   api.delete(`/api/invoices/${invoiceId}/`);
 
-// Generate PDF for invoice
-export const generateInvoicePDF = (invoiceId: number) =>
-  api.post<{ success: boolean; message: string; pdf_url: string; pdf_file_path: string }>(
+// Generate PDF for invoice (queued server-side unless unchanged; resolves once the PDF is ready)
+export const generateInvoicePDF = async (invoiceId: number) => {
+  const response = await api.post<{ success: boolean; message: string } & PdfJob>(
     `/api/orders/invoices/${invoiceId}/generate-pdf/`
   );
+  // Unchanged documents come back with the existing, already-succeeded job
+  if (response.data.status === 'succeeded') return response.data as PdfJob;
+  return waitForPdfJob(response.data.job_id);
+};
 
-// Download invoice PDF
-export const downloadInvoice = (invoiceId: number) =>
-  api.get<{ pdf_url: string; invoice_number: string }>(`/api/invoices/${invoiceId}/download/`);
+// Download invoice PDF (waits for the render job if the PDF is not generated yet)
+export const downloadInvoice = async (invoiceId: number) => {
+  const response = await api.get<{ pdf_url: string | null; invoice_number: string; pdf_job?: PdfJob }>(
+    `/api/invoices/${invoiceId}/download/`
+  );
+  if (!response.data.pdf_url && response.data.pdf_job) {
+    const job = await waitForPdfJob(response.data.pdf_job.job_id);
+    response.data.pdf_url = job.pdf_url;
+  }
+  return response;
+};
 
 // List all invoices (admin/service head)
 export const listInvoices = (params?: any) =>
@@ -6,6 +6,7 @@ import type { PaymentOrderCreateData } from '../types/payments';
 import type { PaymentVerificationData } from '../types/payments';
 import type { RazorpayCheckoutData } from '../types/payments';
 import type { PayPalCheckoutData } from '../types/payments';
+import { waitForPdfJob, type PdfJob } from './pdfJobs';
 
 // Create payment order
 export const createPaymentOrder = (data: PaymentOrderCreateData) =>
@@ -75,8 +76,13 @@ export const listPaymentRequests = (params?: { status?: string }) =>
 
 // Download receipt PDF
 export const downloadReceipt = async (transactionId: string): Promise<string> => {
-  const response = await api.get<{ url: string }>(`/api/payments/receipt/${transactionId}/`);
-  return response.data.url;
+  const response = await api.get<{ url: string | null; pdf_job?: PdfJob }>(`/api/payments/receipt/${transactionId}/`);
+  if (!response.data.url && response.data.pdf_job) {
+    // Receipt is being rendered in the background: wait, then fetch the download URL
+    await waitForPdfJob(response.data.pdf_job.job_id);
+    return downloadReceipt(transactionId);
+  }
+  return response.data.url as string;
 };
 
 // List user transactions
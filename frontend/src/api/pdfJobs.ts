@@ -0,0 +1,34 @@
+// frontend/src/api/pdfJobs.ts
+import api from './api';
+
+export interface PdfJob {
+  job_id: string;
+  document_type: 'estimation' | 'invoice' | 'receipt';
+  object_id: number;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  pdf_url: string | null;
+  pdf_file_path: string | null;
+  error: string | null;
+  created_at: string;
+  finished_at: string | null;
+  status_url: string;
+}
+
+// Get the status of a background PDF render job
+export const getPdfJob = (jobId: string) =>
+  api.get<PdfJob>(`/api/orders/pdf-jobs/${jobId}/`);
+
+// Poll a PDF job until it succeeds (resolves with the job) or fails (rejects)
+export const waitForPdfJob = async (
+  jobId: string,
+  { interval = 1500, timeout = 120000 }: { interval?: number; timeout?: number } = {}
+): Promise<PdfJob> => {
+  const deadline = Date.now() + timeout;
+  while (Date.now() < deadline) {
+    const { data } = await getPdfJob(jobId);
+    if (data.status === 'succeeded') return data;
+    if (data.status === 'failed') throw new Error(data.error || 'PDF generation failed');
+    await new Promise((resolve) => setTimeout(resolve, interval));
+  }
+  throw new Error('PDF generation is taking longer than expected. Please check back later.');
+};